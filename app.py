@@ -1,17 +1,37 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response, send_from_directory
 import pandas as pd
+import numpy as np
 import json
 import os
-import folium
+import base64
+import binascii
 import logging
+import mimetypes
+import threading
+import time
+from dataclasses import replace
 from datetime import datetime, timedelta
 from flask_bootstrap import Bootstrap
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 from typing import Optional
 
 # Import our new modules
 from config import config, load_country_coordinates
-from services.data_integration import DataIntegrationService
+from services.data_integration import DataIntegrationService, SourceVersion
+from services.team_index import TeamIndex
+from services.response_cache import ResponseCache
+from services.snapshot import DataSnapshot, BackgroundRefresher
+from services.snapshot_cache import SnapshotCache
+from services.map_builder import MapBuilder
+from services.map_clusters import ClusterIndex
+from services.shared_dataset import SharedDataset
+from services.refresh_lease import RefreshLease
+from services.static_assets import AssetManifest, ENCODING_SUFFIXES, available_encodings
+from services.team_export import TeamExporter
+from services.link_checker import LinkChecker, LinkStatusStore, extract_links
+from services.compact_frame import LINK_COLUMNS
+from services.row_versions import ChangeLog
 
 # Configure logging
 logging.basicConfig(
@@ -30,81 +50,339 @@ ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 # Initialize services
-data_service = DataIntegrationService()
+data_service = DataIntegrationService(
+    timeout=config.http_timeout,
+    max_retries=config.http_max_retries,
+    backoff_factor=config.http_backoff_factor,
+    max_download_bytes=config.max_download_mb * 1024 * 1024,
+    spool_memory_bytes=config.spool_memory_mb * 1024 * 1024
+)
+response_cache = ResponseCache(
+    max_entries=config.response_cache_entries,
+    max_bytes=config.response_cache_mb * 1024 * 1024
+)
+snapshot_cache = SnapshotCache(config.snapshot_cache_dir) if config.enable_data_caching else None
+map_builder = MapBuilder(config.map_cache_dir)
+asset_manifest = AssetManifest(app.static_folder, config.asset_dir)
+shared_dataset = SharedDataset(config.shared_data_dir)
+refresh_lease = RefreshLease(os.path.join(config.shared_data_dir, 'refresh.lock'),
+                             timeout=config.refresh_lease_timeout)
+link_status = LinkStatusStore(config.link_status_file)
+change_log = ChangeLog(config.change_history, max_bytes=config.change_history_mb * 1024 * 1024)
+
+# Typeahead suggestions per keystroke (default and maximum k)
+SUGGEST_LIMIT = 8
+MAX_SUGGEST_LIMIT = 50
 
-# Global data storage
-teams_data: Optional[pd.DataFrame] = None
-countries = []
-leagues = []
-sports = []
+# Map artifacts and fingerprinted assets are content-addressed, so browsers and CDNs may keep them forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Global data storage: the current snapshot is replaced wholesale, never mutated.
+# Handlers read it once into a local so a concurrent refresh cannot mix states.
+snapshot: Optional[DataSnapshot] = None
 country_coordinates = {}
-last_data_refresh = None
+
+# One-time initialization state (see init_app)
+_init_lock = threading.Lock()
+_initialized = False
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def clean_teams_data(df):
+    """Fill blanks and keep only the columns the dashboard serves"""
+    df = df.fillna('')
+    
+    # Memory optimization: only keep essential columns
+    essential_cols = ['Team', 'Country', 'League', 'Sports', 'Twitter', 'Facebook', 'Instagram', 'Official Page', 'Other Links']
+    available_cols = [col for col in essential_cols if col in df.columns]
+    return df[available_cols].reset_index(drop=True)
+
+def publish_snapshot(df, generation, source, version, loaded_at=None, plain_bytes=None):
+    """
+    Build a snapshot (indexes, clusters, map) and swap it in with a single reference assignment
+    
+    Args:
+        df: Cleaned teams data to serve
+        generation: Dataset generation number
+        source: Provider the data came from
+        version: Validators of the source revision, if known
+        loaded_at: When the data was loaded, if not now (e.g. by another worker)
+        plain_bytes: Size of the frame as cleaned, if df is a re-encoded copy
+    """
+    global snapshot
+    # Diffed against the served snapshot, so only changed rows and names are re-indexed
+    built = DataSnapshot.build(df, generation=generation, source=source, source_version=version,
+                               compact=config.reduce_memory_usage,
+                               coordinates=get_country_coordinates(),
+                               plain_bytes=plain_bytes,
+                               previous=snapshot)
+    # The map is part of the snapshot: rendered (or reused) before it is published
+    built = replace(built, map_file=generate_map(built), loaded_at=loaded_at or built.loaded_at)
+    snapshot = built
+    change_log.record(built.content_id, built.rows, built.changes)
+    response_cache.clear()
+    
+    if built.changes is not None:
+        logger.info(f"Generation {generation}: {len(built.changes.added)} teams added, "
+                    f"{len(built.changes.updated)} updated, {len(built.changes.removed)} removed")
+
+def attach_shared_generation(previous, requested_at=None):
+    """
+    Serve a generation another worker already published, instead of loading it again
+    
+    A generation is current if it was loaded within the refresh interval,
+    or after requested_at (the lease holder loaded it while this worker
+    waited). If it is the generation already served, only the refresh
+    interval restarts. Fallback data the lease holder published while the
+    configured source was failing is attached too, within the retry delay,
+    so the other workers do not try the failing source themselves.
+    
+    Args:
+        previous: Snapshot currently served, if any
+        requested_at: When this worker decided to refresh
+    
+    Returns:
+        DataSnapshot: The new snapshot, or None if this worker has to load the data
+    """
+    global snapshot
+    pointer = shared_dataset.current()
+    if pointer is None:
+        return None
+    if pointer.get('source') != config.database.provider and not pointer.get('fallback'):
+        return None
+    loaded_at = datetime.fromisoformat(pointer['loaded_at'])
+    refresh_interval = timedelta(minutes=config.database.refresh_interval_minutes)
+    if pointer.get('fallback'):
+        # Only until the source is due to be retried, so a new worker finds out if it recovered
+        refresh_interval = min(refresh_interval, timedelta(seconds=config.database.refresh_retry_seconds))
+    if datetime.now() - loaded_at > refresh_interval and \
+            (requested_at is None or loaded_at < requested_at):
+        return None
+    if previous is not None and pointer['generation'] <= previous.generation:
+        if pointer['generation'] == previous.generation and previous.source == pointer['source']:
+            # The lease holder found the source unchanged
+            snapshot = replace(previous, loaded_at=max(previous.loaded_at, loaded_at))
+            return snapshot
+        return None
+    
+    attached = shared_dataset.attach(pointer)
+    if attached is None:
+        return None
+    
+    publish_snapshot(attached.teams, attached.generation, attached.source, attached.version,
+                     loaded_at=attached.loaded_at, plain_bytes=attached.plain_bytes)
+    if attached.fallback:
+        logger.warning(f"Attached shared dataset generation {attached.generation} "
+                       f"({len(attached.teams)} teams): fallback data from {attached.source}")
+    else:
+        logger.info(f"Attached shared dataset generation {attached.generation} ({len(attached.teams)} teams)")
+    return snapshot
+
 def load_data():
-    """Load basketball teams data from configured source"""
-    global teams_data, countries, leagues, sports, last_data_refresh
+    """
+    Load basketball teams data from configured source and publish a new snapshot
+    
+    The snapshot (frame, filter lists, indexes) is built completely before
+    it replaces the current one with a single reference swap. A fresh
+    generation published by another worker is attached instead. Otherwise
+    only the worker holding the refresh lease loads from the source (and
+    builds the map); workers that waited for the lease attach the
+    generation it published.
+    """
+    requested_at = datetime.now()
+    attached = attach_shared_generation(snapshot, requested_at)
+    if attached is not None:
+        return attached.teams
+    
+    with refresh_lease.hold():
+        # Another worker may have loaded the data while this one waited
+        attached = attach_shared_generation(snapshot, requested_at)
+        if attached is not None:
+            return attached.teams
+        return load_from_source()
+
+def load_from_source():
+    """Fetch, clean and publish the data from the configured provider (see load_data)"""
+    global snapshot
+    previous = snapshot
+    source = config.database.provider
+    
+    # Set when the source failed and fallback data is published instead
+    fallback = False
+    
+    # On a cold start the on-disk snapshot stands in for the previous load
+    cached = None
+    if previous is None and snapshot_cache is not None:
+        cached = snapshot_cache.load_latest(source)
+    
+    # Validators of the loaded data, so an unchanged source is not downloaded again
+    if previous is not None:
+        known_version = previous.source_version if previous.source == source else None
+    else:
+        known_version = cached.version if cached else None
     
     try:
         if config.database.provider == 'local':
-            # Load from local Excel file (fallback) - optimized for memory
-            df = pd.read_excel("Basketball Sources Links.xlsx", 
-                             dtype_backend='numpy_nullable',  # More memory efficient
-                             engine='openpyxl')
+            version = SourceVersion.from_file("Basketball Sources Links.xlsx")
+            df = None
+            if not version.matches(known_version):
+                # Load from local Excel file (fallback) - optimized for memory
+                df = pd.read_excel("Basketball Sources Links.xlsx", 
+                                 dtype_backend='numpy_nullable',  # More memory efficient
+                                 engine='openpyxl')
         else:
-            # Load from cloud provider
-            df = data_service.fetch_excel_data(
+            # Load from cloud provider, skipped when the source is unchanged
+            df, version = data_service.fetch_excel_data_if_changed(
                 config.database.provider, 
-                config.database.config
+                config.database.config,
+                known_version
             )
         
-        # Clean the data efficiently
-        df = df.fillna('')
-        
-        # Memory optimization: only keep essential columns
-        essential_cols = ['Team', 'Country', 'League', 'Sports', 'Twitter', 'Facebook', 'Instagram', 'Official Page', 'Other Links']
-        available_cols = [col for col in essential_cols if col in df.columns]
-        df = df[available_cols]
+        if df is None and previous is not None:
+            # Same data: keep the generation (and cached responses), restart the interval
+            snapshot = replace(previous, loaded_at=datetime.now())
+            # Other workers restart their interval instead of checking the source too
+            shared_dataset.renew(previous.generation, snapshot.loaded_at)
+            logger.info(f"Data source {source} unchanged since generation {previous.generation}")
+            return previous.teams
         
-        teams_data = df
-
-        # Update global filter options with memory optimization
-        countries = sorted(df['Country'].unique().tolist())
-        leagues = sorted(df['League'].unique().tolist())
-        sports = sorted(df['Sports'].unique().tolist())
-
-        last_data_refresh = datetime.now()
-        
-        logger.info(f"Successfully loaded {len(df)} teams from {config.database.provider}")
-        return df
+        if df is None:
+            # Cold start and the source matches the on-disk snapshot: no parse needed
+            df = cached.teams
+            logger.info(f"Loaded {source} data from snapshot cache ({cached.saved_at:%Y-%m-%d %H:%M})")
+        else:
+            # Clean the data efficiently
+            df = clean_teams_data(df)
+            if snapshot_cache is not None:
+                snapshot_cache.save(df, source, version)
         
     except Exception as e:
         logger.error(f"Error loading data: {str(e)}")
-        # Try to load fallback local file
-        try:
-            df = pd.read_excel("Basketball Sources Links.xlsx")
-            df = df.fillna('')
-            teams_data = df
-            countries = sorted(df['Country'].unique())
-            leagues = sorted(df['League'].unique())
-            sports = sorted(df['Sports'].unique())
-            last_data_refresh = datetime.now()
-            logger.warning("Loaded fallback local data due to cloud provider error")
-            return df
-        except Exception as fallback_error:
-            logger.error(f"Failed to load fallback data: {str(fallback_error)}")
+        if previous is not None:
+            # Keep serving the last good snapshot rather than the bundled workbook
             raise
+        
+        # Prefer the last successfully loaded data over re-parsing the bundled workbook
+        fallback = True
+        latest = snapshot_cache.load_latest() if snapshot_cache is not None else None
+        if latest is not None:
+            df, source, version = latest.teams, latest.source, latest.version
+            logger.warning(f"Loaded snapshot cache from {latest.saved_at:%Y-%m-%d %H:%M} due to data source error")
+        else:
+            # Try to load fallback local file
+            try:
+                df = clean_teams_data(pd.read_excel("Basketball Sources Links.xlsx"))
+                source = 'local_fallback'
+                version = None
+                logger.warning("Loaded fallback local data due to cloud provider error")
+            except Exception as fallback_error:
+                logger.error(f"Failed to load fallback data: {str(fallback_error)}")
+                raise
+    
+    generation = previous.generation + 1 if previous else 1
+    
+    # Generation numbers are shared too, so workers agree which one is newest
+    pointer = shared_dataset.current()
+    if pointer is not None:
+        generation = max(generation, pointer['generation'] + 1)
+    try:
+        shared_dataset.publish(df, generation, source, version, datetime.now(), fallback=fallback)
+    except Exception as e:
+        # The other workers load from the source themselves when their turn comes
+        logger.warning(f"Could not publish shared dataset: {str(e)}")
+    
+    publish_snapshot(df, generation, source, version)
+    
+    logger.info(f"Successfully loaded {len(df)} teams from {source} (generation {generation})")
+    return df
+
+refresher = BackgroundRefresher(load_data, retry_seconds=config.database.refresh_retry_seconds)
+
+def create_link_checker():
+    return LinkChecker(
+        link_status,
+        timeout=config.link_check_timeout,
+        concurrency=config.link_check_concurrency,
+        per_host=config.link_check_per_host,
+        ttl=timedelta(hours=config.link_check_ttl_hours)
+    )
+
+def check_links():
+    """Scheduled link check: one worker per instance runs it, the others skip"""
+    with RefreshLease(config.link_status_file + '.lock', timeout=0).hold() as leader:
+        current = snapshot
+        if leader and current is not None:
+            create_link_checker().check(extract_links(current.teams))
+
+link_refresher = BackgroundRefresher(check_links, retry_seconds=config.database.refresh_retry_seconds)
+_next_link_check = 0.0
+
+def link_check_due():
+    """Whether the persisted link results are older than the check interval (stat at most once a minute)"""
+    global _next_link_check
+    if config.link_check_interval_hours <= 0 or time.monotonic() < _next_link_check:
+        return False
+    _next_link_check = time.monotonic() + 60
+    try:
+        age = time.time() - os.path.getmtime(link_status.path)
+    except FileNotFoundError:
+        return True
+    return age > config.link_check_interval_hours * 3600
+
+# Workers forked from a preloading master must not share its keep-alive sockets
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=data_service.close)
+
+def encode_cursor(data_version: str, row: int) -> str:
+    """
+    Opaque pagination cursor pointing at the first row of the next page
+    
+    Row positions are only stable within one version of the data, so the
+    cursor carries the content id of the snapshot it was issued for.
+    """
+    return base64.urlsafe_b64encode(f"{data_version}:{row}".encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    """
+    Inverse of encode_cursor; raises ValueError for malformed cursors
+    
+    Returns:
+        tuple: (data version, or None for cursors issued before versions; row)
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data_version, _, row = base64.urlsafe_b64decode(padded.encode()).decode().rpartition(':')
+        row = int(row)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if row < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return data_version or None, row
 
 def should_refresh_data():
     """Check if data should be refreshed based on configured interval"""
-    if last_data_refresh is None:
+    current = snapshot
+    if current is None:
         return True
     
     refresh_interval = timedelta(minutes=config.database.refresh_interval_minutes)
-    return datetime.now() - last_data_refresh > refresh_interval
+    return datetime.now() - current.loaded_at > refresh_interval
+
+@app.before_request
+def refresh_if_stale():
+    """Stale-while-revalidate: serve the current snapshot, refresh in the background"""
+    if request.endpoint in ('static', 'asset', 'map_artifact'):
+        return
+    if not _initialized:
+        # Entry points that skip create_app() initialize on the first request
+        init_app()
+    elif should_refresh_data() or shared_dataset.changed():
+        # Stale data, or another worker published a new shared generation
+        refresher.trigger()
+    elif link_check_due():
+        link_refresher.trigger()
 
 def get_country_coordinates():
     """Load country coordinates from JSON file"""
@@ -113,174 +391,481 @@ def get_country_coordinates():
         country_coordinates = load_country_coordinates()
     return country_coordinates
 
-def generate_map():
-    """Generate the world map with team markers - optimized for cost reduction"""
-    # Skip map generation if teams_data is None to save resources
-    if teams_data is None:
-        logger.warning("No teams data available for map generation")
-        return
+def generate_map(current):
+    """
+    Build (or reuse) the map artifact for a snapshot that is about to be published
     
-    # Check if map file exists and is recent (cache for 24 hours to reduce processing)
-    map_file = 'static/map.html'
-    if os.path.exists(map_file):
-        file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(map_file))
-        if file_age.total_seconds() < 86400:  # 24 hours
-            logger.info("Using cached map file to save resources")
-            return
-    
-    # Create a lightweight map centered on a default location
-    m = folium.Map(location=[20, 0], zoom_start=2, tiles='OpenStreetMap')
-    
-    coordinates = get_country_coordinates()
-    
-    # Optimize data processing for memory efficiency
+    Returns:
+        str: Artifact file name, or None if the map could not be built
+    """
     try:
-        country_counts = teams_data['Country'].value_counts().reset_index()
-        country_counts.columns = ['Country', 'Count']
-        
-        # Limit markers to top 20 countries to reduce map size
-        country_counts = country_counts.head(20)
-        
-        # Add markers to the map with optimized popup
-        for _, row in country_counts.iterrows():
-            country_name = row['Country']
-            if country_name in coordinates:
-                # Simplified popup for better performance
-                popup_html = f"""
-                <div style="width: 150px;">
-                    <b>{country_name}</b><br>
-                    {row['Count']} teams<br>
-                    <a href="/?country={country_name}" target="_top">View</a>
-                </div>
-                """
-                
-                folium.Marker(
-                    location=coordinates[country_name],
-                    popup=folium.Popup(popup_html, max_width=200),
-                    tooltip=f"{country_name}: {row['Count']} teams",
-                    icon=folium.Icon(color='orange', icon='info-sign')
-                ).add_to(m)
-        
-        # Save map to a template file
-        os.makedirs('static', exist_ok=True)
-        m.save(map_file)
-        logger.info("Map generated and cached successfully")
-        
+        return map_builder.build(current.teams, get_country_coordinates())
     except Exception as e:
+        # The dashboard works without the map; keep the data load going
         logger.error(f"Error generating map: {str(e)}")
-        # Create a simple fallback map
-        m.save('static/map.html')
+        return None
+
+def map_url(current):
+    """URL of the snapshot's map artifact, or None if there is none"""
+    if current is None or current.map_file is None:
+        return None
+    return url_for('map_artifact', filename=current.map_file)
 
 @app.route('/health')
 def health_check():
     """Health check endpoint for load balancer"""
+    current = snapshot
+    link_status.reload()
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'version': '2.0.0',
         'data_provider': config.database.provider,
-        'last_refresh': last_data_refresh.isoformat() if last_data_refresh else None
+        'data_source': current.source if current else None,
+        'last_refresh': current.loaded_at.isoformat() if current else None,
+        'data_generation': current.generation if current else 0,
+        'data_version': current.content_id if current else None,
+        'data_memory': current.memory if current else None,
+        'map_file': current.map_file if current else None,
+        'refresh': refresher.status(),
+        'ingestion': data_service.last_fetch,
+        'response_cache': response_cache.stats(),
+        'change_history': change_log.stats(),
+        'links': link_status.summary()
     })
 
 @app.route('/')
 def index():
     """Main dashboard page - optimized for cost reduction"""
-    # Only refresh data if absolutely necessary (cost optimization)
-    if should_refresh_data():
-        try:
-            load_data()
-        except Exception as e:
-            logger.error(f"Failed to refresh data: {str(e)}")
-            flash(f"Warning: Using cached data due to refresh error", 'warning')
-    
-    # Generate map only if it doesn't exist or is very old (cost optimization)
-    if not os.path.exists('static/map.html') or should_refresh_data():
-        generate_map()
+    # Data and map refreshes run in the background (see refresh_if_stale)
+    current = snapshot
+    if refresher.last_error:
+        flash(f"Warning: Using cached data due to refresh error", 'warning')
     
     return render_template('index.html', 
-                          countries=countries,
-                          leagues=leagues,
-                          sports=sports,
-                          last_refresh=last_data_refresh)
+                          countries=current.countries if current else [],
+                          leagues=current.leagues if current else [],
+                          sports=current.sports if current else [],
+                          last_refresh=current.loaded_at if current else None,
+                          map_url=map_url(current))
+
+def etag_matches(etag):
+    """
+    Whether If-None-Match names etag, by weak comparison (RFC 9110, 13.1.2)
+    
+    Only concrete entity tags count: "*" would answer 304 for a response
+    the client never received, so it is ignored.
+    """
+    return etag in request.if_none_match.as_set(include_weak=True)
+
+def cached_json_response(current, compute, version=None):
+    """
+    Serve a JSON API response from the content-keyed response cache
+    
+    The ETag is derived from the cache key, so a matching If-None-Match is
+    answered with 304 before the cache or the data is touched at all. The
+    key holds the snapshot's content id rather than its generation number,
+    which restarts at 1 in every process and would let a 304 confirm data
+    another instance (or an earlier run) served under the same number.
+    version identifies any other input of the response (e.g. link results).
+    """
+    data_version = current.content_id if version is None else f"{current.content_id}.{version}"
+    key = ResponseCache.make_key(data_version, request.path, request.args.items(multi=True))
+    etag = ResponseCache.etag(key)
+    
+    if etag_matches(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    body = response_cache.get(key) if config.enable_data_caching else None
+    if body is None:
+        result = compute(current)
+        response = app.make_response(result)
+        if response.status_code != 200:
+            return response
+        body = response.get_data()
+        if config.enable_data_caching:
+            response_cache.put(key, body)
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/teams')
 def get_teams():
     """API endpoint to get filtered teams data"""
-    if teams_data is None:
+    current = snapshot
+    if current is None:
         return jsonify({'error': 'No data available'}), 500
     
-    # Get query parameters
-    country = request.args.get('country', '')
-    league = request.args.get('league', '')
-    sport = request.args.get('sport', '')
+    version = None
+    if wants_link_status():
+        link_status.reload()
+        version = link_status.version
+    return cached_json_response(current, query_teams, version=version)
+
+def wants_link_status():
+    return request.args.get('link_status', '').lower() in ('1', 'true', 'yes', 'on')
+
+def with_link_status(teams):
+    """Add each team's link check results (link_status=1): column -> status, for non-empty links"""
+    for team in teams:
+        statuses = {}
+        for column in LINK_COLUMNS:
+            result = link_status.status(team.get(column))
+            if result is not None:
+                statuses[column] = result.status
+        team['link_status'] = statuses
+    return teams
+
+def requested_columns(teams_data):
+    """
+    Column positions for the `fields` projection (comma-separated column names)
+    
+    Returns:
+        list or slice: Positions for .iloc, or slice(None) for every column
+    """
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    unknown = [field for field in fields if field not in teams_data.columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [teams_data.columns.get_loc(field) for field in fields] if fields else slice(None)
+
+def filter_criteria():
+    """The request's team filters, as keyword arguments for TeamIndex.select()"""
     search = request.args.get('search', '')
-    gender = request.args.get('gender', '')
-    
-    # Filter data based on parameters
-    filtered_data = teams_data
-    
-    if country:
-        filtered_data = filtered_data[filtered_data['Country'] == country]
-    
-    if league:
-        filtered_data = filtered_data[filtered_data['League'] == league]
-    
-    if sport:
-        filtered_data = filtered_data[filtered_data['Sports'] == sport]
-    
-    if gender:
-        # Filter by gender based on league names
-        if gender == 'men':
-            # Men's basketball: contains "NCAA" but not "Women"
-            mask = (filtered_data['League'].str.contains('NCAA', case=False, na=False)) & \
-                   (~filtered_data['League'].str.contains('Women', case=False, na=False))
-            filtered_data = filtered_data[mask]
-        elif gender == 'women':
-            # Women's basketball: contains both "NCAA" and "Women"
-            mask = (filtered_data['League'].str.contains('NCAA', case=False, na=False)) & \
-                   (filtered_data['League'].str.contains('Women', case=False, na=False))
-            filtered_data = filtered_data[mask]
-    
-    if search:
+    return {
+        # Equality filters, resolved through the inverted index
+        'country': request.args.get('country', ''),
+        'league': request.args.get('league', ''),
+        'sport': request.args.get('sport', ''),
         # Support for multiple team searches (comma-separated)
-        search_terms = [term.strip().lower() for term in search.split(',')]
-        
-        # Create a mask to filter teams that match any of the search terms
-        mask = filtered_data['Team'].str.lower().apply(
-            lambda x: any(term in x for term in search_terms)
-        )
+        'search': [term.strip().lower() for term in search.split(',')] if search else None,
+        # Men's: NCAA leagues without "Women"; women's: NCAA leagues with "Women"
+        'gender': request.args.get('gender', ''),
+        # Social media presence flags precomputed at load time
+        'flags': {
+            flag: True for flag in TeamIndex.LINK_FLAGS
+            if request.args.get(flag, '').lower() in ('1', 'true', 'yes', 'on')
+        }
+    }
+
+def filtered_rows(current):
+    """Sorted row positions of the teams matching the request's filters"""
+    return current.index.select(**filter_criteria())
+
+def query_teams(current):
+    """Filter, paginate and serialize teams for the current request"""
+    teams_data = current.teams
+    rows = filtered_rows(current)
+    
+    try:
+        columns = requested_columns(teams_data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Without limit/cursor keep the original response: a bare list of every match
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        teams_list = teams_data.iloc[rows, columns].to_dict('records')
+        if wants_link_status():
+            with_link_status(teams_list)
+        return jsonify(teams_list)
+    
+    # Keyset pagination over row positions, which are already in workbook order
+    try:
+        limit = int(request.args.get('limit', config.page_size))
+        cursor_version, start_row = decode_cursor(request.args['cursor']) \
+            if request.args.get('cursor') else (current.content_id, 0)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not 1 <= limit <= config.max_page_size:
+        return jsonify({'error': f"limit must be between 1 and {config.max_page_size}"}), 400
+    if cursor_version != current.content_id:
+        # Rows were added or removed since: continuing would skip or repeat teams
+        return jsonify({
+            'error': 'The data changed since this cursor was issued, start again from the first page',
+            'version': current.content_id
+        }), 410
+    
+    start = int(np.searchsorted(rows, start_row))
+    page = rows[start:start + limit]
+    next_cursor = encode_cursor(current.content_id, int(rows[start + limit])) \
+        if start + limit < len(rows) else None
+    
+    # Only the page is converted to dictionaries for the JSON response
+    teams_page = teams_data.iloc[page, columns].to_dict('records')
+    if wants_link_status():
+        with_link_status(teams_page)
+    return jsonify({
+        'teams': teams_page,
+        'total': int(len(rows)),
+        'limit': limit,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/teams/export')
+def export_teams():
+    """
+    Stream every team matching the /api/teams filters as a download
+    
+    format=csv (default), ndjson or xlsx; fields projects columns as in
+    /api/teams. Rows are serialized chunk by chunk while the response is
+    sent, so memory does not grow with the number of matches. An XLSX file
+    can only be sent once it is complete, so XLSX exports of more than
+    EXPORT_XLSX_MAX_ROWS teams are refused with 413 (the request would
+    outlive the worker timeout); CSV and NDJSON have no limit.
+    """
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
+    
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in TeamExporter.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(TeamExporter.FORMATS)}"}), 400
+    try:
+        columns = requested_columns(current.teams)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Same data and arguments, same file: let daily pulls revalidate for free
+    etag = ResponseCache.etag(
+        ResponseCache.make_key(current.content_id, request.path, request.args.items(multi=True))
+    )
+    if etag_matches(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    rows = filtered_rows(current)
+    if export_format == 'xlsx' and len(rows) > config.export_xlsx_max_rows:
+        return jsonify({
+            'error': f"{len(rows)} teams match, XLSX exports are limited to {config.export_xlsx_max_rows}; "
+                     f"narrow the filters or use format=csv or format=ndjson",
+            'total': int(len(rows))
+        }), 413
+    
+    mimetype, extension = TeamExporter.FORMATS[export_format]
+    exporter = TeamExporter(current.teams, rows, columns)
+    response = Response(exporter.stream(export_format), mimetype=mimetype)
+    response.headers['Content-Disposition'] = \
+        f'attachment; filename="teams-{current.generation}.{extension}"'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/changes')
+def get_changes():
+    """
+    Teams added, updated and removed since a data version: since=<version>
+    
+    Lets integrations sync with deltas instead of full downloads. Rows are
+    identified by key: team, country and league ("Aguada (Uruguay, FIBA
+    Women)"), numbered from the second identical row on. Added and updated
+    teams are full records (fields projects columns as in /api/teams),
+    removed ones are keys. The response carries the version to ask from
+    next time; /health reports the current one as data_version.
+    Versions are content ids, so they mean the same on every instance and
+    after restarts. Versions older than CHANGE_HISTORY refreshes (or never
+    seen by this worker) are answered with 410: download /api/teams again.
+    """
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
+    
+    return cached_json_response(current, query_changes)
+
+def query_changes(current):
+    """Diff the row hashes of the requested version against the current ones"""
+    since = request.args.get('since', '').strip()
+    if not since:
+        return jsonify({'error': 'since must be a data version'}), 400
+    try:
+        columns = requested_columns(current.teams)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    changes = change_log.diff(since, current.rows) if current.rows is not None else None
+    if changes is None:
+        return jsonify({
+            'error': f"Changes since version {since} are not available, download /api/teams again",
+            'version': current.content_id,
+            'generation': current.generation,
+            'available': change_log.versions()
+        }), 410
+    
+    def records(rows):
+        teams = current.teams.iloc[rows, columns].to_dict('records')
+        return [dict(key=key, **team) for key, team in zip(current.rows.keys(rows), teams)]
+    
+    return jsonify({
+        'since': since,
+        'version': current.content_id,
+        'generation': current.generation,
+        'added': records(changes.added),
+        'updated': records(changes.updated),
+        'removed': changes.removed_keys
+    })
+
+@app.route('/api/facets')
+def get_facets():
+    """
+    Team counts per filter option under the request's filters (same parameters as /api/teams)
+    
+    Each facet ignores its own filter, so the counts show what choosing
+    another value would yield.
+    """
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
+    
+    return cached_json_response(current, lambda current: jsonify(current.index.facets(**filter_criteria())))
+
+@app.route('/api/suggest')
+def suggest():
+    """Typeahead: the best k team, league and country names with a word starting with q"""
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
+    
+    def query_suggest(current):
+        try:
+            k = int(request.args.get('k', SUGGEST_LIMIT))
+        except ValueError:
+            return jsonify({'error': 'k must be an integer'}), 400
+        if not 1 <= k <= MAX_SUGGEST_LIMIT:
+            return jsonify({'error': f"k must be between 1 and {MAX_SUGGEST_LIMIT}"}), 400
         
-        filtered_data = filtered_data[mask]
+        query = request.args.get('q', '')
+        return jsonify({'query': query, 'suggestions': current.suggest.suggest(query, k)})
+    
+    return cached_json_response(current, query_suggest)
+
+@app.route('/api/teams/<path:team_name>/similar')
+def similar_teams(team_name):
+    """Up to k teams from the same country and league as the named team"""
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
     
-    # Convert to list of dictionaries for JSON response
-    teams_list = filtered_data.to_dict('records')
+    return cached_json_response(current, lambda current: query_similar(current, team_name))
+
+def query_similar(current, team_name):
+    """Serialize the precomputed (country, league) neighbours of a team"""
+    row = current.index.team_row(team_name)
+    if row is None:
+        return jsonify({'error': 'Team not found'}), 404
+    
+    try:
+        k = int(request.args.get('k', 5))
+        columns = requested_columns(current.teams)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not 1 <= k <= config.max_page_size:
+        return jsonify({'error': f"k must be between 1 and {config.max_page_size}"}), 400
     
-    return jsonify(teams_list)
+    rows = current.index.similar(row, k)
+    return jsonify({
+        'team': team_name,
+        'similar': current.teams.iloc[rows, columns].to_dict('records')
+    })
+
+@app.route('/api/map/clusters')
+def map_clusters():
+    """Team clusters in a map viewport: bbox=west,south,east,north&zoom=z"""
+    current = snapshot
+    if current is None:
+        return jsonify({'error': 'No data available'}), 500
+    
+    return cached_json_response(current, query_clusters)
+
+def query_clusters(current):
+    """Answer a viewport query from the snapshot's precomputed cluster grid"""
+    try:
+        bbox = [float(value) for value in request.args.get('bbox', '-180,-90,180,90').split(',')]
+        if len(bbox) != 4 or not all(np.isfinite(bbox)):
+            raise ValueError("bbox must be west,south,east,north")
+        bbox = ClusterIndex.normalize_bbox(*bbox)
+        zoom = int(request.args.get('zoom', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(current.clusters.query(bbox, zoom, limit=config.max_page_size))
 
 @app.route('/team/<team_name>')
 def team_detail(team_name):
     """Individual team detail page"""
-    if teams_data is None:
+    current = snapshot
+    if current is None:
         return "Data not available", 500
     
-    # Find the team by name
-    team = teams_data[teams_data['Team'] == team_name]
+    # Find the team by name (hash lookup; first row wins for duplicate names)
+    row = current.index.team_row(team_name)
     
-    if team.empty:
+    if row is None:
         return "Team not found", 404
     
     # Convert to dictionary for template
-    team_data = team.iloc[0].to_dict()
+    team_data = current.teams.iloc[row].to_dict()
     
-    return render_template('team_detail.html', team=team_data)
+    link_status.reload()
+    statuses = {column: link_status.status(team_data.get(column)) for column in LINK_COLUMNS}
+    return render_template('team_detail.html', team=team_data, link_status=statuses)
 
 @app.route('/map')
 def map_view():
     """Dedicated map page"""
-    # Generate the map
-    generate_map()
+    # The map was rendered when the snapshot was built
+    return render_template('map_container.html', map_url=map_url(snapshot))
+
+def send_immutable(directory, filename):
+    """
+    Serve a content-hashed file with long-lived cache headers
+    
+    A pre-compressed variant is sent when the client accepts its encoding
+    (brotli before gzip), so nothing is compressed per request.
+    """
+    directory = os.path.abspath(directory)
+    path = safe_join(directory, filename)
+    encodings = available_encodings(path) if path else []
+    encoding = request.accept_encodings.best_match(encodings) if encodings else None
+    
+    if encoding:
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(directory, filename + ENCODING_SUFFIXES[encoding],
+                                       mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(directory, filename, max_age=IMMUTABLE_MAX_AGE)
     
-    return render_template('map_container.html')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/map/<filename>')
+def map_artifact(filename):
+    """Serve a content-hashed map artifact"""
+    return send_immutable(map_builder.directory, filename)
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve a fingerprinted copy of a static file (see asset_url)"""
+    return send_immutable(asset_manifest.output_dir, filename)
+
+def asset_url(filename):
+    """URL of the fingerprinted copy of a static file; the plain static URL if it was not built"""
+    hashed = asset_manifest.get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('asset', filename=hashed)
+
+@app.context_processor
+def asset_helpers():
+    """Make asset_url available to every template"""
+    return {'asset_url': asset_url}
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -291,31 +876,44 @@ def internal_error(error):
     logger.error(f"Internal server error: {str(error)}")
     return render_template('500.html'), 500
 
-def create_app():
-    """Application factory for testing and deployment"""
-    global teams_data, countries, leagues, sports, last_data_refresh
+def init_app():
+    """
+    Load data and build the map exactly once per process
     
-    # Initialize data on startup
-    try:
-        load_data()
-        generate_map()
-        logger.info("Application initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize application: {str(e)}")
+    Importing this module has no side effects; the first call does the
+    work and later (or concurrent) calls return immediately.
+    """
+    global _initialized
+    if _initialized:
+        return app
+    
+    with _init_lock:
+        if _initialized:
+            return app
+        
+        started = datetime.now()
+        try:
+            # Normally built at deploy time (bin/post_compile); cheap when it is current
+            asset_manifest.ensure()
+        except Exception as e:
+            logger.warning(f"Could not build static assets, serving them unversioned: {str(e)}")
+        try:
+            load_data()
+            logger.info(f"Application initialized successfully in "
+                        f"{(datetime.now() - started).total_seconds():.2f}s")
+        except Exception as e:
+            logger.error(f"Failed to initialize application: {str(e)}")
+        _initialized = True
     
     return app
 
-# Initialize the application for production deployment
-if not teams_data:
-    try:
-        load_data()
-        generate_map()
-        logger.info("Application initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize application: {str(e)}")
+def create_app():
+    """Application factory for testing and deployment"""
+    return init_app()
 
 if __name__ == '__main__':
     # Run the application
+    create_app()
     app.run(
         host=config.host,
         port=config.port,
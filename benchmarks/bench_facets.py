@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Facet counts benchmark
+Compares filtering plus value_counts() per facet with TeamIndex.facets()
+
+Usage: python benchmarks/bench_facets.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_teams
+from services.team_index import TeamIndex
+
+# Filter combinations, from none to selective
+QUERIES = {
+    'none': {},
+    'country': {'country': 'Italy'},
+    'country+league': {'country': 'United States', 'league': 'NCAA'},
+    'gender+twitter': {'gender': 'women', 'flags': {'has_twitter': True}}
+}
+
+
+def groupby_facets(df, criteria):
+    """Facet counts the direct way: mask the frame, then value_counts() per facet"""
+    def matching(skip):
+        mask = True
+        for param, column in TeamIndex.FILTER_COLUMNS.items():
+            if criteria.get(param) and param != skip:
+                mask = mask & (df[column] == criteria[param])
+        if criteria.get('gender') and skip != 'gender':
+            league = df['League']
+            mask = mask & league.str.contains('NCAA') & \
+                (league.str.contains('Women') == (criteria['gender'] == 'women'))
+        for flag in criteria.get('flags', {}):
+            if flag != skip:
+                mask = mask & (df[TeamIndex.LINK_FLAGS[flag]] != '')
+        return df if mask is True else df[mask]
+
+    result = {'total': len(matching(None))}
+    for param, column in TeamIndex.FILTER_COLUMNS.items():
+        result[param] = matching(param)[column].value_counts().to_dict()
+    league = matching('gender')['League']
+    ncaa = league[league.str.contains('NCAA')]
+    result['gender'] = {'men': int((~ncaa.str.contains('Women')).sum()),
+                        'women': int(ncaa.str.contains('Women').sum())}
+    result['links'] = {flag: int((matching(flag)[column] != '').sum())
+                       for flag, column in TeamIndex.LINK_FLAGS.items()}
+    return result
+
+
+def timed(func, repeat):
+    """Best wall time in milliseconds over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        df = generate_teams(size)
+        index = TeamIndex(df)
+
+        print(f"\n{size:,} rows")
+        print(f"{'filters':>16} {'groupby ms':>12} {'index ms':>10} {'speedup':>9} {'matches':>9}")
+
+        repeat = 1 if size >= 500_000 else 5
+        for name, criteria in QUERIES.items():
+            facets = index.facets(**criteria)
+            expected = groupby_facets(df, criteria)
+            assert facets['total'] == expected['total'], "index and groupby disagree"
+            assert {k: v for k, v in facets['country'].items() if v} == \
+                {k: v for k, v in expected['country'].items() if k and v}
+            assert facets['gender'] == expected['gender'] and facets['links'] == expected['links']
+
+            groupby_ms = timed(lambda: groupby_facets(df, criteria), repeat)
+            index_ms = timed(lambda: index.facets(**criteria), 5)
+            print(f"{name:>16} {groupby_ms:>12.2f} {index_ms:>10.3f} "
+                  f"{groupby_ms / index_ms:>8.0f}x {facets['total']:>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Incremental refresh benchmark
+Time to build a snapshot from scratch against updating the previous one
+
+Each refresh edits a small share of the rows (links changed, teams
+renamed, removed and added), the way a workbook changes between loads.
+The incrementally built snapshot must answer exactly like a full build:
+same trigram postings, typeahead entries, flags and filter lists.
+
+Usage: python benchmarks/bench_incremental.py [--sizes 10000 100000] [--changed 0.001]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_teams
+from services.snapshot import DataSnapshot
+
+
+def edit(df, share, rng):
+    """Remove, update, rename and add about share of the rows each"""
+    count = max(1, int(len(df) * share))
+    df = df.drop(index=rng.choice(len(df), count, replace=False)).reset_index(drop=True)
+    updated = rng.choice(len(df), 2 * count, replace=False)
+    df.loc[updated[:count], 'Twitter'] = 'https://twitter.com/changed'
+    df.loc[updated[count:], 'Team'] = [f"Renamed Zebras {i}" for i in range(count)]
+    added = generate_teams(count, seed=int(rng.integers(1 << 30))).assign(Team=lambda d: 'New ' + d['Team'])
+    return pd.concat([df.iloc[:10], added, df.iloc[10:]]).reset_index(drop=True)
+
+
+def same_indexes(a, b):
+    names_a, names_b = a.index.team_names, b.index.team_names
+    if names_a.names != names_b.names or names_a.postings.keys() != names_b.postings.keys():
+        return False
+    if not all(np.array_equal(names_a.postings[gram], names_b.postings[gram]) for gram in names_b.postings):
+        return False
+    if not all(np.array_equal(a.index.flags[flag], b.index.flags[flag]) for flag in b.index.flags):
+        return False
+    suffixes_a = [a.suggest._suffix(i) for i in range(len(a.suggest))]
+    suffixes_b = [b.suggest._suffix(i) for i in range(len(b.suggest))]
+    return suffixes_a == suffixes_b and a.suggest.texts == b.suggest.texts and \
+        (a.countries, a.leagues, a.sports) == (b.countries, b.leagues, b.sports)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--changed', type=float, default=0.001, help="share of rows edited per kind of edit")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    print(f"{'rows':>10} {'changed':>8} {'full s':>8} {'incr s':>8} {'speedup':>8}  result")
+
+    failures = 0
+    for size in args.sizes:
+        df = generate_teams(size)
+        previous = DataSnapshot.build(df, 1, 'local', compact=True)
+        edited = edit(df, args.changed, rng)
+
+        full, full_s = timed(lambda: DataSnapshot.build(edited, 2, 'local', compact=True))
+        incremental, incremental_s = timed(
+            lambda: DataSnapshot.build(edited, 2, 'local', compact=True, previous=previous))
+
+        ok = same_indexes(incremental, full)
+        failures += not ok
+        print(f"{size:>10,} {incremental.changes.changed:>8,} {full_s:>8.2f} {incremental_s:>8.2f} "
+              f"{full_s / incremental_s:>7.1f}x  {'ok' if ok else 'FAIL'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark
+Time to fetch, parse, clean and load the workbook from each cloud provider, under simulated network conditions
+
+Each provider is served by a local stand-in of its API
+(benchmarks/cloud_standins.py) and fetched through DataIntegrationService's
+real code path: token, download with retries and Range resumption, parse
+and clean. The load stage is what the app does next, cleaning for the
+dashboard and building the compact snapshot with its indexes. Scenarios
+add latency, a bandwidth cap, 503s and dropped connections; the server
+counters show how many retries and resumptions a fetch needed.
+
+Every run is checked: the frame must equal the first provider's for the
+same workbook (SharePoint by default), a conditional fetch right after
+must find the source unchanged and download nothing, and under "flaky"
+(the first download refused, the next one cut halfway) the fetch must
+have retried and recovered the cut download. A workbook whose first half
+is at least one HTTP read (HTTP_READ_SIZE) must be resumed with a Range
+request; a smaller one may simply be downloaded again.
+
+Google Drive and S3 are fetched through their real clients (google-auth
+and boto3) against the stand-ins; a provider whose SDK is not installed
+is reported as skipped, which counts as a failure when it was asked for
+explicitly. Azure Files has no stand-in.
+
+Usage: python benchmarks/bench_ingestion.py [--providers sharepoint aws_s3] [--scenarios local flaky] [--sizes 1000 100000]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+# Keep the app's INFO logging out of the table
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.cloud_standins import SCENARIOS, DriveStandIn, S3StandIn, SharePointStandIn
+from benchmarks.synthetic import cached_workbook
+from services.data_integration import DataIntegrationService
+from services.snapshot import DataSnapshot
+
+# Provider -> (stand-in, SDK module the service needs)
+PROVIDERS = {
+    'sharepoint': (SharePointStandIn, None),
+    'google_drive': (DriveStandIn, 'google.auth'),
+    'aws_s3': (S3StandIn, 'boto3')
+}
+
+
+def installed(module):
+    try:
+        return module is None or importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+def ingest(provider, server, service, tmp):
+    """
+    Fetch the workbook from a running stand-in, then fetch it again conditionally
+
+    Returns:
+        tuple: (stage seconds, bytes downloaded, fetched frame,
+                whether the conditional fetch skipped the download)
+    """
+    from app import clean_teams_data
+
+    if provider == 'google_drive':
+        config = server.config(os.path.join(tmp, 'credentials.json'))
+    else:
+        config = server.config()
+
+    df = service.fetch_excel_data(provider, config)
+    fetch = service.last_fetch
+
+    started = time.perf_counter()
+    DataSnapshot.build(clean_teams_data(df), generation=1, source=provider, compact=True)
+    load = time.perf_counter() - started
+
+    # The source did not change: only metadata may be requested
+    version = service.get_source_version(provider, config)
+    downloads = server.stats['downloads']
+    unchanged, _ = service.fetch_excel_data_if_changed(provider, config, version)
+    skipped = version is not None and unchanged is None and server.stats['downloads'] == downloads
+
+    return dict(fetch['seconds'], load=load), fetch['bytes'], df, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--providers', nargs='+', choices=list(PROVIDERS), default=list(PROVIDERS))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--timeout', type=float, default=30, help="service request timeout, seconds")
+    parser.add_argument('--retries', type=int, default=5, help="service retries per request")
+    parser.add_argument('--backoff', type=float, default=0.05, help="service backoff factor, seconds")
+    args = parser.parse_args()
+
+    providers = []
+    failures = 0
+    for provider in args.providers:
+        module = PROVIDERS[provider][1]
+        if installed(module):
+            providers.append(provider)
+        else:
+            print(f"Skipping {provider}: {module} is not installed")
+            failures += provider in sys.argv
+
+    print(f"{'provider':<13} {'scenario':<10} {'rows':>9} {'MB':>6} {'download':>9} {'parse':>7} "
+          f"{'clean':>7} {'load':>7} {'total':>7} {'requests':>9} {'503s':>5} {'drops':>6} {'resumed':>8}  result")
+
+    for rows in args.sizes:
+        workbook = cached_workbook(rows)
+        reference = None
+        for provider in providers:
+            for scenario in args.scenarios:
+                behaviour = SCENARIOS[scenario]
+                service = DataIntegrationService(timeout=args.timeout, max_retries=args.retries,
+                                                 backoff_factor=args.backoff)
+                with PROVIDERS[provider][0](workbook, behaviour) as server, \
+                        tempfile.TemporaryDirectory() as tmp:
+                    try:
+                        seconds, size, df, skipped = ingest(provider, server, service, tmp)
+                    except Exception as e:
+                        failures += 1
+                        print(f"{provider:<13} {scenario:<10} {rows:>9,} FAIL {type(e).__name__}: {e}")
+                        continue
+                stats = server.stats
+
+                problems = []
+                if len(df) != rows or size != len(server.content):
+                    problems.append('incomplete')
+                if reference is None:
+                    reference = df
+                elif not df.equals(reference):
+                    problems.append(f"differs from {providers[0]}")
+                if not skipped:
+                    problems.append('conditional fetch downloaded')
+                if behaviour.failed_downloads and stats['errors'] < behaviour.failed_downloads:
+                    problems.append('no retry')
+                if behaviour.dropped_downloads:
+                    resumable = len(server.content) // 2 >= DataIntegrationService.HTTP_READ_SIZE
+                    if not stats['drops'] or (resumable and not stats['ranges']):
+                        problems.append('no resume')
+                failures += bool(problems)
+
+                print(f"{provider:<13} {scenario:<10} {rows:>9,} {size / 1e6:>6.1f} "
+                      f"{seconds['download']:>9.2f} {seconds['parse']:>7.2f} {seconds['clean']:>7.2f} "
+                      f"{seconds['load']:>7.2f} {sum(seconds.values()):>7.2f} {stats['requests']:>9} "
+                      f"{stats['errors']:>5} {stats['drops']:>6} {stats['ranges']:>8}  "
+                      f"{'FAIL ' + ', '.join(problems) if problems else 'ok'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Workbook download memory benchmark
+Peak RSS of the legacy in-memory download + read_excel vs the spooled download + column-wise parse
+
+Each measurement runs in a fresh subprocess that serves a synthetic workbook
+from a local HTTP server, so peak RSS is not polluted by earlier runs.
+
+Usage: python benchmarks/bench_memory.py [--sizes 20000 100000]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ['legacy', 'streaming']
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (VmHWM on Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux; it may include the parent's peak
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss() -> None:
+    """Start peak tracking from the current RSS (Linux only, best effort)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def serve_directory(directory: str) -> ThreadingHTTPServer:
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(mode: str, workbook: str) -> dict:
+    """Download and parse the workbook once; runs inside the child process"""
+    from io import BytesIO
+
+    import pandas as pd
+    import requests
+
+    from services.data_integration import DataIntegrationService
+
+    server = serve_directory(os.path.dirname(workbook))
+    url = f"http://127.0.0.1:{server.server_port}/{os.path.basename(workbook)}"
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+
+    if mode == 'legacy':
+        response = requests.get(url)
+        df = pd.read_excel(BytesIO(response.content))
+    else:
+        service = DataIntegrationService()
+        df = service._read_excel(service._download_http('bench', url, {}))
+
+    return {'rows': len(df), 'baseline_mb': baseline, 'peak_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20_000, 100_000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'WORKBOOK'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return
+
+    from benchmarks.synthetic import generate_teams
+
+    print(f"{'rows':>9} {'xlsx MB':>8} {'mode':>10} {'peak RSS MB':>12} {'above baseline MB':>18}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            workbook = os.path.join(workdir, f"teams-{size}.xlsx")
+            generate_teams(size).to_excel(workbook, index=False)
+
+            for mode in MODES:
+                result = subprocess.run(
+                    [sys.executable, __file__, '--child', mode, workbook],
+                    cwd=ROOT, capture_output=True, text=True, check=True
+                )
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f"{size:>9,} {os.path.getsize(workbook) / 1e6:>8.2f} {mode:>10} "
+                      f"{stats['peak_mb']:>12.1f} {stats['peak_mb'] - stats['baseline_mb']:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
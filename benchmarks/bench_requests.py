@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Request-path benchmark
+p50/p99 latency and allocations of the main endpoints, compared with a baseline
+
+For each size a synthetic workbook is generated (once; kept under
+cache/bench/) and served by the app in a separate process, booted the way
+a dyno boots it. Every endpoint is requested through the Flask test
+client with the response cache cleared first, so the numbers are those of
+computing the response, not of replaying it. Allocations are the peak
+bytes allocated while serving one request (tracemalloc, in a separate
+pass so tracing does not inflate the latencies). The map is timed too:
+the content-hash check that reuses an artifact, and a full render.
+
+Results are compared with benchmarks/baselines/requests.json: a case
+regresses when its p50 or allocations exceed the baseline by more than
+--threshold, or its p99 by more than --p99-threshold. Baselines depend on the machine; record them with
+--save-baseline on the machine that runs the comparison.
+
+Usage: python benchmarks/bench_requests.py [--sizes 1000 100000 1000000] [--save-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baselines', 'requests.json')
+
+# Endpoints measured; {team} is replaced with a team of the workbook
+ENDPOINTS = [
+    '/',
+    '/team/{team}',
+    '/api/teams?limit=100',
+    '/api/teams?country=Italy&limit=100',
+    '/api/teams?country=Poland&league=FIBA+Women',
+    '/api/teams?search=eagles,owls&limit=100',
+    '/api/teams?gender=women&has_twitter=1&limit=100&fields=Team,Twitter',
+    '/api/facets?country=United+States',
+    '/api/suggest?q=bos',
+    '/api/map/clusters?bbox=-130,20,-60,50&zoom=5',
+    '/health'
+]
+
+# Latencies below this never count as a regression (timer and scheduler noise)
+SLACK_MS = 0.2
+SLACK_KB = 16
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def measure(func, requests, rounds=3):
+    """
+    p50/p99 latency in ms over requests calls, and the peak KB one call allocates
+
+    The calls are made in rounds and the best round is kept: a round that
+    shared the CPU with something else is noise, not the code's speed.
+    """
+    func()
+    p50 = p99 = float('inf')
+    for _ in range(rounds):
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - start) * 1000)
+        p50 = min(p50, percentile(latencies, 50))
+        p99 = min(p99, percentile(latencies, 99))
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(3):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': round(p50, 3),
+        'p99_ms': round(p99, 3),
+        'alloc_kb': round(peak / 1024, 1)
+    }
+
+
+def run_worker(requests):
+    """Serve the workbook in the working directory and print the results as JSON"""
+    from urllib.parse import quote
+
+    started = time.perf_counter()
+    import app as dashboard
+    dashboard.create_app()
+    startup_s = time.perf_counter() - started
+    client = dashboard.app.test_client()
+    current = dashboard.snapshot
+
+    results = {}
+    team = quote(str(current.teams['Team'].iloc[len(current.teams) // 2]), safe='')
+    for endpoint in ENDPOINTS:
+        path = endpoint.format(team=team)
+
+        def get():
+            dashboard.response_cache.clear()
+            response = client.get(path)
+            assert response.status_code == 200, f"{path}: {response.status_code}"
+            response.get_data()
+
+        results[f"GET {endpoint}"] = measure(get, requests)
+
+    coordinates = dashboard.get_country_coordinates()
+    results['generate_map (reuse)'] = measure(lambda: dashboard.generate_map(current), requests)
+    with tempfile.TemporaryDirectory() as directory:
+        def render():
+            builder = dashboard.MapBuilder(directory)
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            builder.build(current.teams, coordinates)
+        results['generate_map (render)'] = measure(render, max(3, requests // 20))
+
+    print(json.dumps({'startup_s': round(startup_s, 2), 'rows': len(current.teams), 'results': results}))
+
+
+def run_size(rows, requests):
+    """Generate (or reuse) the workbook for a size and benchmark it in a fresh process"""
+    from benchmarks.synthetic import cached_workbook
+
+    workdir = os.path.dirname(cached_workbook(rows))
+    # The app reads the workbook and coordinates relative to its working directory
+    if not os.path.exists(os.path.join(workdir, 'data')):
+        os.symlink(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'))
+
+    env = dict(os.environ, PYTHONPATH=ROOT, DATA_PROVIDER='local', LOG_LEVEL='WARNING')
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', '--requests', str(requests)],
+        cwd=workdir, env=env, stdout=subprocess.PIPE, check=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def regressions(current, baseline, threshold, p99_threshold):
+    """Metrics of a case that exceed the baseline by more than their threshold"""
+    worse = []
+    for metric, allowed, slack in (('p50_ms', threshold, SLACK_MS), ('p99_ms', p99_threshold, SLACK_MS),
+                                   ('alloc_kb', threshold, SLACK_KB)):
+        if metric in baseline and current[metric] > baseline[metric] * (1 + allowed) + slack:
+            worse.append(metric)
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--requests', type=int, default=100, help="timed requests per endpoint")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed p50 and allocation growth, 0.25 = 25%%")
+    parser.add_argument('--p99-threshold', type=float, default=1.0,
+                        help="allowed p99 growth; the tail is noisier than the median")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="record these results as the baseline")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.requests)
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    recorded = dict(baseline, machine=platform.machine(), python=platform.python_version())
+    recorded.setdefault('sizes', {})
+    failures = 0
+
+    for rows in args.sizes:
+        run = run_size(rows, args.requests)
+        base = baseline.get('sizes', {}).get(str(rows), {})
+        recorded['sizes'][str(rows)] = run['results']
+
+        print(f"\n{run['rows']:,} rows (startup {run['startup_s']:.1f}s)")
+        print(f"{'case':<72} {'p50 ms':>9} {'p99 ms':>9} {'alloc KB':>10} {'vs base p50':>12}  result")
+        for case, result in run['results'].items():
+            previous = base.get(case)
+            if previous is None:
+                change, status = '', 'new'
+            else:
+                change = f"{100 * (result['p50_ms'] / max(previous['p50_ms'], 1e-6) - 1):+.0f}%"
+                worse = regressions(result, previous, args.threshold, args.p99_threshold)
+                status = 'ok' if not worse else 'SLOWER ' + ','.join(worse)
+                failures += bool(worse)
+            print(f"{case:<72} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+                  f"{result['alloc_kb']:>10.1f} {change:>12}  {status}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(recorded, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {os.path.relpath(args.baseline)}")
+    elif failures:
+        print(f"\n{failures} regression(s) over {args.threshold:.0%} of the baseline")
+
+    sys.exit(1 if failures and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
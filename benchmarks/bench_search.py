@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Team search benchmark
+Compares the legacy per-row substring scan with the trigram index
+
+Usage: python benchmarks/bench_search.py [--sizes 10000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_teams
+from services.team_index import TeamIndex
+
+TERM_COUNTS = [1, 5, 50]
+
+
+def legacy_search(df, terms):
+    """The original get_teams() search branch"""
+    mask = df['Team'].str.lower().apply(lambda x: any(term in x for term in terms))
+    return df[mask]
+
+
+def pick_terms(df, count, rng):
+    """Substrings of real team names, so every term has matches"""
+    names = df['Team'].str.lower().to_numpy()
+    terms = []
+    for name in rng.choice(names, size=count):
+        start = rng.integers(0, max(1, len(name) - 6))
+        terms.append(name[start:start + 6].strip())
+    return terms
+
+
+def timed(func, repeat):
+    """Best wall time in milliseconds over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    for size in args.sizes:
+        df = generate_teams(size)
+
+        start = time.perf_counter()
+        index = TeamIndex(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{size:,} rows (index build {build_ms:,.0f} ms)")
+        print(f"{'terms':>6} {'legacy ms':>12} {'index ms':>12} {'speedup':>9} {'matches':>9}")
+
+        legacy_repeat = 1 if size >= 500_000 else 3
+        for count in TERM_COUNTS:
+            terms = pick_terms(df, count, rng)
+
+            expected = legacy_search(df, terms)
+            rows = index.search(terms, index.all_rows)
+            assert np.array_equal(df.index[rows], expected.index), "index and scan disagree"
+
+            legacy_ms = timed(lambda: legacy_search(df, terms), legacy_repeat)
+            index_ms = timed(lambda: df.iloc[index.search(terms, index.all_rows)], 5)
+
+            print(f"{count:>6} {legacy_ms:>12.2f} {index_ms:>12.2f} "
+                  f"{legacy_ms / index_ms:>8.1f}x {len(rows):>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark
+Compares parsing the teams workbook with loading the on-disk snapshot cache
+
+Usage: python benchmarks/bench_startup.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_teams
+from services.data_integration import SourceVersion
+from services.snapshot_cache import SnapshotCache
+
+
+def timed(func, repeat):
+    """Best wall time in milliseconds over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'xlsx MB':>8} {'xlsx parse ms':>14} {'snapshot MB':>12} {'snapshot ms':>12} {'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            workbook = os.path.join(workdir, f"teams-{size}.xlsx")
+            generate_teams(size).to_excel(workbook, index=False)
+
+            def parse():
+                return pd.read_excel(workbook, engine='openpyxl').fillna('')
+
+            cache = SnapshotCache(os.path.join(workdir, f"cache-{size}"))
+            snapshot_path = cache.save(parse(), 'local', SourceVersion.from_file(workbook))
+
+            repeat = 1 if size >= 100_000 else 3
+            parse_ms = timed(parse, repeat)
+            load_ms = timed(cache.load_latest, 5)
+
+            print(f"{size:>9,} {os.path.getsize(workbook) / 1e6:>8.2f} {parse_ms:>14.1f} "
+                  f"{os.path.getsize(snapshot_path) / 1e6:>12.2f} {load_ms:>12.1f} "
+                  f"{parse_ms / load_ms:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Typeahead benchmark
+Per-keystroke latency of SuggestIndex against a full-column prefix scan
+
+Every prefix of a sample of real names is queried, the way they arrive
+while typing; one-letter prefixes are the worst case (largest blocks).
+
+Usage: python benchmarks/bench_suggest.py [--sizes 10000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_teams
+from services.suggest_index import SuggestIndex
+from services.team_index import TeamIndex
+
+
+def scan_suggest(names, query, k):
+    """The naive way: scan every lowercased name for the prefix, then sort"""
+    matches = names[names.str.startswith(query)]
+    return matches.value_counts().head(k)
+
+
+def percentiles(samples):
+    samples = np.array(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99), samples.max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--names', type=int, default=200, help="names typed per size")
+    parser.add_argument('-k', type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"{'rows':>10} {'entries':>10} {'build s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'scan ms':>9}")
+
+    for size in args.sizes:
+        df = generate_teams(size)
+        index = TeamIndex(df)
+
+        start = time.perf_counter()
+        suggest = SuggestIndex(df, index)
+        build_s = time.perf_counter() - start
+
+        typed = rng.choice(df['Team'].to_numpy(), size=args.names)
+        latencies = []
+        for name in typed:
+            for end in range(1, min(len(name), 12) + 1):
+                start = time.perf_counter()
+                suggest.suggest(name[:end], args.k)
+                latencies.append(time.perf_counter() - start)
+
+        lowered = df['Team'].str.lower()
+        start = time.perf_counter()
+        scan_suggest(lowered, typed[0][:3].lower(), args.k)
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        p50, p99, worst = percentiles(latencies)
+        print(f"{size:>10,} {len(suggest):>10,} {build_s:>8.2f} {p50:>8.3f} {p99:>8.3f} "
+              f"{worst:>8.3f} {scan_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
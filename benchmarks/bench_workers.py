@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Worker memory benchmark
+Total RSS/PSS/USS of 1 vs 4 worker processes serving a synthetic workbook
+
+Scenarios:
+  private  independent worker processes, each with its own copy of the data
+           (gunicorn without --preload; the first worker loads the workbook,
+           the others read the generation it published, as after a refresh)
+  preload  workers forked from a master that loaded the data
+           (gunicorn --preload; the master is included in the totals)
+
+Every worker serves a few API requests before it is measured. RSS counts
+shared pages in every process; PSS splits them between the processes mapping
+them and is the figure that adds up; USS is memory private to one process.
+
+Usage: python benchmarks/bench_workers.py [--rows 100000] [--workers 1 4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Runs in each worker process; stays alive until stdin is closed
+WORKER_SCRIPT = """
+import sys
+import wsgi
+client = wsgi.app.test_client()
+for path in ['/api/teams?country=United+States&limit=100', '/api/teams?limit=100', '/health']:
+    assert client.get(path).status_code == 200, path
+print('ready', flush=True)
+sys.stdin.read()
+"""
+
+# Loads once, then forks the workers; every process reports its pid (one atomic write each)
+PRELOAD_SCRIPT = """
+import os, sys
+import wsgi
+for _ in range(int(sys.argv[1])):
+    if os.fork() == 0:
+        client = wsgi.app.test_client()
+        for path in ['/api/teams?country=United+States&limit=100', '/api/teams?limit=100', '/health']:
+            assert client.get(path).status_code == 200, path
+        os.write(1, f"ready {os.getpid()}\\n".encode())
+        sys.stdin.read()
+        os._exit(0)
+os.write(1, f"ready {os.getpid()}\\n".encode())
+sys.stdin.read()
+for _ in range(int(sys.argv[1])):
+    os.wait()
+"""
+
+
+def memory_mb(pid: int) -> dict:
+    """Rss, Pss and Uss (private clean + dirty) of a process from smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'uss': fields['Private_Clean'] + fields['Private_Dirty']
+    }
+
+
+def sum_memory(pids) -> dict:
+    totals = {'rss': 0.0, 'pss': 0.0, 'uss': 0.0}
+    for pid in pids:
+        for key, value in memory_mb(pid).items():
+            totals[key] += value
+    return totals
+
+
+def run_workers(workdir: str, count: int, scenario: str) -> dict:
+    """Start count workers for a scenario and sum their memory"""
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        DATA_PROVIDER='local',
+        LOG_LEVEL='WARNING'
+    )
+
+    if scenario == 'preload':
+        master = subprocess.Popen(
+            [sys.executable, '-c', PRELOAD_SCRIPT, str(count)], cwd=workdir, env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            pids = []
+            for _ in range(count + 1):
+                line = master.stdout.readline().split()
+                if not line or line[0] != 'ready':
+                    raise RuntimeError("preload master failed to start")
+                pids.append(int(line[1]))
+            return sum_memory(pids)
+        finally:
+            master.stdin.close()
+            master.wait()
+
+    # Workers boot one after another, so only the first one loads the data
+    workers = []
+    try:
+        for _ in range(count):
+            worker = subprocess.Popen(
+                [sys.executable, '-c', WORKER_SCRIPT], cwd=workdir, env=env,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+            )
+            workers.append(worker)
+            if worker.stdout.readline().strip() != 'ready':
+                raise RuntimeError(f"worker failed to start (exit code {worker.wait()})")
+        return sum_memory(worker.pid for worker in workers)
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit("This benchmark reads /proc/<pid>/smaps_rollup and needs Linux")
+
+    from benchmarks.synthetic import generate_teams
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app reads the workbook and coordinates relative to its working directory
+        generate_teams(args.rows).to_excel(os.path.join(workdir, 'Basketball Sources Links.xlsx'), index=False)
+        os.symlink(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'))
+        # Parse once up front so every run boots from the same snapshot cache
+        run_workers(workdir, 1, 'private')
+
+        print(f"{args.rows:,} rows")
+        print(f"{'scenario':>8} {'workers':>8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9} {'PSS per extra worker':>21}")
+        for scenario in ('private', 'preload'):
+            first_pss = None
+            for count in args.workers:
+                totals = run_workers(workdir, count, scenario)
+                if first_pss is None:
+                    first_pss, first_count = totals['pss'], count
+                    extra = '-'
+                else:
+                    extra = f"{(totals['pss'] - first_pss) / (count - first_count):.1f}"
+                print(f"{scenario:>8} {count:>8} {totals['rss']:>9.1f} "
+                      f"{totals['pss']:>9.1f} {totals['uss']:>9.1f} {extra:>21}")
+
+
+if __name__ == "__main__":
+    main()
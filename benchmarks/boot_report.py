@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Worker boot report
+Summarizes `python -X importtime` for the WSGI entry point and times initialization
+
+Usage: python benchmarks/boot_report.py [--top 15] [--json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so nothing is imported yet
+BOOT_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+initialized = time.perf_counter()
+print(json.dumps({
+    'import_app_ms': (imported - started) * 1000,
+    'init_ms': (initialized - imported) * 1000,
+    'rows': len(app.snapshot.teams) if app.snapshot is not None else 0
+}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """
+    Parse -X importtime output
+
+    Returns:
+        tuple: (total self time in us, [(cumulative us, module)] for modules
+                imported directly by the interpreter or by a top-level import)
+    """
+    total_self = 0
+    shallow = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        total_self += int(self_us)
+        # Nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            shallow.append((int(cumulative_us), name.strip()))
+    return total_self, sorted(shallow, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--top', type=int, default=15, help='number of imports to list')
+    parser.add_argument('--json', action='store_true', help='print a machine-readable report')
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode)
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    total_self, top_level = parse_importtime(result.stderr)
+    loaded = {line.rsplit('|', 1)[-1].strip().split('.')[0]
+              for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+    report = {
+        'import_app_ms': round(timings['import_app_ms'], 1),
+        'init_ms': round(timings['init_ms'], 1),
+        'boot_ms': round(timings['import_app_ms'] + timings['init_ms'], 1),
+        'all_imports_ms': round(total_self / 1000, 1),
+        'rows': timings['rows'],
+        'cloud_sdks_loaded': sorted(loaded & {'boto3', 'botocore', 'azure', 'google'}),
+        'top_imports_ms': [
+            {'module': name, 'cumulative_ms': round(us / 1000, 1)}
+            for us, name in top_level[:args.top]
+        ]
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"import app:        {report['import_app_ms']:>8.1f} ms")
+    print(f"create_app():      {report['init_ms']:>8.1f} ms ({report['rows']:,} rows)")
+    print(f"worker boot:       {report['boot_ms']:>8.1f} ms")
+    print(f"all imports:       {report['all_imports_ms']:>8.1f} ms")
+    print(f"cloud SDKs loaded: {', '.join(report['cloud_sdks_loaded']) or 'none'}")
+    print(f"\nTop {args.top} imports (cumulative, two levels deep):")
+    for entry in report['top_imports_ms']:
+        print(f"  {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Dashboard script check
+Runs the dashboard page's JavaScript under node against a live app and asserts what it renders
+
+The page is rendered by the app (synthetic workbook, DATA_PROVIDER=local)
+and its inline script runs, after static/js/main.js, in node with a small
+stand-in for jQuery and the DOM: elements come from the rendered HTML and
+$.getJSON goes through node's fetch to the app. Uncaught errors in the
+ready handler or in any response callback fail the check.
+
+Steps:
+  load       first page of teams, count and "Load More" button
+  more       "Load More" appends the next page
+  filter     a country filter narrows the list
+  facets     filter options and link checkboxes show /api/facets counts
+  suggest    typing fills the datalist from /api/suggest; picking a
+             country suggestion sets the country filter instead
+  export     each Export menu item links to a download of the filtered teams
+
+Needs node (18 or later, for fetch).
+
+Usage: python benchmarks/check_dashboard_script.py [--rows 500]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from html.parser import HTMLParser
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Stand-ins for jQuery and the DOM, then the page scripts, then the steps;
+# prints one JSON report. Arguments: scripts file, elements file, base URL
+DRIVER_SCRIPT = r"""
+const fs = require('fs');
+const vm = require('vm');
+const [scriptsPath, elementsPath, base] = process.argv.slice(2);
+
+const errors = [];
+const downloads = [];
+const readyHandlers = [];
+let pending = 0;
+
+class Element {
+    constructor(tag, attrs = {}) {
+        this.tag = tag;
+        this.attrs = Object.assign({}, attrs);
+        this.classes = new Set((attrs.class || '').split(/\s+/).filter(Boolean));
+        this.value = attrs.value || '';
+        this.checked = 'checked' in attrs;
+        this.selected = 'selected' in attrs;
+        this.disabled = 'disabled' in attrs;
+        this.textContent = attrs.text || '';
+        this.children = [];
+        this.handlers = {};
+        this.data = {};
+        this.style = {};
+        for (const [name, value] of Object.entries(attrs)) {
+            if (name.startsWith('data-')) this.data[name.slice(5)] = value;
+        }
+    }
+    setAttribute(name, value) { this.attrs[name] = value; }
+    click() { if (this.tag === 'a') downloads.push(this.attrs.href); }
+}
+
+const elements = JSON.parse(fs.readFileSync(elementsPath)).map(e => {
+    const element = new Element(e.tag, e.attrs);
+    element.children = (e.options || []).map(o => new Element('option', o));
+    return element;
+});
+const documentElement = new Element('document');
+
+function query(selector) {
+    const [head, child] = selector.trim().split(/\s+/);
+    let found = head.startsWith('#') ? elements.filter(e => e.attrs.id === head.slice(1))
+        : head.startsWith('.') ? elements.filter(e => e.classes.has(head.slice(1)))
+        : elements.filter(e => e.tag === head);
+    if (child) found = [].concat(...found.map(e => e.children.filter(c => c.tag === child)));
+    return found;
+}
+
+class Wrap {
+    constructor(list) { this.list = list; this.length = list.length; }
+    ready(fn) { readyHandlers.push(fn); return this; }
+    on(event, selector, fn) {
+        if (typeof selector === 'function') fn = selector;
+        this.list.forEach(e => (e.handlers[event] = e.handlers[event] || []).push(fn));
+        return this;
+    }
+    trigger(event, props = {}) {
+        this.list.forEach(e => (e.handlers[event] || []).forEach(fn => fn.call(e, Object.assign({
+            type: event, preventDefault() {}
+        }, props))));
+        return this;
+    }
+    click(fn) { return fn ? this.on('click', fn) : this.trigger('click'); }
+    val(value) {
+        if (value === undefined) return this.list.length ? this.list[0].value : undefined;
+        this.list.forEach(e => {
+            e.value = String(value);
+            e.children.forEach(c => { if (c.tag === 'option') c.selected = c.value === e.value; });
+        });
+        return this;
+    }
+    prop(name, value) {
+        if (value === undefined) return this.list.length ? this.list[0][name] : undefined;
+        this.list.forEach(e => (e[name] = value));
+        return this;
+    }
+    is(selector) { return this.list.some(e => selector === ':checked' ? e.checked : false); }
+    addClass(name) { this.list.forEach(e => e.classes.add(name)); return this; }
+    removeClass(name) { this.list.forEach(e => e.classes.delete(name)); return this; }
+    toggleClass(name, state) {
+        this.list.forEach(e => {
+            if (state === undefined ? !e.classes.has(name) : state) e.classes.add(name);
+            else e.classes.delete(name);
+        });
+        return this;
+    }
+    hasClass(name) { return this.list.some(e => e.classes.has(name)); }
+    empty() { this.list.forEach(e => { e.children = []; e.textContent = ''; }); return this; }
+    append(content) {
+        this.list.forEach(e => {
+            if (content instanceof Wrap) e.children.push(...content.list);
+            else e.children.push(new Element('html', {text: String(content)}));
+        });
+        return this;
+    }
+    text(value) {
+        if (value === undefined) return this.list.map(e => e.textContent).join('');
+        this.list.forEach(e => (e.textContent = String(value)));
+        return this;
+    }
+    html(value) { return this.text(value); }
+    attr(name, value) {
+        if (value === undefined) return this.list.length ? this.list[0].attrs[name] : undefined;
+        this.list.forEach(e => (e.attrs[name] = String(value)));
+        return this;
+    }
+    data(key, value) {
+        if (value === undefined) return this.list.length ? this.list[0].data[key] : undefined;
+        this.list.forEach(e => (e.data[key] = value));
+        return this;
+    }
+    each(fn) { this.list.forEach((e, i) => fn.call(e, i, e)); return this; }
+    find(selector) { return new Wrap([].concat(...this.list.map(e => e.children.filter(c => c.tag === selector)))); }
+    slideToggle() { return this; }
+}
+
+function $(target) {
+    if (typeof target === 'function') { readyHandlers.push(target); return new Wrap([]); }
+    if (target instanceof Wrap) return target;
+    if (target instanceof Element) return new Wrap([target]);
+    if (target === global.document) return new Wrap([documentElement]);
+    if (typeof target === 'string' && target.startsWith('<')) return new Wrap([new Element(target.replace(/[<>\/]/g, ''))]);
+    return new Wrap(query(target));
+}
+
+$.getJSON = function(url, data, callback) {
+    if (typeof data === 'function') { callback = data; data = null; }
+    if (data) url += (url.includes('?') ? '&' : '?') + new URLSearchParams(data).toString();
+    pending++;
+    fetch(base + url)
+        .then(response => {
+            if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+            return response.json();
+        })
+        .then(callback)
+        .catch(e => errors.push(String(e && e.stack || e)))
+        .finally(() => pending--);
+};
+$.each = function(collection, fn) {
+    Object.entries(collection || {}).forEach(([key, value]) => fn.call(value, key, value));
+    return collection;
+};
+
+global.$ = global.jQuery = $;
+global.document = {
+    addEventListener() {},
+    querySelectorAll() { return []; },
+    createElement(tag) { return new Element(tag); },
+    body: {appendChild() {}, removeChild() {}},
+    execCommand() {}
+};
+global.window = global;
+window.location = {search: '', pathname: '/', origin: base};
+window.history = {
+    replaceState(state, title, url) { window.location.search = url.slice(url.indexOf('?')); }
+};
+window.open = function() {};
+process.on('uncaughtException', e => errors.push(String(e && e.stack || e)));
+
+function cards() { return query('#teams-container')[0].children.length; }
+function visible(selector) { return !$(selector).hasClass('d-none'); }
+
+async function settle() {
+    do {
+        await new Promise(resolve => setTimeout(resolve, 150));
+    } while (pending);
+}
+
+async function main() {
+    try {
+        vm.runInThisContext(fs.readFileSync(scriptsPath, 'utf8'), {filename: 'index.html'});
+        readyHandlers.forEach(fn => fn.call(documentElement, $));
+    } catch (e) {
+        errors.push(String(e && e.stack || e));
+    }
+    await settle();
+    const report = {};
+
+    report.load = {cards: cards(), count: $('#results-count').text(), more: visible('#load-more')};
+
+    $('#load-more').click();
+    await settle();
+    report.more = {cards: cards(), more: visible('#load-more')};
+
+    const country = query('#country')[0].children.map(o => o.value).filter(Boolean)[0];
+    $('#country').val(country);
+    $('#apply-filters').click();
+    await settle();
+    report.filter = {country, cards: cards(), count: $('#results-count').text(), query: window.location.search};
+
+    report.facets = {};
+    ['sport', 'country', 'league', 'gender'].forEach(id => {
+        report.facets[id] = query(`#${id} option`).filter(o => o.value).map(o => [o.value, o.textContent, o.disabled]);
+    });
+    ['has_twitter', 'has_facebook', 'has_instagram'].forEach(flag => {
+        report.facets[flag] = $(`#facet-${flag}`).text();
+    });
+
+    // The last comma-separated term is completed; a picked country moves to its filter
+    const picked = query('#country option').map(o => o.value).filter(v => v && v !== country)[0];
+    $('#search').val(`x, ${picked.slice(0, 4)}`).trigger('input');
+    await settle();
+    report.suggest = {
+        q: picked.slice(0, 4),
+        options: query('#search-suggestions option').map(o => [o.attrs.value, o.textContent])
+    };
+    $('#search').val(`x, ${picked}`).trigger('input');
+    report.suggest.picked = {country: picked, selected: $('#country').val(), search: $('#search').val()};
+
+    // Each click adds a hidden link and follows it
+    report.export = query('.export-teams').map(item => {
+        $(item).click();
+        return {format: $(item).data('format'), href: downloads.pop()};
+    });
+
+    report.errors = errors;
+    console.log(JSON.stringify(report));
+}
+
+main();
+"""
+
+
+class PageElements(HTMLParser):
+    """Elements with an id or class, select options and the inline scripts of a page"""
+
+    def __init__(self):
+        super().__init__()
+        self.elements = []
+        self.scripts = []
+        self._select = None
+        self._option = None
+        self._script = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value if value is not None else '' for name, value in attrs}
+        if tag == 'script' and 'src' not in attrs:
+            self._script = []
+        elif tag == 'option' and self._select is not None:
+            self._option = dict(attrs, text='')
+            self._select['options'].append(self._option)
+        elif 'id' in attrs or 'class' in attrs:
+            element = {'tag': tag, 'attrs': attrs, 'options': []}
+            self.elements.append(element)
+            if tag == 'select':
+                self._select = element
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._script is not None:
+            self.scripts.append(''.join(self._script))
+            self._script = None
+        elif tag == 'option':
+            self._option = None
+        elif tag == 'select':
+            self._select = None
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+        elif self._option is not None:
+            self._option['text'] += data.strip()
+
+
+def run_page(page, base_url, workdir):
+    """Run a parsed page's scripts under node; returns the driver's report"""
+    with open(os.path.join(ROOT, 'static', 'js', 'main.js')) as f:
+        scripts = [f.read()] + page.scripts
+
+    driver_path = os.path.join(workdir, 'driver.js')
+    scripts_path = os.path.join(workdir, 'scripts.js')
+    elements_path = os.path.join(workdir, 'elements.json')
+    with open(driver_path, 'w') as f:
+        f.write(DRIVER_SCRIPT)
+    with open(scripts_path, 'w') as f:
+        f.write('\n;\n'.join(scripts))
+    with open(elements_path, 'w') as f:
+        json.dump(page.elements, f)
+
+    result = subprocess.run(['node', driver_path, scripts_path, elements_path, base_url],
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"node failed (exit code {result.returncode}): {result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def facet_differences(shown, facets, country, elements):
+    """Options and link counts that do not show what /api/facets answered for the filter"""
+    labels = {
+        (element['attrs']['id'], option['value']): option['text']
+        for element in elements if element['tag'] == 'select' for option in element['options']
+    }
+    problems = []
+    for select in ('sport', 'country', 'league', 'gender'):
+        for value, text, disabled in shown[select]:
+            count = facets[select].get(value, 0)
+            expected = f"{labels[(select, value)]} ({count})"
+            selected = select == 'country' and value == country
+            if text != expected or disabled != (count == 0 and not selected):
+                problems.append(f"{select} {value!r}: {text!r}{' disabled' if disabled else ''}, expected {expected!r}")
+    for flag, count in facets['links'].items():
+        if shown[flag] != f"({count})":
+            problems.append(f"{flag}: {shown[flag]!r}, expected '({count})'")
+    return problems
+
+
+def exported_rows(client, href, export_format):
+    """Download an export link through the app; returns its row count, or the HTTP status if it failed"""
+    if not href or not href.startswith('/api/teams/export?'):
+        return f"link {href!r}"
+    response = client.get(href)
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    if export_format == 'xlsx':
+        return len(pd.read_excel(io.BytesIO(response.data)))
+    if export_format == 'csv':
+        return len(pd.read_csv(io.BytesIO(response.data)))
+    return len(response.get_data(as_text=True).splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    args = parser.parse_args()
+
+    if shutil.which('node') is None:
+        sys.exit("node is not installed")
+
+    from benchmarks.synthetic import generate_teams
+
+    with tempfile.TemporaryDirectory() as workdir:
+        generate_teams(args.rows).to_excel(os.path.join(workdir, 'Basketball Sources Links.xlsx'), index=False)
+        os.symlink(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'))
+        os.chdir(workdir)
+        os.environ.update(DATA_PROVIDER='local', LOG_LEVEL='WARNING')
+
+        import app
+        from services.team_export import TeamExporter
+        from werkzeug.serving import make_server
+
+        app.create_app()
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server = make_server('127.0.0.1', 0, app.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        client = app.app.test_client()
+
+        page_html = client.get('/').get_data(as_text=True)
+        page = PageElements()
+        page.feed(page_html)
+        try:
+            report = run_page(page, base_url, workdir)
+        finally:
+            server.shutdown()
+
+        facets = client.get('/api/facets', query_string={'country': report['filter']['country']}).json
+        facet_problems = facet_differences(report['facets'], facets, report['filter']['country'], page.elements)
+        suggestions = client.get('/api/suggest', query_string={'q': report['suggest']['q']}).json['suggestions']
+        expected_options = [[f"x, {s['text']}", f"{s['type']} · {s['teams']} teams"] for s in suggestions]
+        picked = report['suggest']['picked']
+        exported = {item['format']: exported_rows(client, item['href'], item['format'])
+                    for item in report['export']}
+        teams = app.snapshot.teams
+        page_size = int(re.search(r'const PAGE_SIZE = (\d+)', page_html).group(1))
+        in_country = int((teams['Country'] == report['filter']['country']).sum())
+
+        checks = [
+            ('no script errors', not report['errors'], '; '.join(report['errors'])[:500]),
+            ('load', report['load']['cards'] == min(page_size, len(teams))
+             and report['load']['count'] == f"{len(teams)} teams"
+             and report['load']['more'] == (len(teams) > page_size), report['load']),
+            ('more', report['more']['cards'] == min(2 * page_size, len(teams)), report['more']),
+            ('filter', report['filter']['cards'] == min(page_size, in_country)
+             and report['filter']['count'] == f"{in_country} teams", report['filter']),
+            ('facets', not facet_problems, '; '.join(facet_problems[:5])),
+            ('suggest', report['suggest']['options'] == expected_options
+             and any(s['type'] == 'country' and s['text'] == picked['country'] for s in suggestions),
+             report['suggest']['options'][:3]),
+            ('suggest pick', picked['selected'] == picked['country'] and picked['search'] == 'x', picked),
+            ('export', sorted(exported) == sorted(TeamExporter.FORMATS)
+             and all(count == in_country for count in exported.values()), exported),
+        ]
+
+    print(f"{args.rows:,} rows")
+    print(f"{'step':<18} result")
+    for name, ok, detail in checks:
+        print(f"{name:<18} {'ok' if ok else f'FAIL {detail}'}")
+
+    sys.exit(0 if all(ok for _, ok, _ in checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Link checker check
+Runs LinkChecker against a local stand-in web server and asserts its results
+
+The server answers each path the way real sites do: fine, slowly, 404,
+405 to HEAD but 200 to GET, 500, or not at all within the timeout. The
+same paths are served under several host names (127.0.0.1, localhost,
+127.0.0.2) so the per-host limit can be observed: the server tracks the
+most requests it had in flight per Host header. A second run must reuse
+every result (TTL), and a forced run must check everything again.
+
+Usage: python benchmarks/check_link_checker.py [--links 60] [--per-host 2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.link_checker import LinkChecker, LinkStatusStore
+
+# Seconds a check may take before it is a timeout
+TIMEOUT = 1.0
+
+# Path -> expected status
+EXPECTED = {
+    '/ok': 'ok',
+    '/slow': 'ok',
+    '/missing': 'broken',
+    '/no-head': 'ok',
+    '/error': 'unknown',
+    '/hang': 'timeout'
+}
+
+
+class StandInServer:
+    """HTTP server with canned behaviours and per-host concurrency tracking"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = Counter()
+        self.max_in_flight = defaultdict(int)
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.respond(head=True)
+
+            def do_GET(self):
+                self.respond(head=False)
+
+            def respond(self, head):
+                host = self.headers.get('Host', '').split(':')[0]
+                with server.lock:
+                    server.requests += 1
+                    server.in_flight[host] += 1
+                    server.max_in_flight[host] = max(server.max_in_flight[host], server.in_flight[host])
+                try:
+                    path = '/' + self.path.strip('/').split('/')[0]
+                    time.sleep(server.latency * (5 if path == '/slow' else 1))
+                    if path == '/hang':
+                        # The client gives up after TIMEOUT; stop counting the request then
+                        time.sleep(TIMEOUT * 0.95)
+                        with server.lock:
+                            server.in_flight[host] -= 1
+                        host = None
+                        time.sleep(TIMEOUT)
+                        status = 200
+                    elif path == '/missing':
+                        status = 404
+                    elif path == '/no-head':
+                        status = 405 if head else 200
+                    elif path == '/error':
+                        status = 500
+                    else:
+                        status = 200
+                    self.send_response(status)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    if host is not None:
+                        with server.lock:
+                            server.in_flight[host] -= 1
+
+        self.httpd = ThreadingHTTPServer(('0.0.0.0', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--links', type=int, default=60, help="URLs per run")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.02, help="seconds per response")
+    args = parser.parse_args()
+
+    server = StandInServer(args.latency)
+    hosts = ['127.0.0.1', 'localhost', '127.0.0.2']
+    paths = list(EXPECTED)
+    urls = [f"http://{hosts[i % len(hosts)]}:{server.port}{paths[i % len(paths)]}/{i}"
+            for i in range(args.links)]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LinkStatusStore(os.path.join(tmp, 'link_status.json'))
+        checker = LinkChecker(store, timeout=TIMEOUT, concurrency=args.concurrency,
+                              per_host=args.per_host, ttl=timedelta(hours=1))
+
+        print(f"{'run':>8} {'checked':>8} {'cached':>7} {'requests':>9} {'seconds':>8}  result")
+        for run, force in (('first', False), ('cached', False), ('forced', True)):
+            before = server.requests
+            summary = checker.check(urls, force=force)
+            requests_made = server.requests - before
+
+            wrong = [url for url in urls
+                     if store.results[url].status != EXPECTED['/' + url.split('/')[3]]]
+            expected_checked = 0 if run == 'cached' else len(urls)
+            ok = not wrong and summary['checked'] == expected_checked and \
+                (requests_made == 0 if run == 'cached' else requests_made >= len(urls))
+            failures += not ok
+            print(f"{run:>8} {summary['checked']:>8} {summary['cached']:>7} {requests_made:>9} "
+                  f"{summary['seconds']:>8.2f}  {'ok' if ok else 'FAIL'}")
+            for url in wrong[:5]:
+                print(f"{'':>8} {url}: {store.results[url].status} ({store.results[url].error})")
+
+        # The file written by the checker is what the web workers read
+        reader = LinkStatusStore(store.path)
+        reader.reload()
+        persisted = len(reader.results) == len(urls)
+        failures += not persisted
+
+    server.close()
+
+    print(f"\n{'host':>10} {'max in flight':>14}  result")
+    for host in hosts:
+        peak = server.max_in_flight[host]
+        ok = 0 < peak <= args.per_host
+        failures += not ok
+        print(f"{host:>10} {peak:>14}  {'ok' if ok else 'FAIL'}")
+    print(f"\nstatuses: {dict(Counter(result.status for result in store.results.values()))}")
+    print(f"persisted results readable by another store: {'ok' if persisted else 'FAIL'}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
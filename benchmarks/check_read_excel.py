@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Workbook parser parity check
+Asserts that DataIntegrationService._read_excel parses workbooks exactly like pd.read_excel
+
+Cloud downloads are parsed by the service's streaming reader, while the
+local and fallback paths use pd.read_excel; the same workbook must give
+the same frame either way. The workbooks cover pandas' default NA strings
+("N/A", "NULL", "#N/A", ...), blank cells and rows, short rows, integral
+floats, mixed columns, and numeric, date, duplicate or missing headers,
+plus a synthetic teams workbook.
+
+Usage: python benchmarks/check_read_excel.py [--rows 2000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+from datetime import date, datetime, time
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_workbook
+from services.data_integration import DataIntegrationService, NA_STRINGS
+
+# (case, header, rows)
+CASES = [
+    ('na strings', ['Team', 'Twitter', 'Facebook'],
+     [['Team ' + value, value, 'https://facebook.com/x'] for value in sorted(NA_STRINGS)]),
+    ('near-na strings', ['Team', 'Twitter'],
+     [['A', ' N/A'], ['B', 'n/a '], ['C', 'Na'], ['D', 'none'], ['E', 'NULLS'], ['F', '-']]),
+    ('blanks', ['Team', 'Country', 'Twitter'],
+     [['A', None, None], [None, None, None], ['B', 'Italy', None], [None, 'Spain', 'https://t.co/b']]),
+    ('short rows', ['Team', 'Country', 'League', 'Twitter'],
+     [['A', 'Italy'], ['B'], ['C', 'Spain', 'FIBA', 'https://t.co/c']]),
+    ('numbers', ['Team', 'Founded', 'Rating'],
+     [['A', 1901, 1.5], ['B', 1950.0, 2], ['C', None, 'N/A']]),
+    ('headers', ['Team', None, 'Team', 'Links', 'Links'],
+     [['A', 'x', 'y', 'z', 'w'], ['B', None, None, 'NA', None]]),
+    ('trailing blank column', ['Team', 'Country', None, None],
+     [['A', 'Italy', None, None], ['B', None, 'x'], ['C']]),
+    ('header only', ['Team', 'Country'], [[None, None]]),
+    ('numeric headers', ['Team', 2024, 2025.0, 2.5, True, 'N/A'],
+     [['A', 1, 2, 3, 4, 5], ['B', None, 'x', None, None, None]]),
+    ('date headers', ['Team', datetime(2024, 1, 1), date(2024, 7, 1), time(10, 30)],
+     [['A', 1, 2, 3], ['B', 4, 5, 6]]),
+    ('clashing headers', [2024, 2024.0, '2024', 'Unnamed: 4', None, 'x', 'x', 'x.1'],
+     [[1, 2, 3, 4, 5, 6, 7, 8]]),
+]
+
+
+def workbook_bytes(header, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def compare(content, service):
+    expected = pd.read_excel(io.BytesIO(content))
+    actual = service._read_excel(io.BytesIO(content))
+    try:
+        pd.testing.assert_frame_equal(actual, expected)
+        return True, ''
+    except AssertionError as e:
+        return False, str(e).splitlines()[0] if str(e) else 'frames differ'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000, help="rows of the synthetic teams workbook")
+    args = parser.parse_args()
+
+    service = DataIntegrationService()
+    results = [(name, *compare(workbook_bytes(header, rows), service)) for name, header, rows in CASES]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_workbook(os.path.join(tmp, 'teams.xlsx'), args.rows)
+        with open(path, 'rb') as f:
+            results.append((f"synthetic {args.rows:,} rows", *compare(f.read(), service)))
+
+    print(f"{'workbook':<24} result")
+    for name, ok, detail in results:
+        print(f"{name:<24} {'ok' if ok else 'FAIL ' + detail}")
+
+    sys.exit(0 if all(ok for _, ok, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
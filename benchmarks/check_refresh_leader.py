@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Refresh leadership check
+Starts several worker processes and asserts one source fetch per refresh interval
+
+Every round makes all workers refresh at the same moment, the way they do
+when their interval expires together. Each worker counts source checks
+(SourceVersion.from_file on the local workbook) and workbook parses
+(pandas.read_excel); across all workers a round must show exactly one
+check, one parse if the workbook changed and none otherwise, and every
+worker must end up on the same generation.
+
+Rounds:
+  start      cold start, nothing published yet
+  unchanged  interval expired, same workbook
+  changed    interval expired, workbook rewritten
+
+Usage: python benchmarks/check_refresh_leader.py [--workers 4] [--rows 20000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Refresh interval of the workers, in minutes
+INTERVAL_MINUTES = 0.05
+
+# Runs in each worker process: one refresh per line on stdin, one JSON line back
+WORKER_SCRIPT = """
+import json, sys, time
+import pandas as pd
+from services.data_integration import SourceVersion
+
+counts = {'checks': 0, 'parses': 0}
+
+def counting(name, func):
+    def wrapper(*args, **kwargs):
+        counts[name] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+SourceVersion.from_file = counting('checks', SourceVersion.from_file)
+pd.read_excel = counting('parses', pd.read_excel)
+
+import app
+client = app.app.test_client()
+print('ready', flush=True)
+
+for command in sys.stdin:
+    if command.strip() == 'start':
+        app.create_app()
+    else:
+        # Stale snapshot: the request starts a background refresh
+        client.get('/health')
+        while app.refresher.is_running():
+            time.sleep(0.01)
+    current = app.snapshot
+    print(json.dumps(dict(
+        counts,
+        generation=current.generation if current else None,
+        error=app.refresher.last_error
+    )), flush=True)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=20_000)
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import generate_teams
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workbook = os.path.join(workdir, 'Basketball Sources Links.xlsx')
+        generate_teams(args.rows).to_excel(workbook, index=False)
+        os.symlink(os.path.join(ROOT, 'data'), os.path.join(workdir, 'data'))
+
+        env = dict(
+            os.environ,
+            PYTHONPATH=ROOT,
+            DATA_PROVIDER='local',
+            DATA_REFRESH_INTERVAL=str(INTERVAL_MINUTES),
+            LOG_LEVEL='WARNING'
+        )
+        workers = [
+            subprocess.Popen([sys.executable, '-c', WORKER_SCRIPT], cwd=workdir, env=env,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for _ in range(args.workers)
+        ]
+
+        failures = 0
+        try:
+            for worker in workers:
+                if worker.stdout.readline().strip() != 'ready':
+                    raise RuntimeError(f"worker failed to start (exit code {worker.wait()})")
+
+            previous = [{'checks': 0, 'parses': 0}] * len(workers)
+            print(f"{args.workers} workers, {args.rows:,} rows")
+            print(f"{'round':>10} {'checks':>7} {'parses':>7} {'generations':>12}  result")
+
+            for round_name in ('start', 'unchanged', 'changed'):
+                if round_name != 'start':
+                    if round_name == 'changed':
+                        generate_teams(args.rows, seed=1).to_excel(workbook, index=False)
+                    # Let every worker's snapshot go stale
+                    time.sleep(INTERVAL_MINUTES * 60 + 0.5)
+
+                for worker in workers:
+                    worker.stdin.write('start\n' if round_name == 'start' else 'refresh\n')
+                    worker.stdin.flush()
+                results = [json.loads(worker.stdout.readline()) for worker in workers]
+
+                checks = sum(r['checks'] - p['checks'] for r, p in zip(results, previous))
+                parses = sum(r['parses'] - p['parses'] for r, p in zip(results, previous))
+                generations = sorted({r['generation'] for r in results}, key=str)
+                errors = [r['error'] for r in results if r['error']]
+                previous = results
+
+                expected_parses = 0 if round_name == 'unchanged' else 1
+                ok = checks == 1 and parses == expected_parses and len(generations) == 1 and not errors
+                failures += not ok
+                print(f"{round_name:>10} {checks:>7} {parses:>7} "
+                      f"{','.join(map(str, generations)):>12}  {'ok' if ok else 'FAIL'}")
+                for error in errors:
+                    print(f"{'':>10} refresh error: {error}")
+        finally:
+            for worker in workers:
+                worker.stdin.close()
+                worker.wait()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
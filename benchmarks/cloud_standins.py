@@ -0,0 +1,379 @@
+"""
+Local stand-ins for the cloud providers' HTTP APIs
+Serve a workbook the way SharePoint, Google Drive and S3 do, with injected latency, bandwidth limits and failures
+
+Each stand-in answers exactly the requests DataIntegrationService makes
+(token, metadata, download with Range resumption) and returns the
+provider's config dictionary pointing at itself, so the service runs its
+real code path against 127.0.0.1. Authentication is accepted, not
+verified.
+"""
+
+import email.utils
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+@dataclass
+class Behaviour:
+    """
+    Network conditions a stand-in simulates
+
+    latency: seconds before every response starts
+    bandwidth: bytes per second of response bodies (0 = unlimited)
+    error_rate: share of requests answered with 503 (retried by the service)
+    drop_rate: share of downloads whose connection is cut halfway (resumed
+               by the service with a Range request)
+    seed: makes the injected failures reproducible
+    failed_downloads: the first downloads are answered with 503
+    dropped_downloads: the downloads after those are cut halfway; unlike
+                       the rates, every provider meets the same failures
+    """
+    latency: float = 0.0
+    bandwidth: float = 0.0
+    error_rate: float = 0.0
+    drop_rate: float = 0.0
+    seed: int = 0
+    failed_downloads: int = 0
+    dropped_downloads: int = 0
+
+
+# Named scenarios for the benchmarks
+SCENARIOS = {
+    'local': Behaviour(),
+    'broadband': Behaviour(latency=0.03, bandwidth=12.5e6),
+    'slow': Behaviour(latency=0.15, bandwidth=1.25e6),
+    # Every download is first refused, then cut halfway, then resumed
+    'flaky': Behaviour(latency=0.03, bandwidth=12.5e6, failed_downloads=1, dropped_downloads=1),
+    'lossy': Behaviour(latency=0.03, bandwidth=12.5e6, error_rate=0.2, drop_rate=0.3, seed=7)
+}
+
+
+class StandInServer:
+    """
+    Threaded HTTP/1.1 server serving one workbook, with keep-alive
+
+    Subclasses implement route(); the helpers apply the behaviour. Counters
+    record what the service actually did (requests, injected errors and
+    drops, body bytes, Range requests).
+    """
+
+    CHUNK = 64 * 1024
+
+    def __init__(self, workbook: str, behaviour: Optional[Behaviour] = None):
+        self.workbook = workbook
+        with open(workbook, 'rb') as f:
+            self.content = f.read()
+        self.etag = hashlib.md5(self.content).hexdigest()
+        self.modified = os.path.getmtime(workbook)
+        self.behaviour = behaviour or Behaviour()
+        self.random = random.Random(self.behaviour.seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'drops': 0, 'ranges': 0, 'bytes': 0, 'downloads': 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self, 'GET')
+
+            def do_HEAD(self):
+                server._handle(self, 'HEAD')
+
+            def do_POST(self):
+                server._handle(self, 'POST')
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _chance(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        self._count('requests')
+        if method == 'POST':
+            length = int(handler.headers.get('Content-Length') or 0)
+            handler.body = handler.rfile.read(length)
+        time.sleep(self.behaviour.latency)
+        try:
+            if self._chance(self.behaviour.error_rate):
+                self._count('errors')
+                self.send_error_response(handler, 503, 'Injected failure', retry_after=True)
+                return
+            self.route(handler, method, urlsplit(handler.path))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def route(self, handler: BaseHTTPRequestHandler, method: str, url) -> None:
+        raise NotImplementedError
+
+    # Response helpers
+
+    def send_body(self, handler: BaseHTTPRequestHandler, status: int, body: bytes,
+                  headers: Optional[Dict[str, str]] = None, head: bool = False,
+                  content_length: Optional[int] = None) -> None:
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body) if content_length is None else content_length))
+        handler.end_headers()
+        if head:
+            return
+
+        bandwidth = self.behaviour.bandwidth
+        started = time.monotonic()
+        for start in range(0, len(body), self.CHUNK):
+            chunk = body[start:start + self.CHUNK]
+            handler.wfile.write(chunk)
+            self._count('bytes', len(chunk))
+            if bandwidth:
+                # Pace the body: never ahead of bandwidth bytes per second
+                ahead = (start + len(chunk)) / bandwidth - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def send_json(self, handler: BaseHTTPRequestHandler, payload: Any, status: int = 200,
+                  headers: Optional[Dict[str, str]] = None, head: bool = False) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_body(handler, status, body, dict({'Content-Type': 'application/json'}, **(headers or {})), head)
+
+    def send_error_response(self, handler: BaseHTTPRequestHandler, status: int, message: str,
+                            retry_after: bool = False) -> None:
+        headers = {'Retry-After': '0'} if retry_after else {}
+        self.send_json(handler, {'error': message}, status=status, headers=headers,
+                       head=handler.command == 'HEAD')
+
+    def send_workbook(self, handler: BaseHTTPRequestHandler, head: bool = False,
+                      headers: Optional[Dict[str, str]] = None) -> None:
+        """The workbook, honouring Range: bytes=N- and dropping connections as configured"""
+        headers = dict({
+            'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            'Accept-Ranges': 'bytes'
+        }, **(headers or {}))
+        body, status = self.content, 200
+        download = 0
+        if not head:
+            with self.lock:
+                self.stats['downloads'] += 1
+                download = self.stats['downloads']
+            if download <= self.behaviour.failed_downloads:
+                self._count('errors')
+                self.send_error_response(handler, 503, 'Injected failure', retry_after=True)
+                return
+        dropped = self.behaviour.failed_downloads < download <= \
+            self.behaviour.failed_downloads + self.behaviour.dropped_downloads
+
+        match = re.fullmatch(r'bytes=(\d+)-', handler.headers.get('Range', ''))
+        if match and int(match.group(1)) < len(self.content):
+            offset = int(match.group(1))
+            self._count('ranges')
+            body, status = self.content[offset:], 206
+            headers['Content-Range'] = f"bytes {offset}-{len(self.content) - 1}/{len(self.content)}"
+
+        if not head and len(body) > 1 and (dropped or self._chance(self.behaviour.drop_rate)):
+            # Promise the whole body, send half of it, hang up
+            self._count('drops')
+            self.send_body(handler, status, body[:len(body) // 2], headers, content_length=len(body))
+            handler.close_connection = True
+            handler.wfile.flush()
+            handler.connection.shutdown(2)
+            return
+
+        self.send_body(handler, status, body, headers, head)
+
+    @property
+    def last_modified(self) -> str:
+        return email.utils.formatdate(self.modified, usegmt=True)
+
+    @property
+    def iso_modified(self) -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.modified))
+
+
+class SharePointStandIn(StandInServer):
+    """
+    Azure AD token endpoint and SharePoint REST file API
+
+    POST /{tenant}/oauth2/v2.0/token
+    GET  /sites/teams/_api/web/GetFileByServerRelativeUrl('{path}')         metadata
+    GET  /sites/teams/_api/web/GetFileByServerRelativeUrl('{path}')/$value  content
+    """
+
+    FILE_PATH = '/sites/teams/Shared Documents/Basketball Sources Links.xlsx'
+    TOKEN = 'standin-sharepoint-token'
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            'site_url': f"{self.url}/sites/teams",
+            'file_path': self.FILE_PATH,
+            'client_id': 'standin-client',
+            'client_secret': 'standin-secret',
+            'tenant_id': 'standin-tenant',
+            'token_url': f"{self.url}/standin-tenant/oauth2/v2.0/token"
+        }
+
+    def route(self, handler, method, url):
+        path = unquote(url.path)
+        if method == 'POST' and path.endswith('/oauth2/v2.0/token'):
+            self.send_json(handler, {'access_token': self.TOKEN, 'expires_in': 3599, 'token_type': 'Bearer'})
+            return
+
+        if handler.headers.get('Authorization') != f"Bearer {self.TOKEN}":
+            self.send_error_response(handler, 401, 'Invalid token')
+            return
+
+        resource = f"/sites/teams/_api/web/GetFileByServerRelativeUrl('{self.FILE_PATH}')"
+        if path == resource + '/$value':
+            self.send_workbook(handler, head=method == 'HEAD', headers={'ETag': f'"{self.etag}"'})
+        elif path == resource:
+            self.send_json(handler, {
+                'ETag': f'"{{{self.etag}}},1"',
+                'TimeLastModified': self.iso_modified,
+                'Length': str(len(self.content))
+            }, head=method == 'HEAD')
+        else:
+            self.send_error_response(handler, 404, 'File Not Found')
+
+
+class DriveStandIn(StandInServer):
+    """
+    Google OAuth token endpoint and Drive v3 files API
+
+    POST /token                           (service-account JWT bearer grant)
+    GET  /drive/v3/files/{id}?fields=...  metadata
+    GET  /drive/v3/files/{id}?alt=media   content
+    """
+
+    FILE_ID = 'standin-file-id'
+    TOKEN = 'standin-drive-token'
+
+    def config(self, credentials_path: str) -> Dict[str, Any]:
+        """
+        Drive config; writes a service-account file whose token_uri is this server
+
+        google-auth signs its token request with the account's private key,
+        so a throwaway RSA key is generated (cryptography, or rsa, which
+        google-auth depends on).
+        """
+        with open(credentials_path, 'w') as f:
+            json.dump({
+                'type': 'service_account',
+                'project_id': 'standin',
+                'private_key_id': 'standin',
+                'private_key': _throwaway_private_key(),
+                'client_email': 'standin@standin.iam.gserviceaccount.com',
+                'client_id': '0',
+                'token_uri': f"{self.url}/token"
+            }, f)
+        return {
+            'file_id': self.FILE_ID,
+            'credentials_path': credentials_path,
+            'api_url': f"{self.url}/drive/v3"
+        }
+
+    def route(self, handler, method, url):
+        if method == 'POST' and url.path == '/token':
+            self.send_json(handler, {'access_token': self.TOKEN, 'expires_in': 3599, 'token_type': 'Bearer'})
+            return
+
+        if handler.headers.get('Authorization') != f"Bearer {self.TOKEN}":
+            self.send_error_response(handler, 401, 'Invalid Credentials')
+            return
+
+        if url.path != f"/drive/v3/files/{self.FILE_ID}":
+            self.send_error_response(handler, 404, 'File not found')
+            return
+
+        query = parse_qs(url.query)
+        if query.get('alt') == ['media']:
+            self.send_workbook(handler, head=method == 'HEAD')
+        else:
+            self.send_json(handler, {
+                'md5Checksum': self.etag,
+                'modifiedTime': self.iso_modified,
+                'version': '1'
+            }, head=method == 'HEAD')
+
+
+class S3StandIn(StandInServer):
+    """
+    S3 object API, path-style (GET/HEAD /{bucket}/{key}); signatures are not checked
+    """
+
+    BUCKET = 'standin-bucket'
+    KEY = 'data/Basketball Sources Links.xlsx'
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            'bucket': self.BUCKET,
+            'key': self.KEY,
+            'aws_access_key_id': 'standin',
+            'aws_secret_access_key': 'standin',
+            'region': 'us-east-1',
+            'endpoint_url': self.url
+        }
+
+    def send_error_response(self, handler, status, message, retry_after=False):
+        # boto3 reads S3 errors from an XML body
+        code = {503: 'SlowDown', 404: 'NoSuchKey'}.get(status, 'InternalError')
+        body = (f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code>'
+                f'<Message>{message}</Message></Error>').encode('utf-8')
+        self.send_body(handler, status, body, {'Content-Type': 'application/xml'},
+                       head=handler.command == 'HEAD')
+
+    def route(self, handler, method, url):
+        if unquote(url.path) != f"/{self.BUCKET}/{self.KEY}" or method == 'POST':
+            self.send_error_response(handler, 404, 'The specified key does not exist.')
+            return
+        self.send_workbook(handler, head=method == 'HEAD', headers={
+            'ETag': f'"{self.etag}"',
+            'Last-Modified': self.last_modified
+        })
+
+
+def _throwaway_private_key() -> str:
+    """PEM of a new 2048-bit RSA key"""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode('ascii')
+    except ImportError:
+        import rsa
+
+        _, private_key = rsa.newkeys(2048)
+        return private_key.save_pkcs1().decode('ascii')
@@ -0,0 +1,127 @@
+"""
+Synthetic team data for benchmarks
+Produces frames shaped like "Basketball Sources Links.xlsx"
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+CITIES = [
+    'Austin', 'Boston', 'Chicago', 'Denver', 'Eugene', 'Fresno', 'Gainesville',
+    'Houston', 'Irvine', 'Jackson', 'Kent', 'Lawrence', 'Memphis', 'Norfolk',
+    'Omaha', 'Provo', 'Queens', 'Reno', 'Syracuse', 'Tulsa', 'Utica', 'Villanova',
+    'Wichita', 'Xavier', 'Yale', 'Zagreb', 'Bologna', 'Madrid', 'Kaunas', 'Belgrade'
+]
+
+MASCOTS = [
+    'Bears', 'Eagles', 'Tigers', 'Wildcats', 'Bulldogs', 'Knights', 'Dolphins',
+    'Colonels', 'Hawks', 'Panthers', 'Rams', 'Falcons', 'Owls', 'Lions', 'Huskies',
+    'Spartans', 'Titans', 'Cougars', 'Mustangs', 'Pirates'
+]
+
+COUNTRIES = [
+    'United States', 'Italy', 'Argentina', 'France', 'Spain', 'Germany', 'Greece',
+    'Turkey', 'Lithuania', 'Serbia', 'Croatia', 'Israel', 'Australia', 'Brazil',
+    'Japan', 'China', 'Philippines', 'Canada', 'Mexico', 'Poland'
+]
+
+LEAGUES = ['FIBA', 'NCAA', 'NCAA Women', 'FIBA Women', 'League']
+
+
+def generate_teams(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a synthetic teams frame
+
+    Args:
+        rows: Number of teams
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        pandas.DataFrame: Frame with the workbook's columns, links partly empty
+    """
+    rng = np.random.default_rng(seed)
+
+    # Zipf-like skew: a handful of countries hold most of the teams
+    weights = 1.0 / np.arange(1, len(COUNTRIES) + 1) ** 1.3
+    country = rng.choice(COUNTRIES, size=rows, p=weights / weights.sum())
+
+    city = rng.choice(CITIES, size=rows)
+    mascot = rng.choice(MASCOTS, size=rows)
+    team = [f"{c} {m} {i}" for i, (c, m) in enumerate(zip(city, mascot))]
+
+    league = np.where(
+        country == 'United States',
+        rng.choice(['NCAA', 'NCAA Women'], size=rows, p=[0.63, 0.37]),
+        rng.choice(['FIBA', 'FIBA Women', 'League'], size=rows, p=[0.78, 0.18, 0.04])
+    )
+
+    def links(prefix: str, presence: float) -> np.ndarray:
+        present = rng.random(rows) < presence
+        return np.where(present, [f"{prefix}{i}" for i in range(rows)], '')
+
+    return pd.DataFrame({
+        'Team': team,
+        'Sports': 'Basketball',
+        'Country': country,
+        'League': league,
+        'Twitter': links('https://twitter.com/team', 0.7),
+        'Facebook': links('https://facebook.com/team', 0.6),
+        'Instagram': links('https://instagram.com/team', 0.5),
+        'Official Page': links('https://example.com/team', 0.8),
+        'Other Links': links('https://example.org/team', 0.1),
+    })
+
+
+def write_workbook(path: str, rows: int, seed: int = 0) -> str:
+    """
+    Write a synthetic "Basketball Sources Links.xlsx"
+
+    Same sheet name, column order and blank cells as the real workbook.
+    openpyxl's write-only mode streams the rows, which keeps a 1M-row file
+    (close to Excel's row limit) within a few minutes and a bounded amount
+    of workbook memory.
+
+    Args:
+        path: Output file
+        rows: Number of teams
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        str: path
+    """
+    from openpyxl import Workbook
+
+    df = generate_teams(rows, seed=seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(list(df.columns))
+    for values in df.itertuples(index=False, name=None):
+        sheet.append([value if value != '' else None for value in values])
+    workbook.save(path)
+    return path
+
+
+def cached_workbook(rows: int) -> str:
+    """
+    Path of the synthetic workbook of a size, generated on first use
+
+    Workbooks are kept under cache/bench/teams-{rows}/ (the name the app
+    looks for), since the larger ones take minutes to write.
+
+    Args:
+        rows: Number of teams
+
+    Returns:
+        str: Path of the workbook
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = os.path.join(root, 'cache', 'bench', f"teams-{rows}")
+    workbook = os.path.join(workdir, 'Basketball Sources Links.xlsx')
+    if not os.path.exists(workbook):
+        os.makedirs(workdir, exist_ok=True)
+        print(f"Generating {rows:,}-row workbook...", flush=True)
+        write_workbook(workbook + '.tmp', rows)
+        os.replace(workbook + '.tmp', workbook)
+    return workbook
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Static Asset Build
+Writes fingerprinted, pre-compressed copies of static/ and their manifest
+Run at deploy time (bin/post_compile on Heroku); the app builds them on startup otherwise
+"""
+
+import logging
+import os
+
+from config import config
+from services.static_assets import AssetManifest
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    manifest = AssetManifest(static_dir, config.asset_dir)
+    for name, hashed in sorted(manifest.build().items()):
+        print(f"{name} -> {hashed}")
+
+
+if __name__ == '__main__':
+    main()
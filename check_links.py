@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Link Health Check
+Verifies the teams' Twitter, Facebook, Instagram, official and other URLs
+Run it from Heroku Scheduler (python check_links.py), or let the web dynos
+run it in the background by setting LINK_CHECK_INTERVAL_HOURS
+"""
+
+import argparse
+import logging
+from datetime import timedelta
+
+from config import config
+from services.link_checker import LinkChecker, LinkStatusStore, extract_links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the teams' links and store their status")
+    parser.add_argument('--force', action='store_true', help="ignore the TTL and check every URL again")
+    parser.add_argument('--limit', type=int, help="check at most this many URLs")
+    parser.add_argument('--concurrency', type=int, default=config.link_check_concurrency)
+    parser.add_argument('--per-host', type=int, default=config.link_check_per_host)
+    parser.add_argument('--timeout', type=float, default=config.link_check_timeout)
+    parser.add_argument('--ttl-hours', type=float, default=config.link_check_ttl_hours)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    # Loads the data through the configured provider (and the snapshot cache)
+    import app as dashboard
+    dashboard.create_app()
+    if dashboard.snapshot is None:
+        raise SystemExit("No team data available")
+
+    urls = extract_links(dashboard.snapshot.teams)
+    if args.limit:
+        urls = urls[:args.limit]
+
+    store = LinkStatusStore(config.link_status_file)
+    checker = LinkChecker(store, timeout=args.timeout, concurrency=args.concurrency,
+                          per_host=args.per_host, ttl=timedelta(hours=args.ttl_hours))
+    summary = checker.check(urls, force=args.force)
+
+    print(f"{summary['urls']} URLs: {summary['checked']} checked, {summary['cached']} still fresh "
+          f"({summary['seconds']}s)")
+    for status, count in sorted(store.summary()['statuses'].items()):
+        print(f"  {status:<12} {count}")
+
+
+if __name__ == '__main__':
+    main()
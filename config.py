@@ -11,7 +11,8 @@ load_dotenv()
 class DatabaseConfig:
     """Database configuration settings"""
     provider: str = "google_drive"  # Only allow google_drive
-    refresh_interval_minutes: int = 5760  
+    refresh_interval_minutes: float = 5760  
+    refresh_retry_seconds: int = 300
     config: Dict[str, Any] = None
     
     def __post_init__(self):
@@ -41,12 +42,49 @@ class AppConfig:
     # AWS/Cloud settings
     aws_region: str = os.getenv('AWS_REGION', 'us-east-1')
     
+    # Provider HTTP clients (timeouts in seconds, exponential backoff between retries)
+    http_timeout: float = float(os.getenv('HTTP_TIMEOUT', 30))
+    http_max_retries: int = int(os.getenv('HTTP_MAX_RETRIES', 3))
+    http_backoff_factor: float = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+    
+    # Workbook downloads: hard size cap, and how much is buffered in RAM before spilling to disk
+    max_download_mb: int = int(os.getenv('MAX_DOWNLOAD_MB', 100))
+    spool_memory_mb: int = int(os.getenv('SPOOL_MEMORY_MB', 8))
+    
     # Data source configuration
     database: DatabaseConfig = None
     
     # Performance optimization for cost reduction
     cache_timeout: int = int(os.getenv('CACHE_TIMEOUT', 86400))  # 24 hours default
     enable_data_caching: bool = os.getenv('ENABLE_CACHING', 'True').lower() == 'true'
+    response_cache_entries: int = int(os.getenv('RESPONSE_CACHE_ENTRIES', 256))
+    response_cache_mb: int = int(os.getenv('RESPONSE_CACHE_MB', 32))
+    snapshot_cache_dir: str = os.getenv('SNAPSHOT_CACHE_DIR', 'cache/snapshots')
+    map_cache_dir: str = os.getenv('MAP_CACHE_DIR', 'cache/maps')
+    asset_dir: str = os.getenv('ASSET_DIR', 'cache/assets')
+    
+    # Generations published by the refreshing worker for the others to attach
+    # (a hand-off between workers, not shared memory: each worker holds its own copy)
+    shared_data_dir: str = os.getenv('SHARED_DATA_DIR', 'cache/shared')
+    # Seconds a worker waits for another one's refresh before loading on its own
+    refresh_lease_timeout: float = float(os.getenv('REFRESH_LEASE_TIMEOUT', 600))
+    # Dataset generations whose row hashes are kept for /api/changes deltas, and their memory budget
+    change_history: int = int(os.getenv('CHANGE_HISTORY', 5))
+    change_history_mb: int = int(os.getenv('CHANGE_HISTORY_MB', 64))
+    
+    # Link health checks (check_links.py, or in the app every LINK_CHECK_INTERVAL_HOURS; 0 disables)
+    link_status_file: str = os.getenv('LINK_STATUS_FILE', 'cache/link_status.json')
+    link_check_interval_hours: float = float(os.getenv('LINK_CHECK_INTERVAL_HOURS', 0))
+    link_check_ttl_hours: float = float(os.getenv('LINK_CHECK_TTL_HOURS', 168))
+    link_check_timeout: float = float(os.getenv('LINK_CHECK_TIMEOUT', 10))
+    link_check_concurrency: int = int(os.getenv('LINK_CHECK_CONCURRENCY', 32))
+    link_check_per_host: int = int(os.getenv('LINK_CHECK_PER_HOST', 4))
+    
+    # API pagination
+    page_size: int = int(os.getenv('PAGE_SIZE', 100))
+    max_page_size: int = int(os.getenv('MAX_PAGE_SIZE', 1000))
+    # XLSX exports are written completely before the first byte is sent (10-20 s per 100k rows)
+    export_xlsx_max_rows: int = int(os.getenv('EXPORT_XLSX_MAX_ROWS', 100000))
     
     # Cost optimization settings
     lazy_load_map: bool = os.getenv('LAZY_LOAD_MAP', 'True').lower() == 'true'
@@ -97,7 +135,8 @@ class AppConfig:
         
         return DatabaseConfig(
             provider=provider,
-            refresh_interval_minutes=int(os.getenv('DATA_REFRESH_INTERVAL', 5760)),
+            refresh_interval_minutes=float(os.getenv('DATA_REFRESH_INTERVAL', 5760)),
+            refresh_retry_seconds=int(os.getenv('REFRESH_RETRY_SECONDS', 300)),
             config=config
         )
     
@@ -0,0 +1,120 @@
+"""
+Compact Frame for Basketball Dashboard
+Dictionary-encoded, interned and sparse storage for the in-memory teams data
+"""
+
+import sys
+from typing import Dict, Any
+
+import numpy as np
+import pandas as pd
+
+# Low-cardinality dimensions stored as categoricals (int8/int16 codes + one copy of each value)
+CATEGORICAL_COLUMNS = ['Country', 'League', 'Sports']
+
+# Link columns; each is stored sparsely when mostly blank, interned otherwise
+LINK_COLUMNS = ['Twitter', 'Facebook', 'Instagram', 'Official Page', 'Other Links']
+
+# A sparse object column costs an int32 position plus a pointer per non-blank
+# value, against a pointer per row when dense; below this blank share the
+# dense column is smaller
+SPARSE_MIN_BLANK_RATIO = 0.5
+
+
+def _intern(values: pd.Series) -> pd.Series:
+    """Share one string object between all equal values of a column"""
+    return values.map(lambda value: sys.intern(value) if isinstance(value, str) else value)
+
+
+def compact_teams(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Re-encode a cleaned teams frame with compact column storage
+
+    Values are unchanged (records, JSON and comparisons behave the same), only
+    their representation differs. Applying it to an already compact frame is
+    a no-op.
+
+    Args:
+        df: Cleaned teams data (blanks filled with '')
+
+    Returns:
+        pandas.DataFrame: Compact copy of the frame
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+
+        if isinstance(values.dtype, (pd.CategoricalDtype, pd.SparseDtype)):
+            columns[column] = values
+        elif column in CATEGORICAL_COLUMNS:
+            columns[column] = values.astype('category')
+        elif column in LINK_COLUMNS and len(values) and \
+                (values == '').mean() >= SPARSE_MIN_BLANK_RATIO:
+            columns[column] = values.astype(pd.SparseDtype(object, ''))
+        elif values.dtype == object:
+            columns[column] = _intern(values)
+        else:
+            columns[column] = values
+
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _object_bytes(values: np.ndarray) -> int:
+    """Pointer array plus each distinct object once (shared strings count once)"""
+    distinct = {id(value): value for value in values}
+    return values.nbytes + sum(sys.getsizeof(value) for value in distinct.values())
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """
+    Resident size of a frame's column data
+
+    Unlike DataFrame.memory_usage(deep=True), a string object referenced by
+    many rows is counted once, so interning shows up in the figure.
+
+    Args:
+        df: Any DataFrame
+
+    Returns:
+        int: Approximate bytes held by the columns (index excluded)
+    """
+    total = 0
+    for column in df.columns:
+        values = df[column]
+        dtype = values.dtype
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            total += values.cat.codes.to_numpy().nbytes
+            total += _object_bytes(np.asarray(dtype.categories, dtype=object))
+        elif isinstance(dtype, pd.SparseDtype):
+            array = values.array
+            total += array.sp_index.indices.nbytes
+            total += _object_bytes(np.asarray(array.sp_values, dtype=object))
+        elif dtype == object:
+            total += _object_bytes(values.to_numpy())
+        else:
+            total += int(values.memory_usage(index=False, deep=True))
+    return total
+
+
+def memory_report(served: pd.DataFrame, plain_bytes: int, compact: bool) -> Dict[str, Any]:
+    """
+    Bytes-per-row of the served frame against the frame as cleaned, for /health
+
+    Args:
+        served: Frame actually held by the snapshot
+        plain_bytes: frame_bytes() of the cleaned frame, with plain object columns
+        compact: Whether compact storage was requested
+
+    Returns:
+        dict: Row count, bytes per row of both frames and the saving
+    """
+    rows = max(len(served), 1)
+    after = frame_bytes(served)
+    return {
+        'rows': len(served),
+        'compact': compact,
+        'bytes_per_row_before': round(plain_bytes / rows, 1),
+        'bytes_per_row_after': round(after / rows, 1),
+        'saved_percent': round(100 * (1 - after / plain_bytes), 1) if plain_bytes else 0.0
+    }
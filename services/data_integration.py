@@ -5,36 +5,187 @@ Handles secure data fetching from SharePoint, Google Drive, and other cloud prov
 
 import os
 import json
+import hashlib
 import pandas as pd
 import logging
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
-from io import BytesIO
+from typing import Optional, Dict, Any, Tuple, Callable, Iterator, IO
 
-# Cloud storage imports
-try:
-    import boto3
-    from azure.storage.file import FileService
-    from google.cloud import storage as gcs
-    from google.oauth2.service_account import Credentials
-    import requests
-except ImportError as e:
-    logging.warning(f"Some cloud dependencies not available: {e}")
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Cloud provider SDKs (boto3, azure-storage-file, google-auth) are imported
+# lazily by the helpers that use them: only the configured provider's SDK is
+# ever loaded, and worker boot does not pay for the others.
+
+NAN = float('nan')
+
+# Cell strings pd.read_excel reads as missing (its default na_values)
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+
+def _cell_value(value: Any) -> Any:
+    """A cell as pd.read_excel returns it: blanks and NA strings as NaN, integral floats as int"""
+    if value is None:
+        return NAN
+    if isinstance(value, str):
+        return NAN if value in NA_STRINGS else value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+@dataclass(frozen=True)
+class SourceVersion:
+    """
+    Validators describing one revision of the source workbook
+    
+    Checksums are compared first, then ETags, then modification times;
+    a version with no validators never matches, forcing a download.
+    """
+    etag: Optional[str] = None
+    checksum: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    
+    @classmethod
+    def from_file(cls, path: str) -> "SourceVersion":
+        """Version of a local file from its content hash and modification time"""
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        stat = os.stat(path)
+        return cls(
+            etag=f"{stat.st_size}-{stat.st_mtime_ns}",
+            checksum=digest.hexdigest(),
+            last_modified=datetime.fromtimestamp(stat.st_mtime)
+        )
+    
+    def matches(self, other: Optional["SourceVersion"]) -> bool:
+        if other is None:
+            return False
+        if self.checksum and other.checksum:
+            return self.checksum == other.checksum
+        if self.etag and other.etag:
+            return self.etag == other.etag
+        if self.last_modified and other.last_modified:
+            return self.last_modified == other.last_modified
+        return False
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse RFC 3339 timestamps as returned by Drive and SharePoint"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
-# Make sure Credentials is always available
-try:
-    from google.oauth2.service_account import Credentials
-except ImportError:
-    Credentials = None
 
 class DataIntegrationService:
     """
     Secure data integration service supporting multiple cloud providers
     """
     
-    def __init__(self):
+    GOOGLE_DRIVE_API = 'https://www.googleapis.com/drive/v3'
+    
+    # Refresh cached access tokens this many seconds before they expire
+    TOKEN_REFRESH_MARGIN = 300
+    
+    # Download chunk size; Azure Files is read with ranged requests of this size
+    CHUNK_SIZE = 1024 * 1024
+    
+    # HTTP bodies are read in pieces of this size: bytes of a piece that was
+    # cut short are lost, so a resumed download repeats at most this much
+    HTTP_READ_SIZE = 64 * 1024
+    
+    # Exceptions that interrupt a transfer and justify resuming it, whatever the provider
+    RETRYABLE_ERRORS = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+        ConnectionError,
+        TimeoutError
+    )
+    
+    def __init__(self, timeout: float = 30, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_download_bytes: int = 100 * 1024 * 1024, spool_memory_bytes: int = 8 * 1024 * 1024):
         self.logger = logging.getLogger(__name__)
         self.supported_providers = ['sharepoint', 'google_drive', 'aws_s3', 'azure_files']
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_download_bytes = max_download_bytes
+        self.spool_memory_bytes = spool_memory_bytes
+        
+        # Long-lived per-provider clients, created on first use
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._tokens: Dict[Tuple, Tuple[str, float]] = {}
+        self._clients: Dict[Tuple, Any] = {}
+        
+        # Size and stage durations of the last workbook fetch, for /health
+        self.last_fetch: Optional[Dict[str, Any]] = None
+    
+    def _session(self, provider: str) -> requests.Session:
+        """Pooled keep-alive HTTP session for a provider, with retry/backoff"""
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                retry = Retry(
+                    total=self.max_retries,
+                    backoff_factor=self.backoff_factor,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset({'GET', 'HEAD', 'POST'}),
+                    respect_retry_after_header=True
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[provider] = session
+            return session
+    
+    def _cached_token(self, key: Tuple, fetch: Callable[[], Tuple[str, float]]) -> str:
+        """
+        Return a cached access token, fetching a new one only near expiry
+        
+        Args:
+            key: Identifies the credentials the token belongs to
+            fetch: Returns (token, seconds until it expires)
+        """
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and time.monotonic() < cached[1] - self.TOKEN_REFRESH_MARGIN:
+                return cached[0]
+        
+        token, expires_in = fetch()
+        with self._lock:
+            self._tokens[key] = (token, time.monotonic() + expires_in)
+        return token
+    
+    def _cached_client(self, key: Tuple, create: Callable[[], Any]) -> Any:
+        """Return a long-lived SDK client, creating it on first use"""
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = create()
+            return client
+    
+    def close(self) -> None:
+        """Close pooled connections and forget cached clients and tokens"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._tokens.clear()
+            self._clients.clear()
         
     def fetch_excel_data(self, provider: str, config: Dict[str, Any]) -> pd.DataFrame:
         """
@@ -45,38 +196,90 @@ class DataIntegrationService:
             config: Provider-specific configuration
             
         Returns:
-            pandas.DataFrame: Cleaned basketball teams data
+            pandas.DataFrame: Cleaned basketball teams data; the download size
+                              and the time spent downloading, parsing and
+                              cleaning are kept in last_fetch
         """
         if provider not in self.supported_providers:
             raise ValueError(f"Unsupported provider: {provider}")
+        
+        download = {
+            'sharepoint': self._download_from_sharepoint,
+            'google_drive': self._download_from_google_drive,
+            'aws_s3': self._download_from_s3,
+            'azure_files': self._download_from_azure
+        }[provider]
             
         try:
-            if provider == 'sharepoint':
-                return self._fetch_from_sharepoint(config)
-            elif provider == 'google_drive':
-                return self._fetch_from_google_drive(config)
-            elif provider == 'aws_s3':
-                return self._fetch_from_s3(config)
-            elif provider == 'azure_files':
-                return self._fetch_from_azure(config)
+            # Each stage is timed, so slow refreshes can be attributed
+            started = time.perf_counter()
+            spool = download(config)
+            size = spool.seek(0, os.SEEK_END)
+            spool.seek(0)
+            downloaded = time.perf_counter()
+            
+            df = self._read_excel(spool)
+            parsed = time.perf_counter()
+            
+            df = self._clean_data(df)
+            cleaned = time.perf_counter()
         except Exception as e:
             self.logger.error(f"Error fetching data from {provider}: {str(e)}")
             raise
+        
+        self.last_fetch = {
+            'provider': provider,
+            'at': datetime.now().isoformat(),
+            'bytes': size,
+            'rows': len(df),
+            'seconds': {
+                'download': round(downloaded - started, 3),
+                'parse': round(parsed - downloaded, 3),
+                'clean': round(cleaned - parsed, 3)
+            }
+        }
+        self.logger.info(
+            f"Fetched {provider} workbook ({size / 1e6:.1f} MB, {len(df)} rows): "
+            f"download {downloaded - started:.2f}s, parse {parsed - downloaded:.2f}s, "
+            f"clean {cleaned - parsed:.2f}s"
+        )
+        return df
     
-    def _fetch_from_sharepoint(self, config: Dict[str, Any]) -> pd.DataFrame:
+    def fetch_excel_data_if_changed(self, provider: str, config: Dict[str, Any],
+                                    known_version: Optional[SourceVersion] = None
+                                    ) -> Tuple[Optional[pd.DataFrame], Optional[SourceVersion]]:
         """
-        Fetch Excel file from SharePoint Online
+        Fetch Excel data only if the source changed since known_version
         
-        Config should include:
-        - site_url: SharePoint site URL
-        - file_path: Path to Excel file
-        - client_id: Application client ID
-        - client_secret: Application client secret
-        - tenant_id: Azure tenant ID
+        Args:
+            provider: Cloud provider name
+            config: Provider-specific configuration
+            known_version: Version of the data currently loaded, if any
+            
+        Returns:
+            tuple: (DataFrame, or None when unchanged; current source version)
         """
+        # One metadata request: when it fails, the source is likely struggling,
+        # and repeating it would only add another round of retries
+        version = None
         try:
-            # Get access token
-            token_url = f"https://login.microsoftonline.com/{config['tenant_id']}/oauth2/v2.0/token"
+            version = self.get_source_version(provider, config)
+        except Exception as e:
+            # Freshness is an optimization; fall back to a full fetch
+            self.logger.warning(f"Freshness check failed for {provider}: {str(e)}")
+        
+        if version is not None and version.matches(known_version):
+            self.logger.info(f"{provider} source unchanged, skipping download")
+            return None, version
+        
+        return self.fetch_excel_data(provider, config), version
+    
+    def _sharepoint_token(self, config: Dict[str, Any]) -> str:
+        """Client-credentials access token for SharePoint (cached until near expiry)"""
+        token_url = config.get('token_url') or \
+            f"https://login.microsoftonline.com/{config['tenant_id']}/oauth2/v2.0/token"
+        
+        def fetch():
             token_data = {
                 'grant_type': 'client_credentials',
                 'client_id': config['client_id'],
@@ -84,65 +287,294 @@ class DataIntegrationService:
                 'scope': 'https://graph.microsoft.com/.default'
             }
             
-            token_response = requests.post(token_url, data=token_data)
+            token_response = self._session('sharepoint').post(token_url, data=token_data, timeout=self.timeout)
             token_response.raise_for_status()
-            access_token = token_response.json()['access_token']
+            payload = token_response.json()
+            return payload['access_token'], float(payload.get('expires_in', 3600))
+        
+        return self._cached_token(('sharepoint', token_url, config['client_id']), fetch)
+    
+    def _sharepoint_file_url(self, config: Dict[str, Any]) -> str:
+        """SharePoint REST URL of the workbook's file resource"""
+        return f"{config['site_url']}/_api/web/GetFileByServerRelativeUrl('{config['file_path']}')"
+    
+    def _google_drive_token(self, config: Dict[str, Any]) -> str:
+        """Service-account access token for Google Drive (cached until near expiry)"""
+        def fetch():
+            from google.oauth2.service_account import Credentials
+            from google.auth.transport.requests import Request
             
-            # Download file from SharePoint
-            headers = {'Authorization': f'Bearer {access_token}'}
-            file_url = f"{config['site_url']}/_api/web/GetFileByServerRelativeUrl('{config['file_path']}')/\$value"
+            credentials = Credentials.from_service_account_file(
+                config['credentials_path'],
+                scopes=['https://www.googleapis.com/auth/drive.readonly']
+            )
             
-            response = requests.get(file_url, headers=headers)
+            # Refresh credentials to get token, over the pooled session
+            credentials.refresh(Request(session=self._session('google_drive')))
+            expires_in = (credentials.expiry - datetime.utcnow()).total_seconds() \
+                if credentials.expiry else 3600
+            return credentials.token, expires_in
+        
+        return self._cached_token(('google_drive', config['credentials_path']), fetch)
+    
+    def _google_drive_file_url(self, config: Dict[str, Any]) -> str:
+        """Drive API URL of the workbook's file resource"""
+        api_url = config.get('api_url', self.GOOGLE_DRIVE_API)
+        return f"{api_url}/files/{config['file_id']}"
+    
+    def _s3_client(self, config: Dict[str, Any]):
+        """boto3 S3 client for the configured credentials, reused across calls"""
+        def create():
+            import boto3
+            from botocore.config import Config as BotoConfig
+            
+            return boto3.client(
+                's3',
+                aws_access_key_id=config.get('aws_access_key_id'),
+                aws_secret_access_key=config.get('aws_secret_access_key'),
+                region_name=config.get('region', 'us-east-1'),
+                endpoint_url=config.get('endpoint_url'),
+                config=BotoConfig(
+                    connect_timeout=self.timeout,
+                    read_timeout=self.timeout,
+                    retries={'max_attempts': self.max_retries + 1, 'mode': 'standard'}
+                )
+            )
+        
+        key = ('aws_s3', config.get('aws_access_key_id'), config.get('region'), config.get('endpoint_url'))
+        return self._cached_client(key, create)
+    
+    def _azure_file_service(self, config: Dict[str, Any]):
+        """Azure Files client for the configured storage account, reused across calls"""
+        def create():
+            from azure.storage.file import FileService
+            
+            file_service = FileService(
+                account_name=config['account_name'],
+                account_key=config['account_key']
+            )
+            file_service.socket_timeout = self.timeout
+            return file_service
+        
+        return self._cached_client(('azure_files', config['account_name']), create)
+    
+    def _check_download_size(self, size: Optional[int]) -> None:
+        if size is not None and size > self.max_download_bytes:
+            raise ValueError(
+                f"Workbook is {size} bytes, over the {self.max_download_bytes} byte download limit"
+            )
+    
+    def _s3_retryable_errors(self) -> Tuple[type, ...]:
+        """botocore's transfer errors (botocore is loaded by then: only called for S3)"""
+        from botocore import exceptions as boto_errors
+        return tuple(
+            getattr(boto_errors, name) for name in (
+                'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError',
+                'IncompleteReadError', 'ResponseStreamingError'
+            ) if hasattr(boto_errors, name)
+        )
+    
+    def _download_to_spool(self, open_range: Callable[[int], Tuple[Iterator[bytes], bool]],
+                           retryable: Tuple[type, ...] = ()) -> IO[bytes]:
+        """
+        Stream a download into a spooled temporary file, resuming on failure
+        
+        Small files stay in memory; anything over spool_memory_bytes rolls
+        over to disk, so the process never holds the whole download in RAM.
+        
+        Args:
+            open_range: Opens the transfer at a byte offset and returns
+                (chunk iterator, whether the offset was honoured)
+            retryable: Provider SDK exceptions to resume on, besides
+                RETRYABLE_ERRORS
+            
+        Returns:
+            file: Spooled file positioned at the start; the caller closes it
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_memory_bytes)
+        retryable = self.RETRYABLE_ERRORS + tuple(retryable)
+        written = 0
+        attempt = 0
+        
+        try:
+            while True:
+                try:
+                    chunks, resumed = open_range(written)
+                    if written and not resumed:
+                        # The source ignored the range request: start over
+                        spool.seek(0)
+                        spool.truncate()
+                        written = 0
+                    
+                    for chunk in chunks:
+                        written += len(chunk)
+                        self._check_download_size(written)
+                        spool.write(chunk)
+                    
+                    spool.seek(0)
+                    return spool
+                
+                except retryable as e:
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    delay = self.backoff_factor * (2 ** (attempt - 1))
+                    self.logger.warning(
+                        f"Download interrupted at {written} bytes ({str(e)}); "
+                        f"resuming in {delay:.1f}s (attempt {attempt}/{self.max_retries})"
+                    )
+                    time.sleep(delay)
+        except Exception:
+            spool.close()
+            raise
+    
+    def _download_http(self, provider: str, url: str, headers: Dict[str, str]) -> IO[bytes]:
+        """Streaming, resumable GET into a spooled file"""
+        session = self._session(provider)
+        
+        def open_range(offset: int):
+            request_headers = dict(headers)
+            if offset:
+                request_headers['Range'] = f'bytes={offset}-'
+            response = session.get(url, headers=request_headers, stream=True, timeout=self.timeout)
             response.raise_for_status()
             
-            # Read Excel data
-            df = pd.read_excel(BytesIO(response.content))
-            return self._clean_data(df)
+            resumed = response.status_code == 206
+            length = response.headers.get('Content-Length')
+            if length is not None:
+                self._check_download_size(int(length) + (offset if resumed else 0))
+            return response.iter_content(chunk_size=self.HTTP_READ_SIZE), resumed
+        
+        return self._download_to_spool(open_range)
+    
+    def _read_excel(self, spool: IO[bytes]) -> pd.DataFrame:
+        """
+        Parse the first sheet of a downloaded workbook column by column
+
+        Streams rows from openpyxl's read-only reader straight into one list
+        per column instead of building the row-of-rows copy pd.read_excel
+        keeps, and closes the workbook and the download before the DataFrame
+        is assembled. Cells are read with pd.read_excel semantics, so every
+        provider and the local file give the same frame: its default NA
+        strings ("N/A", "NULL", "#N/A", ...) are missing values, integral
+        floats are ints and only trailing blank rows and columns are
+        dropped. Headers follow pandas naming: numbers and dates stay typed,
+        empty cells are "Unnamed: N" and duplicates get ".1" suffixes.
+        """
+        import openpyxl
+
+        try:
+            workbook = openpyxl.load_workbook(spool, read_only=True, data_only=True, keep_links=False)
+            try:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = next(rows, ())
+                columns = [[] for _ in header]
+                appends = [column.append for column in columns]
+                # Columns up to the last non-empty cell of any row; pandas drops the rest
+                width = len(header)
+                while width and header[width - 1] is None:
+                    width -= 1
+                blank_rows = 0
+                for row in rows:
+                    if all(value is None for value in row):
+                        # Kept only if data follows, as pd.read_excel does
+                        blank_rows += 1
+                        continue
+                    used = min(len(row), len(header))
+                    while used > width and row[used - 1] is None:
+                        used -= 1
+                    width = max(width, used)
+                    if blank_rows:
+                        for column in columns:
+                            column.extend([NAN] * blank_rows)
+                        blank_rows = 0
+                    for append, value in zip(appends, row):
+                        append(_cell_value(value))
+                    # Short rows are padded so every column stays aligned
+                    for append in appends[len(row):]:
+                        append(NAN)
+            finally:
+                workbook.close()
+        finally:
+            spool.close()
+
+        header, columns = header[:width], columns[:width]
+        names, unnamed = [], []
+        for position, name in enumerate(header):
+            if name is None or name == '':
+                unnamed.append(position)
+                name = f"Unnamed: {position}"
+            elif isinstance(name, float) and name.is_integer():
+                name = int(name)
+            names.append(name)
+
+        # Deduplicated like pandas' parser: by value (2024 and 2024.0 clash,
+        # 2024 and '2024' do not), given names before the unnamed ones
+        counts = defaultdict(int)
+        for position in [p for p in range(len(names)) if p not in unnamed] + unnamed:
+            name = original = names[position]
+            count = counts[name]
+            while count > 0:
+                counts[original] = count + 1
+                name = f"{original}.{count}"
+                count = count + 1 if name in names else counts[name]
+            names[position] = name
+            counts[name] = count + 1
+
+        df = pd.DataFrame(dict(zip(names, columns)), columns=names)
+        # Without data rows pandas has nothing to infer from and leaves columns as object
+        return df.astype(object) if df.empty else df
+    
+    def _download_from_sharepoint(self, config: Dict[str, Any]) -> IO[bytes]:
+        """
+        Download the Excel file from SharePoint Online into a spooled file
+        
+        Config should include:
+        - site_url: SharePoint site URL
+        - file_path: Path to Excel file
+        - client_id: Application client ID
+        - client_secret: Application client secret
+        - tenant_id: Azure tenant ID
+        """
+        try:
+            # Get access token
+            access_token = self._sharepoint_token(config)
+            
+            # Download file from SharePoint
+            headers = {'Authorization': f'Bearer {access_token}'}
+            file_url = f"{self._sharepoint_file_url(config)}/$value"
+            
+            return self._download_http('sharepoint', file_url, headers)
             
         except Exception as e:
-            self.logger.error(f"SharePoint fetch error: {str(e)}")
+            self.logger.error(f"SharePoint download error: {str(e)}")
             raise
     
-    def _fetch_from_google_drive(self, config: Dict[str, Any]) -> pd.DataFrame:
+    def _download_from_google_drive(self, config: Dict[str, Any]) -> IO[bytes]:
         """
-        Fetch Excel file from Google Drive
+        Download the Excel file from Google Drive into a spooled file
         
         Config should include:
         - file_id: Google Drive file ID
         - credentials_path: Path to service account JSON file
         """
         try:
-            import requests
-            from google.oauth2.service_account import Credentials
-            from google.auth.transport.requests import Request
-            
             # Authenticate with Google Drive
-            credentials = Credentials.from_service_account_file(
-                config['credentials_path'],
-                scopes=['https://www.googleapis.com/auth/drive.readonly']
-            )
-            
-            # Refresh credentials to get token
-            credentials.refresh(Request())
+            token = self._google_drive_token(config)
             
             # Download file
-            drive_url = f"https://www.googleapis.com/drive/v3/files/{config['file_id']}?alt=media"
-            headers = {'Authorization': f'Bearer {credentials.token}'}
-            
-            response = requests.get(drive_url, headers=headers)
-            response.raise_for_status()
+            drive_url = f"{self._google_drive_file_url(config)}?alt=media"
+            headers = {'Authorization': f'Bearer {token}'}
             
-            # Read Excel data
-            df = pd.read_excel(BytesIO(response.content))
-            return self._clean_data(df)
+            return self._download_http('google_drive', drive_url, headers)
             
         except Exception as e:
-            self.logger.error(f"Google Drive fetch error: {str(e)}")
+            self.logger.error(f"Google Drive download error: {str(e)}")
             raise
     
-    def _fetch_from_s3(self, config: Dict[str, Any]) -> pd.DataFrame:
+    def _download_from_s3(self, config: Dict[str, Any]) -> IO[bytes]:
         """
-        Fetch Excel file from AWS S3
+        Download the Excel file from AWS S3 into a spooled file
         
         Config should include:
         - bucket: S3 bucket name
@@ -152,30 +584,26 @@ class DataIntegrationService:
         - region: AWS region
         """
         try:
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=config.get('aws_access_key_id'),
-                aws_secret_access_key=config.get('aws_secret_access_key'),
-                region_name=config.get('region', 'us-east-1')
-            )
+            s3_client = self._s3_client(config)
             
-            # Download file from S3
-            response = s3_client.get_object(
-                Bucket=config['bucket'],
-                Key=config['key']
-            )
+            # Download file from S3, streaming the body in chunks
+            def open_range(offset: int):
+                params = {'Bucket': config['bucket'], 'Key': config['key']}
+                if offset:
+                    params['Range'] = f'bytes={offset}-'
+                response = s3_client.get_object(**params)
+                self._check_download_size(response.get('ContentLength', 0) + offset)
+                return response['Body'].iter_chunks(self.CHUNK_SIZE), bool(offset)
             
-            # Read Excel data
-            df = pd.read_excel(BytesIO(response['Body'].read()))
-            return self._clean_data(df)
+            return self._download_to_spool(open_range, retryable=self._s3_retryable_errors())
             
         except Exception as e:
-            self.logger.error(f"S3 fetch error: {str(e)}")
+            self.logger.error(f"S3 download error: {str(e)}")
             raise
     
-    def _fetch_from_azure(self, config: Dict[str, Any]) -> pd.DataFrame:
+    def _download_from_azure(self, config: Dict[str, Any]) -> IO[bytes]:
         """
-        Fetch Excel file from Azure File Storage
+        Download the Excel file from Azure File Storage into a spooled file
         
         Config should include:
         - account_name: Azure storage account name
@@ -184,24 +612,33 @@ class DataIntegrationService:
         - file_path: Path to file within share
         """
         try:
-            file_service = FileService(
-                account_name=config['account_name'],
-                account_key=config['account_key']
-            )
+            file_service = self._azure_file_service(config)
+            location = {
+                'share_name': config['share_name'],
+                'directory_name': '',
+                'file_name': config['file_path']
+            }
             
-            # Download file from Azure Files
-            file_content = file_service.get_file_to_bytes(
-                share_name=config['share_name'],
-                directory_name='',
-                file_name=config['file_path']
-            )
+            # Download file from Azure Files as a series of ranged reads
+            def open_range(offset: int):
+                size = file_service.get_file_properties(**location).properties.content_length
+                self._check_download_size(size)
+                
+                def chunks():
+                    position = offset
+                    while position < size:
+                        end = min(position + self.CHUNK_SIZE, size) - 1
+                        yield file_service.get_file_to_bytes(
+                            start_range=position, end_range=end, **location
+                        ).content
+                        position = end + 1
+                
+                return chunks(), True
             
-            # Read Excel data
-            df = pd.read_excel(BytesIO(file_content.content))
-            return self._clean_data(df)
+            return self._download_to_spool(open_range)
             
         except Exception as e:
-            self.logger.error(f"Azure Files fetch error: {str(e)}")
+            self.logger.error(f"Azure Files download error: {str(e)}")
             raise
     
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -226,6 +663,63 @@ class DataIntegrationService:
         
         return df
     
+    def get_source_version(self, provider: str, config: Dict[str, Any]) -> SourceVersion:
+        """
+        Read the source workbook's validators without downloading it
+        
+        Args:
+            provider: Cloud provider name
+            config: Provider configuration
+            
+        Returns:
+            SourceVersion: ETag/checksum/modification time reported by the provider
+        """
+        if provider == 'sharepoint':
+            headers = {
+                'Authorization': f'Bearer {self._sharepoint_token(config)}',
+                'Accept': 'application/json;odata=nometadata'
+            }
+            response = self._session('sharepoint').get(
+                self._sharepoint_file_url(config), headers=headers, timeout=self.timeout
+            )
+            response.raise_for_status()
+            metadata = response.json()
+            return SourceVersion(
+                etag=metadata.get('ETag') or response.headers.get('ETag'),
+                last_modified=_parse_timestamp(metadata.get('TimeLastModified'))
+            )
+        
+        elif provider == 'google_drive':
+            headers = {'Authorization': f'Bearer {self._google_drive_token(config)}'}
+            response = self._session('google_drive').get(
+                self._google_drive_file_url(config),
+                headers=headers,
+                params={'fields': 'md5Checksum,modifiedTime,version'},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            metadata = response.json()
+            return SourceVersion(
+                etag=metadata.get('version'),
+                checksum=metadata.get('md5Checksum'),
+                last_modified=_parse_timestamp(metadata.get('modifiedTime'))
+            )
+        
+        elif provider == 'aws_s3':
+            head = self._s3_client(config).head_object(Bucket=config['bucket'], Key=config['key'])
+            return SourceVersion(etag=head.get('ETag'), last_modified=head.get('LastModified'))
+        
+        elif provider == 'azure_files':
+            file_service = self._azure_file_service(config)
+            properties = file_service.get_file_properties(
+                share_name=config['share_name'],
+                directory_name='',
+                file_name=config['file_path']
+            ).properties
+            return SourceVersion(etag=properties.etag, last_modified=properties.last_modified)
+        
+        raise ValueError(f"Unsupported provider: {provider}")
+    
     def get_data_freshness(self, provider: str, config: Dict[str, Any]) -> datetime:
         """
         Get the last modified timestamp of the data source
@@ -235,11 +729,9 @@ class DataIntegrationService:
             config: Provider configuration
             
         Returns:
-            datetime: Last modified timestamp
+            datetime: Last modified timestamp (now, if the provider reports none)
         """
-        # Implementation would vary by provider
-        # This is a placeholder that returns current time
-        return datetime.now()
+        return self.get_source_version(provider, config).last_modified or datetime.now()
     
     def validate_connection(self, provider: str, config: Dict[str, Any]) -> bool:
         """
@@ -256,36 +748,15 @@ class DataIntegrationService:
             # Test connection without downloading full file
             if provider == 'sharepoint':
                 # Test SharePoint connection
-                token_url = f"https://login.microsoftonline.com/{config['tenant_id']}/oauth2/v2.0/token"
-                token_data = {
-                    'grant_type': 'client_credentials',
-                    'client_id': config['client_id'],
-                    'client_secret': config['client_secret'],
-                    'scope': 'https://graph.microsoft.com/.default'
-                }
-                response = requests.post(token_url, data=token_data)
-                return response.status_code == 200
+                return bool(self._sharepoint_token(config))
                 
             elif provider == 'google_drive':
                 # Test Google Drive connection
-                import requests
-                from google.oauth2.service_account import Credentials
-                from google.auth.transport.requests import Request
-                credentials = Credentials.from_service_account_file(
-                    config['credentials_path'],
-                    scopes=['https://www.googleapis.com/auth/drive.readonly']
-                )
-                credentials.refresh(Request())
-                return credentials is not None
+                return bool(self._google_drive_token(config))
                 
             elif provider == 'aws_s3':
                 # Test S3 connection
-                s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=config.get('aws_access_key_id'),
-                    aws_secret_access_key=config.get('aws_secret_access_key'),
-                    region_name=config.get('region', 'us-east-1')
-                )
+                s3_client = self._s3_client(config)
                 s3_client.head_object(Bucket=config['bucket'], Key=config['key'])
                 return True
                 
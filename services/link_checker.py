@@ -0,0 +1,284 @@
+"""
+Link Checker for Basketball Dashboard
+Concurrent health checks of the teams' social and official URLs, persisted with a TTL
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+from services.compact_frame import LINK_COLUMNS
+
+# Status values, from the most to the least conclusive
+STATUS_OK = 'ok'                    # 2xx after redirects
+STATUS_BROKEN = 'broken'            # 404/410, or the host does not resolve
+STATUS_UNREACHABLE = 'unreachable'  # connection refused or reset
+STATUS_TIMEOUT = 'timeout'
+STATUS_UNKNOWN = 'unknown'          # 401/403/429/5xx: blocked or failing, not necessarily dead
+STATUS_INVALID = 'invalid'          # cell text that is not a URL
+
+
+@dataclass
+class LinkResult:
+    """Outcome of checking one URL"""
+    url: str
+    status: str
+    checked_at: str
+    http_status: Optional[int] = None
+    final_url: Optional[str] = None
+    method: Optional[str] = None
+    elapsed_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def checked(self) -> datetime:
+        return datetime.fromisoformat(self.checked_at)
+
+
+def normalize_url(value) -> Optional[str]:
+    """The URL in a link cell, or None if the cell holds something else (e.g. "NOT FOUND")"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.startswith('www.'):
+        value = 'https://' + value
+    parts = urlsplit(value)
+    if parts.scheme not in ('http', 'https') or not parts.hostname or ' ' in value:
+        return None
+    return value
+
+
+def extract_links(df: pd.DataFrame) -> List[str]:
+    """Distinct URLs of all link columns, in workbook order"""
+    urls = {}
+    for column in LINK_COLUMNS:
+        if column not in df.columns:
+            continue
+        for value in pd.unique(df[column].astype(str)):
+            url = normalize_url(value)
+            if url is not None:
+                urls.setdefault(url, None)
+    return list(urls)
+
+
+class LinkStatusStore:
+    """
+    Persisted link check results, keyed by URL
+
+    Written atomically by the checker; web workers re-read the file when
+    its modification time changes (one stat() per lookup batch).
+    """
+
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.results: Dict[str, LinkResult] = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def reload(self) -> None:
+        """Pick up results written by another process"""
+        try:
+            version = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self.results = {url: LinkResult(**result) for url, result in data.items()}
+                self.version = version
+            except Exception as e:
+                self.logger.warning(f"Ignoring unreadable link status file: {str(e)}")
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({url: asdict(result) for url, result in self.results.items()}, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.version = os.stat(self.path).st_mtime_ns
+
+    def status(self, value) -> Optional[LinkResult]:
+        """
+        Result for a link cell
+
+        Returns:
+            LinkResult: The last check, an 'invalid' result for non-URL
+                        text, or None if the URL was never checked
+        """
+        url = normalize_url(value)
+        if url is None:
+            if isinstance(value, str) and value.strip():
+                return LinkResult(url=value, status=STATUS_INVALID, checked_at=datetime.now().isoformat())
+            return None
+        return self.results.get(url)
+
+    def summary(self) -> Dict[str, object]:
+        """Counts per status and the time of the latest check, for /health"""
+        results = list(self.results.values())
+        return {
+            'checked': len(results),
+            'statuses': dict(Counter(result.status for result in results)),
+            'last_checked': max((result.checked_at for result in results), default=None)
+        }
+
+
+class LinkChecker:
+    """
+    Checks URLs concurrently with asyncio, politely per host
+
+    Requests run on a thread pool (requests is blocking) under two limits:
+    a global one and a per-host one, so hundreds of Instagram links do not
+    hammer one site. Each URL gets a HEAD request; servers that refuse or
+    mishandle HEAD get a streamed GET whose body is never read. Results
+    younger than the TTL are reused, and everything is persisted to the
+    store as the run progresses.
+    """
+
+    # HEAD answers that mean "ask again with GET"
+    GET_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 429, 500, 501, 503}
+
+    # Save progress after this many new results
+    SAVE_EVERY = 200
+
+    USER_AGENT = 'Mozilla/5.0 (compatible; BasketballDashboardLinkChecker/1.0)'
+
+    def __init__(self, store: LinkStatusStore, timeout: float = 10, concurrency: int = 32,
+                 per_host: int = 4, ttl: timedelta = timedelta(days=7)):
+        self.logger = logging.getLogger(__name__)
+        self.store = store
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = self.USER_AGENT
+            self._local.session = session
+        return session
+
+    def due(self, urls: Iterable[str], force: bool = False) -> List[str]:
+        """URLs without a result younger than the TTL"""
+        if force:
+            return list(urls)
+        cutoff = datetime.now() - self.ttl
+        results = self.store.results
+        return [url for url in urls if url not in results or results[url].checked < cutoff]
+
+    def check_url(self, url: str) -> LinkResult:
+        """HEAD, falling back to GET; never raises"""
+        started = time.monotonic()
+        session = self._session()
+        result = LinkResult(url=url, status=STATUS_UNKNOWN, checked_at=datetime.now().isoformat())
+
+        try:
+            result.method = 'HEAD'
+            response = session.head(url, allow_redirects=True, timeout=self.timeout)
+            response.close()
+            if response.status_code in self.GET_FALLBACK_STATUSES:
+                result.method = 'GET'
+                response = session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                response.close()
+
+            result.http_status = response.status_code
+            result.final_url = response.url if response.url != url else None
+            if response.status_code < 400:
+                result.status = STATUS_OK
+            elif response.status_code in (404, 410):
+                result.status = STATUS_BROKEN
+            else:
+                result.status = STATUS_UNKNOWN
+        except requests.Timeout:
+            result.status = STATUS_TIMEOUT
+            result.error = f"No response within {self.timeout:g}s"
+        except requests.ConnectionError as e:
+            # DNS failures mean the domain is gone; refused connections may be temporary
+            message = str(e)
+            resolved = 'Name or service not known' not in message and 'NameResolutionError' not in message \
+                and 'nodename nor servname' not in message
+            result.status = STATUS_UNREACHABLE if resolved else STATUS_BROKEN
+            result.error = message[:200]
+        except requests.RequestException as e:
+            result.status = STATUS_UNKNOWN
+            result.error = str(e)[:200]
+
+        result.elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+        return result
+
+    async def _check_all(self, urls: List[str]) -> List[LinkResult]:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        results = []
+
+        async def check(url: str) -> None:
+            # Host first: a task waiting on a busy host must not hold a global slot
+            async with hosts[urlsplit(url).hostname]:
+                async with slots:
+                    result = await loop.run_in_executor(executor, self.check_url, url)
+            self.store.results[url] = result
+            results.append(result)
+            if len(results) % self.SAVE_EVERY == 0:
+                self.store.save()
+                self.logger.info(f"Checked {len(results)}/{len(urls)} links")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='link-check') as executor:
+            await asyncio.gather(*(check(url) for url in urls))
+        return results
+
+    def check(self, urls: Iterable[str], force: bool = False) -> Dict[str, object]:
+        """
+        Check every URL that is due and persist the results
+
+        Args:
+            urls: URLs to verify (see extract_links)
+            force: Ignore the TTL and check everything again
+
+        Returns:
+            dict: Number of URLs checked and reused, counts per status and duration
+        """
+        self.store.reload()
+        urls = list(urls)
+        due = self.due(urls, force=force)
+        started = time.monotonic()
+
+        results = asyncio.run(self._check_all(due)) if due else []
+        self.store.save()
+
+        summary = {
+            'urls': len(urls),
+            'checked': len(results),
+            'cached': len(urls) - len(due),
+            'statuses': dict(Counter(result.status for result in results)),
+            'seconds': round(time.monotonic() - started, 2)
+        }
+        self.logger.info(f"Link check finished: {summary}")
+        return summary
@@ -0,0 +1,209 @@
+"""
+Map Builder for Basketball Dashboard
+Renders the teams-by-country map once per dataset and stores it under a content hash
+"""
+
+import glob
+import hashlib
+import html
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from services.static_assets import ENCODING_SUFFIXES, write_compressed_variants
+
+
+class MapBuilder:
+    """
+    Versioned map artifacts, named after a hash of the markers they show
+
+    The hash covers the marker data and RENDERER_VERSION, not the rendered
+    HTML (folium element ids are random), so every worker derives the same
+    file name for the same data. A file that already exists is reused
+    without importing folium; writes are atomic, so concurrent builders
+    cannot expose a partial file. Pre-compressed .br/.gz copies are kept
+    next to each artifact.
+    """
+
+    # Bump whenever the rendered markup changes for the same markers
+    RENDERER_VERSION = 2
+
+    # From this zoom on, team clusters from /api/map/clusters are drawn
+    CLUSTER_MIN_ZOOM = 4
+
+    # Loads clusters for the visible area after every pan/zoom (a folium
+    # macro, so it renders after the map object it attaches to)
+    CLUSTER_LAYER_TEMPLATE = """
+    {% macro script(this, kwargs) %}
+    (function () {
+        var map = {{ this._parent.get_name() }};
+        var layer = L.layerGroup().addTo(map);
+        var latest = 0;
+
+        function wrap(lon) {
+            return ((lon + 180) % 360 + 360) % 360 - 180;
+        }
+
+        function refresh() {
+            var request = ++latest;
+            if (map.getZoom() < {{ this.min_zoom }}) {
+                layer.clearLayers();
+                return;
+            }
+            var bounds = map.getBounds();
+            var west = bounds.getWest(), east = bounds.getEast();
+            if (east - west < 360) {
+                west = wrap(west);
+                east = wrap(east);
+            }
+            var params = new URLSearchParams({
+                bbox: [west, bounds.getSouth(), east, bounds.getNorth()].join(','),
+                zoom: map.getZoom()
+            });
+            fetch('/api/map/clusters?' + params).then(function (response) {
+                return response.json();
+            }).then(function (data) {
+                if (request !== latest) {
+                    return;
+                }
+                layer.clearLayers();
+                data.clusters.forEach(function (cluster) {
+                    var label = document.createElement('span');
+                    label.textContent = cluster.team || (cluster.count + ' teams');
+                    L.circleMarker([cluster.lat, cluster.lon], {
+                        radius: Math.min(5 + 3 * Math.log2(cluster.count), 24),
+                        color: '#0d6efd',
+                        weight: 1,
+                        fillOpacity: 0.5
+                    }).bindTooltip(label).addTo(layer);
+                });
+            });
+        }
+
+        map.on('moveend', refresh);
+    })();
+    {% endmacro %}
+    """
+
+    def __init__(self, directory: str, keep: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.keep = keep
+
+    @staticmethod
+    def markers(teams: pd.DataFrame, coordinates: Dict[str, list]) -> List[dict]:
+        """
+        Team counts for every country that has known coordinates
+
+        Args:
+            teams: Teams data with a Country column
+            coordinates: Country name -> [lat, lon]
+
+        Returns:
+            list: Markers ordered by descending team count
+        """
+        counts = teams['Country'].value_counts(sort=True)
+        counts = counts[(counts > 0) & counts.index.isin(list(coordinates))]
+        return [
+            {'country': str(country), 'count': int(count), 'location': list(coordinates[country])}
+            for country, count in zip(counts.index, counts.to_numpy())
+        ]
+
+    def content_key(self, markers: List[dict]) -> str:
+        material = json.dumps({'renderer': self.RENDERER_VERSION, 'markers': markers}, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()[:16]
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def build(self, teams: pd.DataFrame, coordinates: Dict[str, list]) -> Optional[str]:
+        """
+        Make sure the map for this data exists on disk
+
+        Args:
+            teams: Teams data with a Country column
+            coordinates: Country name -> [lat, lon]
+
+        Returns:
+            str: File name of the map artifact
+        """
+        markers = self.markers(teams, coordinates)
+        filename = f"map-{self.content_key(markers)}.html"
+        path = self.path(filename)
+
+        if os.path.exists(path):
+            write_compressed_variants(path)
+            self.logger.info(f"Reusing map artifact {filename}")
+            return filename
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_atomic(path, self.render(markers).encode('utf-8'))
+        write_compressed_variants(path)
+        self._prune(keep_path=path)
+        self.logger.info(f"Map artifact {filename} built with {len(markers)} countries")
+        return filename
+
+    @classmethod
+    def render(cls, markers: List[dict]) -> str:
+        """Render markers to a standalone folium HTML page"""
+        # folium is only needed here, so keep it out of worker boot and requests
+        import folium
+        from branca.element import Template
+
+        m = folium.Map(location=[20, 0], zoom_start=2, tiles='OpenStreetMap')
+
+        for marker in markers:
+            country = html.escape(marker['country'])
+            popup_html = f"""
+            <div style="width: 150px;">
+                <b>{country}</b><br>
+                {marker['count']} teams<br>
+                <a href="/?country={quote(marker['country'])}" target="_top">View</a>
+            </div>
+            """
+
+            folium.Marker(
+                location=marker['location'],
+                popup=folium.Popup(popup_html, max_width=200),
+                tooltip=f"{country}: {marker['count']} teams",
+                icon=folium.Icon(color='orange', icon='info-sign')
+            ).add_to(m)
+
+        cluster_layer = folium.MacroElement()
+        cluster_layer._template = Template(cls.CLUSTER_LAYER_TEMPLATE)
+        cluster_layer.min_zoom = cls.CLUSTER_MIN_ZOOM
+        m.add_child(cluster_layer)
+
+        return m.get_root().render()
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _prune(self, keep_path: str) -> None:
+        """Remove all but the newest map artifacts"""
+        files = sorted(
+            glob.glob(os.path.join(self.directory, 'map-*.html')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in files[self.keep:]:
+            if path != keep_path:
+                for variant in [path] + [path + suffix for suffix in ENCODING_SUFFIXES.values()]:
+                    try:
+                        os.remove(variant)
+                    except FileNotFoundError:
+                        # Another worker pruned it first
+                        pass
@@ -0,0 +1,191 @@
+"""
+Map Clusters for Basketball Dashboard
+Precomputed per-zoom grid aggregation of team positions for viewport queries
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Web Mercator stops at this latitude
+MAX_LATITUDE = 85.05112878
+
+
+@dataclass(frozen=True)
+class ZoomLevel:
+    """Grid cells of one zoom level, sorted by (column, row)"""
+    cells: int
+    columns: np.ndarray
+    rows: np.ndarray
+    counts: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+    first_row: np.ndarray
+
+
+class ClusterIndex:
+    """
+    Team positions aggregated into a screen-aligned grid for every zoom level
+
+    Teams are placed at their country's centroid plus a deterministic jitter
+    derived from the team name, so positions are stable across loads and
+    workers. At zoom z the world is split into 2**z * CELLS_PER_TILE
+    Web Mercator cells per axis (about 64 px on 256 px tiles); each
+    non-empty cell becomes one cluster at the mean position of its teams.
+    A viewport query binary-searches the column range and filters rows, so
+    its cost depends on the clusters in view rather than on the team count.
+    """
+
+    CELLS_PER_TILE = 4
+    MAX_ZOOM = 10
+
+    # Teams are spread over a disc of this radius (degrees) around the centroid
+    JITTER_DEGREES = 1.5
+
+    def __init__(self, teams: pd.DataFrame, coordinates: Dict[str, list]):
+        self.team_names: List[str] = []
+        self.levels: List[ZoomLevel] = []
+
+        if 'Country' not in teams.columns or not coordinates:
+            self.positions = np.zeros(0, dtype=np.int32)
+            return
+
+        countries = teams['Country'].astype(str)
+        known = countries.isin(list(coordinates)).to_numpy()
+        self.positions = np.flatnonzero(known).astype(np.int32)
+
+        centroids = np.array([coordinates[c] for c in countries[known]], dtype=np.float64).reshape(-1, 2)
+        names = teams['Team'].astype(str).to_numpy()[known] if 'Team' in teams.columns \
+            else np.array([str(i) for i in self.positions], dtype=object)
+        self.team_names = names.tolist()
+
+        lat, lon = self._jitter(names, centroids)
+        x, y = self._project(lat, lon)
+        for zoom in range(self.MAX_ZOOM + 1):
+            self.levels.append(self._aggregate(zoom, x, y, lat, lon))
+
+    @classmethod
+    def _jitter(cls, names: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Offset each centroid by a name-seeded point in a disc"""
+        hashes = pd.util.hash_array(names.astype(object))
+        angle = (hashes & 0xFFFFFFFF).astype(np.float64) / 2 ** 32 * 2 * np.pi
+        radius = np.sqrt((hashes >> np.uint64(32)).astype(np.float64) / 2 ** 32) * cls.JITTER_DEGREES
+        lat = np.clip(centroids[:, 0] + radius * np.sin(angle), -MAX_LATITUDE, MAX_LATITUDE)
+        lon = (centroids[:, 1] + radius * np.cos(angle) + 180) % 360 - 180
+        return lat, lon
+
+    @staticmethod
+    def _project(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Web Mercator, normalized to [0, 1) on both axes"""
+        x = (lon + 180) / 360
+        sin_lat = np.sin(np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE)))
+        y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+        return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+    @classmethod
+    def _cells(cls, zoom: int) -> int:
+        return 2 ** zoom * cls.CELLS_PER_TILE
+
+    def _aggregate(self, zoom: int, x: np.ndarray, y: np.ndarray,
+                   lat: np.ndarray, lon: np.ndarray) -> ZoomLevel:
+        """Group positions by grid cell and summarize each cell"""
+        cells = self._cells(zoom)
+        column = (x * cells).astype(np.int64)
+        row = (y * cells).astype(np.int64)
+
+        keys, inverse, counts = np.unique(column * cells + row, return_inverse=True, return_counts=True)
+        first = np.full(len(keys), len(x), dtype=np.int64)
+        np.minimum.at(first, inverse, np.arange(len(x)))
+
+        return ZoomLevel(
+            cells=cells,
+            columns=(keys // cells).astype(np.int32),
+            rows=(keys % cells).astype(np.int32),
+            counts=counts.astype(np.int32),
+            lat=(np.bincount(inverse, weights=lat) / counts).astype(np.float32),
+            lon=(np.bincount(inverse, weights=lon) / counts).astype(np.float32),
+            first_row=first.astype(np.int32)
+        )
+
+    @staticmethod
+    def normalize_bbox(west: float, south: float, east: float, north: float
+                       ) -> Tuple[float, float, float, float]:
+        """
+        Bring a viewport from a panned map back into the world's bounds
+
+        Longitudes outside [-180, 180] are wrapped back into it (a span of 360 degrees or
+        more covers the whole world) and latitudes are clamped.
+
+        Raises:
+            ValueError: If south is greater than north
+        """
+        if south > north:
+            raise ValueError("bbox south must not exceed north")
+        if east - west >= 360:
+            west, east = -180.0, 180.0
+        else:
+            west = west if -180 <= west <= 180 else (west + 180) % 360 - 180
+            east = east if -180 <= east <= 180 else (east + 180) % 360 - 180
+        south = min(max(south, -MAX_LATITUDE), MAX_LATITUDE)
+        north = min(max(north, -MAX_LATITUDE), MAX_LATITUDE)
+        return west, south, east, north
+
+    def query(self, bbox: Tuple[float, float, float, float], zoom: int,
+              limit: Optional[int] = None) -> Dict[str, object]:
+        """
+        Clusters whose grid cell intersects a viewport
+
+        Args:
+            bbox: (west, south, east, north) in degrees; west > east crosses the antimeridian
+            zoom: Map zoom level, clamped to [0, MAX_ZOOM]
+            limit: Keep only the largest clusters beyond this many
+
+        Returns:
+            dict: zoom, clusters (lat, lon, count, and team for single-team
+                  clusters), total teams in view and whether it was truncated
+        """
+        zoom = min(max(int(zoom), 0), self.MAX_ZOOM)
+        if not self.levels:
+            return {'zoom': zoom, 'clusters': [], 'total': 0, 'truncated': False}
+
+        level = self.levels[zoom]
+        west, south, east, north = bbox
+        (left, right), (top, bottom) = self._project(
+            np.array([north, south]), np.array([west, east])
+        )
+        left, right = int(left * level.cells), int(right * level.cells)
+        top, bottom = int(top * level.cells), int(bottom * level.cells)
+
+        if west <= east:
+            spans = [(left, right)]
+        else:
+            spans = [(left, level.cells - 1), (0, right)]
+
+        selected = []
+        for first_column, last_column in spans:
+            start = np.searchsorted(level.columns, first_column, side='left')
+            stop = np.searchsorted(level.columns, last_column, side='right')
+            rows = level.rows[start:stop]
+            selected.append(start + np.flatnonzero((rows >= top) & (rows <= bottom)))
+        selected = np.concatenate(selected)
+
+        total = int(level.counts[selected].sum())
+        truncated = limit is not None and len(selected) > limit
+        if truncated:
+            largest = np.argpartition(level.counts[selected], -limit)[-limit:]
+            selected = np.sort(selected[largest])
+
+        clusters = []
+        for i in selected.tolist():
+            cluster = {
+                'lat': round(float(level.lat[i]), 4),
+                'lon': round(float(level.lon[i]), 4),
+                'count': int(level.counts[i])
+            }
+            if cluster['count'] == 1:
+                cluster['team'] = self.team_names[level.first_row[i]]
+            clusters.append(cluster)
+
+        return {'zoom': zoom, 'clusters': clusters, 'total': total, 'truncated': bool(truncated)}
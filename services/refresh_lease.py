@@ -0,0 +1,78 @@
+"""
+Refresh Lease for Basketball Dashboard
+File lock that elects one worker process per instance for a refresh or scheduled job
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; every worker then loads on its own
+    fcntl = None
+
+
+class RefreshLease:
+    """
+    Exclusive flock() on a file shared by the workers of one instance
+
+    The worker holding the lease fetches the workbook, builds the map and
+    publishes a new generation; the others wait for it and attach that
+    generation instead of fetching again. The kernel drops the lock when
+    its holder exits, so a crashed leader cannot block the others. The
+    lock file is opened on every acquisition: a descriptor inherited across
+    fork() would share the parent's lock.
+    """
+
+    POLL_SECONDS = 0.1
+
+    def __init__(self, path: str, timeout: float = 600):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.timeout = timeout
+
+    @contextmanager
+    def hold(self) -> Iterator[bool]:
+        """
+        Wait for the lease and hold it for the duration of the block
+
+        Yields:
+            bool: False if another process kept the lease for the whole
+                  timeout (0 tries once); True otherwise, including when
+                  file locks are unavailable and every process acts alone
+        """
+        if fcntl is None:
+            yield True
+            return
+
+        fd = self._acquire()
+        try:
+            yield fd is not None
+        finally:
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _acquire(self) -> Optional[int]:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                if waited:
+                    self.logger.info(f"Acquired lease {self.path} after another process released it")
+                return fd
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    if self.timeout:
+                        self.logger.warning(f"Lease {self.path} still held after {self.timeout:.0f}s")
+                    return None
+                waited = True
+                time.sleep(self.POLL_SECONDS)
@@ -0,0 +1,100 @@
+"""
+Response Cache for Basketball Dashboard
+In-process LRU cache of serialized API responses, keyed by dataset content
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterable, Tuple
+from urllib.parse import urlencode
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of response bodies
+
+    Keys embed the dataset's content id, so entries from other data are
+    never served; they simply age out of the LRU order. Since the id is
+    derived from the data, not from a per-process counter, the ETags made
+    from the keys mean the same on every instance and across restarts.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content_id: str, path: str, args: Iterable[Tuple[str, str]]) -> str:
+        """
+        Build a cache key from the dataset content and normalized query
+
+        Args:
+            content_id: Content id of the data the response is computed from
+            path: Request path
+            args: Query parameters as (name, value) pairs
+
+        Returns:
+            str: Cache key; empty parameters are dropped and the rest sorted
+        """
+        params = sorted((name, value) for name, value in args if value != '')
+        return f"{content_id}:{path}?{urlencode(params)}"
+
+    @staticmethod
+    def etag(key: str) -> str:
+        """Entity tag for the response stored under key"""
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached body for key, or None, updating hit/miss counters"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: str, body: bytes) -> None:
+        """Store a body, evicting least recently used entries beyond the bounds"""
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = body
+            self._size += len(body)
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
@@ -0,0 +1,286 @@
+"""
+Row Versions for Basketball Dashboard
+Per-row content hashes keyed by team, and the differences between dataset generations
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+# Columns that identify a team across generations
+KEY_COLUMNS = ['Team', 'Country', 'League']
+
+# Multipliers for combining 64-bit hashes (wrap around on overflow)
+_COLUMN_MIX = np.uint64(0x100000001B3)
+_OCCURRENCE_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _column_hashes(values: pd.Series) -> np.ndarray:
+    """
+    64-bit hash of every value of a column
+
+    Equal values hash equally whatever the storage (plain, categorical or
+    sparse), so a frame and its compact copy have the same row hashes.
+    Categorical and sparse columns only hash their distinct or non-blank
+    values; plain columns are hashed without factorizing them first, since
+    in a compact frame they are the mostly unique ones (names and links).
+    """
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = hash_array(np.asarray(dtype.categories, dtype=object))
+        return categories[values.cat.codes.to_numpy()]
+    if isinstance(dtype, pd.SparseDtype):
+        array = values.array
+        hashes = np.full(len(values), hash_array(np.array([array.fill_value], dtype=object))[0])
+        hashes[array.sp_index.indices] = hash_array(np.asarray(array.sp_values, dtype=object))
+        return hashes
+    return hash_array(values.to_numpy(dtype=object), categorize=False)
+
+
+@dataclass(frozen=True)
+class RowDiff:
+    """
+    Rows that differ between two generations
+
+    added and updated are row positions in the newer frame, removed are
+    positions in the older one; matched maps every newer row to its row in
+    the older frame (-1 for added rows).
+    """
+    added: np.ndarray
+    updated: np.ndarray
+    removed: np.ndarray
+    removed_keys: List[str]
+    matched: np.ndarray
+    removed_key_hashes: Optional[np.ndarray] = None
+
+    @property
+    def changed(self) -> int:
+        return len(self.added) + len(self.updated) + len(self.removed)
+
+    def unchanged(self) -> np.ndarray:
+        """Newer row positions whose content equals their older row"""
+        unchanged = self.matched >= 0
+        unchanged[self.updated] = False
+        return np.flatnonzero(unchanged)
+
+
+@dataclass(frozen=True)
+class RowVersions:
+    """
+    Team key and content hash of every row of one generation
+
+    A row's key is its team, country and league ("Aguada (Uruguay, FIBA
+    Women)"): team names alone are not unique, a club or school fields
+    men's and women's teams. Rows that repeat all three are numbered from
+    the second one on ("... #2"), matching the n-th such row with the n-th
+    one in another generation.
+    """
+    key_values: List[np.ndarray]
+    occurrence: np.ndarray
+    key_hashes: np.ndarray
+    hashes: np.ndarray
+
+    @classmethod
+    def of(cls, df: pd.DataFrame) -> "RowVersions":
+        """
+        Hash every row of a cleaned teams frame
+
+        Args:
+            df: Teams data (plain or compact storage)
+
+        Returns:
+            RowVersions: Keys and hashes aligned with row positions
+        """
+        column_hashes = {column: _column_hashes(df[column]) for column in df.columns}
+        hashes = np.zeros(len(df), dtype=np.uint64)
+        for column in df.columns:
+            hashes = hashes * _COLUMN_MIX ^ column_hashes[column]
+        key_hashes = np.zeros(len(df), dtype=np.uint64)
+        for column in KEY_COLUMNS:
+            if column in column_hashes:
+                key_hashes = key_hashes * _COLUMN_MIX ^ column_hashes[column]
+
+        # n-th row of each team, country and league
+        codes = pd.factorize(key_hashes)[0]
+        occurrence = pd.Series(codes).groupby(codes).cumcount().to_numpy(dtype=np.int32)
+        key_hashes = key_hashes ^ (occurrence.astype(np.uint64) * _OCCURRENCE_MIX)
+
+        key_values = [df[column].to_numpy(dtype=object) for column in KEY_COLUMNS if column in df.columns]
+        return cls(key_values=key_values, occurrence=occurrence, key_hashes=key_hashes, hashes=hashes)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def content_id(self, columns: List[str]) -> str:
+        """
+        Digest of the whole generation's content
+
+        Equal data gives an equal id in any process, after restarts and on
+        every instance, unlike the generation number, which each process
+        counts on its own.
+
+        Args:
+            columns: Column names of the frame, which the row hashes omit
+
+        Returns:
+            str: Hex digest
+        """
+        digest = hashlib.sha1('\x1f'.join(map(str, columns)).encode('utf-8'))
+        digest.update(self.hashes.tobytes())
+        return digest.hexdigest()[:24]
+
+    def keys(self, rows: np.ndarray) -> List[str]:
+        """Team keys of the given row positions"""
+        if not self.key_values:
+            return [f"#{row + 1}" for row in np.asarray(rows).tolist()]
+        team, *scope = [values[rows].tolist() for values in self.key_values]
+        keys = []
+        for i, n in enumerate(self.occurrence[rows].tolist()):
+            key = str(team[i])
+            if scope:
+                key += f" ({', '.join(str(values[i]) for values in scope)})"
+            keys.append(key if n == 0 else f"{key} #{n + 1}")
+        return keys
+
+    def diff(self, newer: "RowVersions") -> RowDiff:
+        """
+        Rows added, updated and removed from this generation to a newer one
+
+        Rows are matched by team key through a hash table on the 64-bit key
+        hashes, then compared by content hash; no row is compared field by
+        field.
+
+        Args:
+            newer: Versions of the newer generation
+
+        Returns:
+            RowDiff: Changed row positions on each side
+        """
+        added, updated, removed, matched = _match(self.key_hashes, self.hashes, newer)
+        return RowDiff(added=added, updated=updated, removed=removed,
+                       removed_keys=self.keys(removed), matched=matched,
+                       removed_key_hashes=self.key_hashes[removed])
+
+
+def _match(key_hashes: np.ndarray, hashes: np.ndarray,
+           newer: RowVersions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Added, updated and removed row positions, and the older row of each newer one"""
+    # Position of each newer row in the older generation, -1 if its key is new
+    previous = pd.Index(key_hashes).get_indexer(newer.key_hashes)
+    matched = previous >= 0
+
+    added = np.flatnonzero(~matched).astype(np.int32)
+    kept = np.flatnonzero(matched).astype(np.int32)
+    updated = kept[hashes[previous[kept]] != newer.hashes[kept]]
+
+    still_present = np.zeros(len(hashes), dtype=bool)
+    still_present[previous[kept]] = True
+    removed = np.flatnonzero(~still_present).astype(np.int32)
+
+    return added, updated, removed, previous.astype(np.int32)
+
+
+@dataclass(frozen=True)
+class _Recorded:
+    """What the change log keeps of a generation: hashes only, no key values"""
+    key_hashes: np.ndarray
+    hashes: np.ndarray
+    # Keys of the rows this generation removed, by key hash
+    removed: Dict[int, str]
+
+    @property
+    def nbytes(self) -> int:
+        return self.key_hashes.nbytes + self.hashes.nbytes + \
+            sum(64 + len(key) for key in self.removed.values())
+
+
+class ChangeLog:
+    """
+    Row hashes of the last few generations, for /api/changes
+
+    A client that last synced at one of them gets the net difference to
+    the current generation (one diff, however many generations passed);
+    older or unknown ones need a full download. Generations are identified
+    by content id, not by generation number: the number restarts in every
+    process, so it could name different data after a restart or on another
+    instance, while equal content ids mean equal data everywhere.
+
+    Only the 64-bit key and content hashes are kept (16 bytes a row), plus
+    the keys of rows each generation removed, which a diff reports but
+    cannot recover from hashes. The history is bounded by depth and by
+    max_bytes; the newest generation is always kept.
+    """
+
+    def __init__(self, depth: int = 5, max_bytes: int = 64 * 1024 * 1024):
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self._recorded: "OrderedDict[str, _Recorded]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, content_id: str, versions: RowVersions, changes: Optional[RowDiff] = None) -> None:
+        """
+        Keep a generation's hashes
+
+        Args:
+            content_id: Content id of the generation
+            versions: Its row versions
+            changes: Its diff from the generation served before it, if any
+        """
+        removed = {}
+        if changes is not None and changes.removed_key_hashes is not None:
+            removed = dict(zip(changes.removed_key_hashes.tolist(), changes.removed_keys))
+        recorded = _Recorded(key_hashes=versions.key_hashes, hashes=versions.hashes, removed=removed)
+
+        with self._lock:
+            self._recorded[content_id] = recorded
+            self._recorded.move_to_end(content_id)
+            while len(self._recorded) > 1 and (
+                    len(self._recorded) > self.depth or
+                    sum(entry.nbytes for entry in self._recorded.values()) > self.max_bytes):
+                self._recorded.popitem(last=False)
+
+    def diff(self, content_id: str, newer: RowVersions) -> Optional[RowDiff]:
+        """
+        Rows added, updated and removed from a recorded generation to newer
+
+        Args:
+            content_id: Content id the client last synced at
+            newer: Row versions of the current generation
+
+        Returns:
+            RowDiff, or None if the generation is not (or no longer) recorded
+        """
+        with self._lock:
+            older = self._recorded.get(content_id)
+            removed_keys = {}
+            for entry in self._recorded.values():
+                removed_keys.update(entry.removed)
+        if older is None:
+            return None
+
+        added, updated, removed, matched = _match(older.key_hashes, older.hashes, newer)
+        removed_key_hashes = older.key_hashes[removed]
+        # A row missing now was removed by one of the later generations, which noted its key
+        keys = [removed_keys.get(key_hash, f"#{row + 1}")
+                for key_hash, row in zip(removed_key_hashes.tolist(), removed.tolist())]
+        return RowDiff(added=added, updated=updated, removed=removed, removed_keys=keys,
+                       matched=matched, removed_key_hashes=removed_key_hashes)
+
+    def versions(self) -> List[str]:
+        """Recorded content ids, oldest first"""
+        with self._lock:
+            return list(self._recorded)
+
+    def stats(self) -> Dict[str, object]:
+        """Recorded generations and their size, for the health endpoint"""
+        with self._lock:
+            return {
+                'versions': list(self._recorded),
+                'bytes': sum(entry.nbytes for entry in self._recorded.values())
+            }
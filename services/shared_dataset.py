@@ -0,0 +1,286 @@
+"""
+Shared Dataset for Basketball Dashboard
+Publishes cleaned teams data as column files that the other worker processes attach to
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.compact_frame import frame_bytes
+from services.data_integration import SourceVersion
+
+
+@dataclass
+class AttachedDataset:
+    """A published generation, loaded into this process"""
+    teams: pd.DataFrame
+    generation: int
+    source: str
+    version: Optional[SourceVersion]
+    loaded_at: datetime
+    plain_bytes: int
+    path: str
+    fallback: bool = False
+
+
+def _code_dtype(categories: int) -> np.dtype:
+    """The code width pandas uses for this many categories (so from_codes keeps them as they are)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _version_to_json(version: Optional[SourceVersion]) -> Optional[Dict[str, Any]]:
+    if version is None:
+        return None
+    return {
+        'etag': version.etag,
+        'checksum': version.checksum,
+        'last_modified': version.last_modified.isoformat() if version.last_modified else None
+    }
+
+
+def _version_from_json(data: Optional[Dict[str, Any]]) -> Optional[SourceVersion]:
+    if data is None:
+        return None
+    last_modified = data.get('last_modified')
+    return SourceVersion(
+        etag=data.get('etag'),
+        checksum=data.get('checksum'),
+        last_modified=datetime.fromisoformat(last_modified) if last_modified else None
+    )
+
+
+class SharedDataset:
+    """
+    Dictionary-encoded teams data on local disk, one directory per generation
+
+    Every column is stored as an .npy file of per-row integer codes and a
+    JSON list of its distinct values. This is how the worker that refreshed
+    hands a generation to the others: attaching never fetches or parses the
+    workbook again. Generations are written to a temporary directory and
+    renamed into place, then a pointer file is replaced atomically;
+    checking it for a new generation costs one stat() call.
+
+    It does not share memory: every worker reads the generation into its
+    own frame, so memory still grows with the number of workers. Only
+    workers forked after the data is loaded (gunicorn --preload) share it,
+    and only until their first refresh.
+    """
+
+    FORMAT_VERSION = 1
+    POINTER_FILE = 'current.json'
+
+    # Columns with more distinct values than this share of rows (names, URLs)
+    # are decoded into plain object columns: their distinct values cost as
+    # much as the column itself, and a categorical would add a hash table
+    CATEGORICAL_MAX_RATIO = 0.5
+
+    def __init__(self, directory: str, keep: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.keep = keep
+        self._seen: Optional[Tuple[int, int]] = None
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.directory, self.POINTER_FILE)
+
+    def publish(self, df: pd.DataFrame, generation: int, source: str,
+                version: Optional[SourceVersion], loaded_at: datetime,
+                fallback: bool = False) -> Dict[str, Any]:
+        """
+        Write a cleaned frame as a new generation and point workers at it
+
+        Args:
+            df: Cleaned teams data
+            generation: Dataset generation number
+            source: Provider the data came from
+            version: Validators of the source revision, if known
+            loaded_at: When the data was loaded from the source
+            fallback: The configured source failed and df is fallback data
+                      (snapshot cache or bundled workbook)
+
+        Returns:
+            dict: Pointer to the published generation, for attach()
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            columns = []
+            for position, column in enumerate(df.columns):
+                values = df[column]
+                if isinstance(values.dtype, pd.SparseDtype):
+                    values = values.sparse.to_dense()
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+                else:
+                    codes, categories = pd.factorize(values, sort=False)
+
+                np.save(os.path.join(tmp_dir, f"{position}.codes.npy"),
+                        codes.astype(_code_dtype(len(categories))))
+                with open(os.path.join(tmp_dir, f"{position}.values.json"), 'w') as f:
+                    json.dump(categories.tolist(), f)
+                columns.append(str(column))
+
+            meta = {
+                'format_version': self.FORMAT_VERSION,
+                'columns': columns,
+                'rows': len(df),
+                'generation': generation,
+                'source': source,
+                'version': _version_to_json(version),
+                'loaded_at': loaded_at.isoformat(),
+                'plain_bytes': frame_bytes(df),
+                'fallback': fallback
+            }
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+
+            path = os.path.join(self.directory, f"gen-{generation:06d}-{os.getpid()}")
+            os.rename(tmp_dir, path)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        pointer = {
+            'path': os.path.basename(path),
+            'generation': generation,
+            'source': source,
+            'loaded_at': meta['loaded_at'],
+            'fallback': fallback
+        }
+        self._write_pointer(pointer)
+
+        self._prune(keep_path=path)
+        self.logger.info(f"Published shared dataset generation {generation} ({len(df)} rows)")
+        return pointer
+
+    def renew(self, generation: int, loaded_at: datetime) -> bool:
+        """
+        Mark the current generation as freshly checked against an unchanged source
+
+        Other workers see the pointer move and restart their refresh
+        interval without loading anything.
+
+        Args:
+            generation: Generation the caller found unchanged
+            loaded_at: When the source was checked
+
+        Returns:
+            bool: False if the pointer has moved on to another generation
+        """
+        pointer = self.current()
+        if pointer is None or pointer['generation'] != generation:
+            return False
+        self._write_pointer(dict(pointer, loaded_at=loaded_at.isoformat()))
+        return True
+
+    def _write_pointer(self, pointer: Dict[str, Any]) -> None:
+        fd, tmp_pointer = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(pointer, f)
+        os.replace(tmp_pointer, self.pointer_path)
+        self._seen = self._stat_key()
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def changed(self) -> bool:
+        """Whether the pointer moved since this process last read or wrote it (one stat call)"""
+        key = self._stat_key()
+        return key is not None and key != self._seen
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The pointer to the current generation, or None if nothing was published"""
+        self._seen = self._stat_key()
+        try:
+            with open(self.pointer_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable shared dataset pointer: {str(e)}")
+            return None
+
+    def attach(self, pointer: Optional[Dict[str, Any]] = None) -> Optional[AttachedDataset]:
+        """
+        Load a published generation into this process
+
+        Args:
+            pointer: Generation to attach; defaults to the current one
+
+        Returns:
+            AttachedDataset: Frame of categoricals over the codes, or None
+                             if nothing usable is published
+        """
+        pointer = pointer or self.current()
+        if pointer is None:
+            return None
+
+        path = os.path.join(self.directory, pointer['path'])
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r') as f:
+                meta = json.load(f)
+            if meta.get('format_version') != self.FORMAT_VERSION:
+                return None
+
+            columns = {}
+            for position, column in enumerate(meta['columns']):
+                codes = np.load(os.path.join(path, f"{position}.codes.npy"))
+                with open(os.path.join(path, f"{position}.values.json"), 'r') as f:
+                    values = json.load(f)
+
+                if len(values) <= self.CATEGORICAL_MAX_RATIO * max(meta['rows'], 1):
+                    categories = pd.Index(values, dtype=object)
+                    columns[column] = pd.Series(pd.Categorical.from_codes(codes, categories=categories), copy=False)
+                else:
+                    # Each row references one of the decoded strings; no per-row copies
+                    columns[column] = pd.Series(np.array(values + [np.nan], dtype=object)[codes])
+            teams = pd.DataFrame(columns, columns=meta['columns'], copy=False)
+
+        except FileNotFoundError:
+            # Pruned between reading the pointer and opening the files
+            return None
+
+        return AttachedDataset(
+            teams=teams,
+            generation=meta['generation'],
+            source=meta['source'],
+            version=_version_from_json(meta['version']),
+            loaded_at=datetime.fromisoformat(meta['loaded_at']),
+            plain_bytes=meta['plain_bytes'],
+            path=path,
+            fallback=meta.get('fallback', False)
+        )
+
+    def _prune(self, keep_path: str) -> None:
+        """
+        Remove all but the newest generations
+
+        A worker reading a removed generation gets None from attach(), as if
+        nothing were published.
+        """
+        paths = sorted(
+            glob.glob(os.path.join(self.directory, 'gen-*')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in paths[self.keep:]:
+            if path != keep_path:
+                shutil.rmtree(path, ignore_errors=True)
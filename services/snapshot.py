@@ -0,0 +1,177 @@
+"""
+Dataset Snapshots for Basketball Dashboard
+Immutable views of a loaded dataset, refreshed off the request path
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Dict, Any
+
+import pandas as pd
+
+from services.compact_frame import compact_teams, frame_bytes, memory_report
+from services.data_integration import SourceVersion
+from services.map_clusters import ClusterIndex
+from services.row_versions import RowDiff, RowVersions
+from services.suggest_index import SuggestIndex
+from services.team_index import TeamIndex
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    Everything derived from one load of the teams workbook
+
+    A snapshot is built completely before it is published and never mutated
+    afterwards, so request handlers that grab a reference once see a
+    consistent frame, filter lists and index.
+    """
+    teams: pd.DataFrame
+    countries: List[str]
+    leagues: List[str]
+    sports: List[str]
+    index: TeamIndex
+    generation: int
+    loaded_at: datetime
+    source: str
+    source_version: Optional[SourceVersion] = None
+    memory: Optional[Dict[str, Any]] = None
+    map_file: Optional[str] = None
+    clusters: Optional[ClusterIndex] = None
+    suggest: Optional[SuggestIndex] = None
+    rows: Optional[RowVersions] = None
+    changes: Optional[RowDiff] = None
+    content_id: Optional[str] = None
+
+    # Above this share of changed rows the name indexes are rebuilt from scratch
+    INCREMENTAL_MAX_CHANGED = 0.5
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, generation: int, source: str,
+              source_version: Optional[SourceVersion] = None,
+              compact: bool = False,
+              coordinates: Optional[Dict[str, list]] = None,
+              plain_bytes: Optional[int] = None,
+              previous: Optional["DataSnapshot"] = None) -> "DataSnapshot":
+        """
+        Derive filter options and indexes from a cleaned teams frame
+
+        With a previous snapshot, rows are matched by team key and compared
+        by content hash first. Per-row flags are then only derived for the
+        changed rows, and the name indexes (team name trigrams, typeahead
+        entries) only process names the previous generation did not have.
+
+        Args:
+            df: Cleaned teams data
+            generation: Monotonic dataset generation number
+            source: Provider the data came from
+            source_version: Validators of the source revision, if known
+            compact: Hold the frame in compact (categorical/sparse) storage
+            coordinates: Country name -> [lat, lon], for the map cluster grid
+            plain_bytes: Size of the frame as cleaned, when df is already a
+                         re-encoded copy (e.g. attached from the shared dataset)
+            previous: Snapshot currently served, to diff against and update from
+
+        Returns:
+            DataSnapshot: Ready-to-publish snapshot
+        """
+        if plain_bytes is None:
+            plain_bytes = frame_bytes(df)
+        if compact:
+            df = compact_teams(df)
+
+        rows = RowVersions.of(df)
+        changes = previous.rows.diff(rows) if previous is not None and previous.rows is not None else None
+        # Mostly new data (or other columns): build the indexes from scratch
+        if changes is None or changes.changed > cls.INCREMENTAL_MAX_CHANGED * max(len(rows), 1) or \
+                list(previous.teams.columns) != list(df.columns):
+            previous = None
+
+        index = TeamIndex(df, previous=previous.index if previous else None,
+                          changes=changes if previous else None)
+
+        # Filter options come from the values the index already factorized
+        return cls(
+            teams=df,
+            countries=sorted(index.facet_values['country']),
+            leagues=sorted(index.facet_values['league']),
+            sports=sorted(index.facet_values['sport']),
+            index=index,
+            generation=generation,
+            loaded_at=datetime.now(),
+            source=source,
+            source_version=source_version,
+            memory=memory_report(df, plain_bytes, compact),
+            clusters=ClusterIndex(df, coordinates or {}),
+            suggest=SuggestIndex(df, index, previous=previous.suggest if previous else None),
+            rows=rows,
+            changes=changes,
+            content_id=rows.content_id(list(df.columns))
+        )
+
+
+class BackgroundRefresher:
+    """
+    Runs the data refresh on a daemon thread so requests never wait for it
+
+    At most one refresh runs at a time. After a failure, triggers are ignored
+    for retry_seconds so a broken source is not hit on every request.
+    """
+
+    def __init__(self, refresh: Callable[[], Any], retry_seconds: int = 300):
+        self.logger = logging.getLogger(__name__)
+        self.retry_seconds = retry_seconds
+        self._refresh = refresh
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_failure: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def trigger(self) -> bool:
+        """
+        Start a refresh unless one is running or a recent attempt failed
+
+        Returns:
+            bool: True if a refresh was started
+        """
+        with self._lock:
+            if self.is_running():
+                return False
+            if self._last_failure is not None and \
+                    time.monotonic() - self._last_failure < self.retry_seconds:
+                return False
+
+            self._thread = threading.Thread(target=self._run, name='data-refresh', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        try:
+            self._refresh()
+            self.last_error = None
+            self._last_failure = None
+            self.last_success = datetime.now()
+        except Exception as e:
+            self.logger.error(f"Background refresh failed: {str(e)}")
+            self.last_error = str(e)
+            self._last_failure = time.monotonic()
+        finally:
+            self.last_duration = time.monotonic() - started
+
+    def status(self) -> Dict[str, Any]:
+        """Refresh state for the health endpoint"""
+        return {
+            'running': self.is_running(),
+            'last_success': self.last_success.isoformat() if self.last_success else None,
+            'last_error': self.last_error,
+            'last_duration_seconds': round(self.last_duration, 3) if self.last_duration is not None else None
+        }
@@ -0,0 +1,158 @@
+"""
+Snapshot Cache for Basketball Dashboard
+Persists cleaned teams data on local disk so cold starts skip Excel parsing
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from services.data_integration import SourceVersion
+
+
+@dataclass
+class CachedDataset:
+    """A cleaned teams frame as loaded from the snapshot cache"""
+    teams: pd.DataFrame
+    source: str
+    version: Optional[SourceVersion]
+    saved_at: datetime
+
+
+class SnapshotCache:
+    """
+    Pickled copies of cleaned teams frames, keyed by source content hash
+
+    File names embed SCHEMA_VERSION, so changing how data is cleaned (bump
+    the constant) invalidates every cached file at once. A small pointer
+    file names the most recently saved snapshot.
+    """
+
+    # Bump whenever clean_teams_data() or the cached payload changes shape
+    SCHEMA_VERSION = 1
+    POINTER_FILE = 'latest.json'
+
+    def __init__(self, directory: str, keep: int = 3):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.keep = keep
+
+    @staticmethod
+    def content_key(source: str, version: Optional[SourceVersion], df: pd.DataFrame) -> str:
+        """
+        Hash identifying the source content
+
+        Uses the provider's checksum or ETag when available, otherwise a
+        hash of the frame itself.
+        """
+        validator = version and (version.checksum or version.etag)
+        if validator:
+            material = f"{source}|{validator}".encode('utf-8')
+        else:
+            material = pd.util.hash_pandas_object(df, index=False).values.tobytes()
+        return hashlib.sha256(material).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"teams-v{self.SCHEMA_VERSION}-{key}.pkl")
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save(self, df: pd.DataFrame, source: str, version: Optional[SourceVersion]) -> Optional[str]:
+        """
+        Persist a cleaned frame and point the cache at it
+
+        Args:
+            df: Cleaned teams data
+            source: Provider the data came from
+            version: Validators of the source revision, if known
+
+        Returns:
+            str: Path of the snapshot file, or None if it could not be written
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(self.content_key(source, version, df))
+
+            if not os.path.exists(path):
+                payload = {
+                    'schema_version': self.SCHEMA_VERSION,
+                    'source': source,
+                    'version': version,
+                    'saved_at': datetime.now(),
+                    'teams': df
+                }
+                self._write_atomic(path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+            pointer = json.dumps({'file': os.path.basename(path), 'source': source}).encode('utf-8')
+            self._write_atomic(os.path.join(self.directory, self.POINTER_FILE), pointer)
+            self._prune(keep_path=path)
+            return path
+
+        except Exception as e:
+            # The cache only speeds up restarts; never fail a load because of it
+            self.logger.warning(f"Could not write snapshot cache: {str(e)}")
+            return None
+
+    def load_latest(self, source: Optional[str] = None) -> Optional[CachedDataset]:
+        """
+        Load the most recently saved snapshot
+
+        Args:
+            source: Only accept a snapshot from this provider, if given
+
+        Returns:
+            CachedDataset: Cached data, or None if missing, stale-schema or unreadable
+        """
+        try:
+            with open(os.path.join(self.directory, self.POINTER_FILE), 'r') as f:
+                pointer = json.load(f)
+            if source is not None and pointer.get('source') != source:
+                return None
+
+            path = os.path.join(self.directory, pointer['file'])
+            with open(path, 'rb') as f:
+                payload = pickle.load(f)
+            if payload.get('schema_version') != self.SCHEMA_VERSION:
+                return None
+
+            return CachedDataset(
+                teams=payload['teams'],
+                source=payload['source'],
+                version=payload['version'],
+                saved_at=payload['saved_at']
+            )
+
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable snapshot cache: {str(e)}")
+            return None
+
+    def _prune(self, keep_path: str) -> None:
+        """Remove all but the newest snapshot files"""
+        files = sorted(
+            glob.glob(os.path.join(self.directory, 'teams-v*.pkl')),
+            key=os.path.getmtime,
+            reverse=True
+        )
+        for path in files[self.keep:]:
+            if path != keep_path:
+                os.remove(path)
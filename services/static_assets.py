@@ -0,0 +1,168 @@
+"""
+Static Assets for Basketball Dashboard
+Content-hashed, pre-compressed copies of the static files and the manifest that maps them
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+# Pre-compressed variants, in order of preference, with their file suffixes
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Text formats worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.html', '.svg', '.json', '.txt', '.map')
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _compress(encoding: str, data: bytes) -> Optional[bytes]:
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def write_compressed_variants(path: str) -> List[str]:
+    """
+    Write .br and .gz copies next to a file, skipping variants that exist
+
+    A variant that would not be smaller than the file is not written, so
+    clients get the original instead.
+
+    Args:
+        path: File to compress
+
+    Returns:
+        list: Encodings available for the file
+    """
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return []
+
+    data = None
+    available = []
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if not os.path.exists(path + suffix):
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            compressed = _compress(encoding, data)
+            if compressed is None or len(compressed) >= len(data):
+                continue
+            _write_atomic(path + suffix, compressed)
+        available.append(encoding)
+    return available
+
+
+def available_encodings(path: str) -> List[str]:
+    """Encodings with a pre-compressed variant of path, in order of preference"""
+    return [encoding for encoding, suffix in ENCODING_SUFFIXES.items()
+            if os.path.exists(path + suffix)]
+
+
+class AssetManifest:
+    """
+    Fingerprinted copies of the static folder
+
+    build() copies every static file to output_dir under a name carrying
+    a hash of its content (css/style.css -> css/style.3f2a9c1b7e4d.css),
+    writes compressed variants next to it and records the mapping in
+    manifest.json. A changed file gets a new name, so the copies can be
+    cached forever; unchanged files keep theirs across builds and workers.
+    """
+
+    MANIFEST_FILE = 'manifest.json'
+    HASH_LENGTH = 12
+
+    def __init__(self, source_dir: str, output_dir: str):
+        self.logger = logging.getLogger(__name__)
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.entries: Dict[str, str] = {}
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.output_dir, self.MANIFEST_FILE)
+
+    def build(self) -> Dict[str, str]:
+        """
+        Fingerprint and compress every file of the static folder
+
+        Returns:
+            dict: Static file name -> fingerprinted file name (both relative, with '/')
+        """
+        entries = {}
+        for directory, _, filenames in os.walk(self.source_dir):
+            for filename in sorted(filenames):
+                source = os.path.join(directory, filename)
+                name = os.path.relpath(source, self.source_dir).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+
+                stem, extension = os.path.splitext(name)
+                digest = hashlib.sha256(data).hexdigest()[:self.HASH_LENGTH]
+                hashed = f"{stem}.{digest}{extension}"
+                target = os.path.join(self.output_dir, hashed)
+                if not os.path.exists(target):
+                    _write_atomic(target, data)
+                write_compressed_variants(target)
+                entries[name] = hashed
+
+        _write_atomic(self.manifest_path, json.dumps(entries, indent=2, sort_keys=True).encode('utf-8'))
+        self.entries = entries
+        self.logger.info(f"Built {len(entries)} static assets in {self.output_dir}")
+        return entries
+
+    def load(self) -> bool:
+        """Read the manifest of an earlier build; False if there is none"""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.entries = json.load(f)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def is_stale(self) -> bool:
+        """Whether a static file was added or edited since the manifest was written"""
+        try:
+            built = os.path.getmtime(self.manifest_path)
+        except FileNotFoundError:
+            return True
+        for directory, _, filenames in os.walk(self.source_dir):
+            for filename in filenames:
+                source = os.path.join(directory, filename)
+                name = os.path.relpath(source, self.source_dir).replace(os.sep, '/')
+                if name not in self.entries or os.path.getmtime(source) > built:
+                    return True
+        return False
+
+    def ensure(self) -> Dict[str, str]:
+        """Load the manifest, rebuilding it when it is missing or older than the static files"""
+        if not self.load() or self.is_stale():
+            return self.build()
+        return self.entries
+
+    def get(self, filename: str) -> Optional[str]:
+        """Fingerprinted name of a static file, or None if it is not in the manifest"""
+        return self.entries.get(filename)
@@ -0,0 +1,191 @@
+"""
+Suggest Index for Basketball Dashboard
+Sorted-array prefix index over team, league and country names for typeahead
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.team_index import TeamIndex
+
+# Start of every word: "university of kentucky" is found by "uni", "of k" and "kent"
+WORD_START = re.compile(r'\b\w')
+
+
+class SuggestIndex:
+    """
+    Prefix index over every distinct name, with one entry per word start
+
+    Entries are (name id, offset) pairs sorted by the normalized name text
+    from that offset on, stored as two int arrays; the suffix strings are
+    never kept, so memory stays at a few bytes per entry. A prefix query
+    is two binary searches for the block of entries starting with it.
+    Each entry carries a static score (how many teams the name covers,
+    a bonus for matching at the start of the name, shorter names first).
+    A partial sort narrows the block (millions of entries for a one-letter
+    prefix) to a few candidates in numpy, and a bounded heap picks the
+    best k names among them.
+    """
+
+    # Candidates per requested suggestion (a name can match at several word starts)
+    CANDIDATES_PER_RESULT = 4
+
+    # Score bonus when the prefix matches the start of the whole name
+    START_BONUS = 2.0
+
+    def __init__(self, df: pd.DataFrame, index: TeamIndex, previous: Optional["SuggestIndex"] = None):
+        """
+        Args:
+            df: Teams data of the snapshot
+            index: The snapshot's TeamIndex (its normalized names and counts are reused)
+            previous: Index of the previous generation; its sorted entries are
+                      kept for the names that are still there, and only new
+                      names are sorted and merged in
+        """
+        self.texts: List[str] = []
+        self.kinds: List[str] = []
+        self.counts: List[int] = []
+        self.normalized: List[str] = []
+
+        if index.team_names is not None:
+            # The trigram index already holds each distinct lowercased team name
+            codes = index.team_names.codes
+            first_rows = np.unique(codes, return_index=True)[1]
+            self._add('team', df['Team'].iloc[first_rows].astype(str).tolist(),
+                      index.team_names.names, np.bincount(codes, minlength=len(first_rows)).tolist())
+
+        for param, kind in (('league', 'league'), ('country', 'country')):
+            values = [str(value) for value in index.facet_values[param]]
+            self._add(kind, values, [value.lower() for value in values], index.facet_totals[param].tolist())
+
+        kept_ids = np.zeros(0, dtype=np.int32)
+        kept_offsets = np.zeros(0, dtype=np.int32)
+        new_names = range(len(self.normalized))
+        if previous is not None:
+            kept_ids, kept_offsets, new_names = self._carry_over(previous)
+
+        name_ids, offsets = [], []
+        for name_id in new_names:
+            for match in WORD_START.finditer(self.normalized[name_id]):
+                name_ids.append(name_id)
+                offsets.append(match.start())
+
+        normalized = self.normalized
+        order = sorted(range(len(name_ids)), key=lambda i: normalized[name_ids[i]][offsets[i]:])
+        name_ids = np.array(name_ids, dtype=np.int32)[order]
+        offsets = np.array(offsets, dtype=np.int32)[order]
+
+        if len(kept_ids):
+            # Both sides are sorted by suffix: insert the new entries in place
+            def kept_suffix(position: int) -> str:
+                return normalized[kept_ids[position]][kept_offsets[position]:]
+
+            kept = range(len(kept_ids))
+            positions = [bisect_left(kept, self._entry_text(name_id, offset), key=kept_suffix)
+                         for name_id, offset in zip(name_ids.tolist(), offsets.tolist())]
+            name_ids = np.insert(kept_ids, positions, name_ids)
+            offsets = np.insert(kept_offsets, positions, offsets)
+
+        self.name_ids = name_ids
+        self.offsets = offsets.astype(np.int16 if offsets.max(initial=0) < 2 ** 15 else np.int32)
+
+        counts = np.array(self.counts, dtype=np.float64)
+        lengths = np.array([len(name) for name in normalized], dtype=np.float64)
+        self.scores = (np.log1p(counts[self.name_ids]) - lengths[self.name_ids] / 1000
+                       + self.START_BONUS * (self.offsets == 0)).astype(np.float32)
+
+    def _add(self, kind: str, texts: List[str], normalized: List[str], counts: List[int]) -> None:
+        for text, name, count in zip(texts, normalized, counts):
+            if name.strip():
+                self.texts.append(text)
+                self.kinds.append(kind)
+                self.counts.append(int(count))
+                self.normalized.append(name)
+
+    def _entry_text(self, name_id: int, offset: int) -> str:
+        return self.normalized[name_id][offset:]
+
+    def _keys(self) -> pd.Index:
+        return pd.Index([f"{kind}:{name}" for kind, name in zip(self.kinds, self.normalized)])
+
+    def _carry_over(self, previous: "SuggestIndex"):
+        """
+        The previous generation's entries renumbered to this one's names
+
+        Returns:
+            tuple: Kept name ids and offsets (still sorted by suffix, since
+                   a name's text is its key) and the ids of the new names
+        """
+        keys, previous_keys = self._keys(), previous._keys()
+        if not keys.is_unique or not previous_keys.is_unique:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), range(len(keys))
+
+        # Previous name id -> this generation's id, -1 for names that are gone
+        found = previous_keys.get_indexer(keys)
+        mapping = np.full(len(previous_keys), -1, dtype=np.int32)
+        known = np.flatnonzero(found >= 0)
+        mapping[found[known]] = known
+
+        renumbered = mapping[previous.name_ids]
+        kept = renumbered >= 0
+        return (renumbered[kept], previous.offsets[kept].astype(np.int32),
+                np.flatnonzero(found < 0).tolist())
+
+    def __len__(self) -> int:
+        return len(self.name_ids)
+
+    def _suffix(self, position: int) -> str:
+        return self.normalized[self.name_ids[position]][self.offsets[position]:]
+
+    def _block(self, prefix: str):
+        """Positions [start, stop) of the entries whose text starts with prefix"""
+        positions = range(len(self.name_ids))
+        start = bisect_left(positions, prefix, key=self._suffix)
+        successor = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        stop = bisect_left(positions, successor, lo=start, key=self._suffix)
+        return start, stop
+
+    def suggest(self, query: str, k: int = 10) -> List[Dict[str, object]]:
+        """
+        Best k names with a word starting with the query
+
+        Args:
+            query: Text typed so far (case-insensitive)
+            k: Maximum number of suggestions
+
+        Returns:
+            list: {'text', 'type', 'teams'} dictionaries, best first
+        """
+        prefix = ' '.join(query.lower().split())
+        if not prefix or not len(self.name_ids):
+            return []
+
+        start, stop = self._block(prefix)
+        keep = self.CANDIDATES_PER_RESULT * k
+        while True:
+            if stop - start > keep:
+                candidates = start + np.argpartition(self.scores[start:stop], -keep)[-keep:]
+            else:
+                candidates = np.arange(start, stop)
+
+            # Best entry per name
+            best: Dict[int, float] = {}
+            for name_id, score in zip(self.name_ids[candidates].tolist(), self.scores[candidates].tolist()):
+                if score > best.get(name_id, -np.inf):
+                    best[name_id] = score
+            if len(best) >= k or stop - start <= keep:
+                break
+            # Too many candidates were the same names matching at several words
+            keep *= 4
+
+        top = heapq.nlargest(k, best.items(), key=lambda item: item[1])
+
+        return [
+            {'text': self.texts[name_id], 'type': self.kinds[name_id], 'teams': self.counts[name_id]}
+            for name_id, _ in top
+        ]
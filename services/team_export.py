@@ -0,0 +1,101 @@
+"""
+Team Export for Basketball Dashboard
+Streams filtered teams as CSV, NDJSON or XLSX, a fixed number of rows at a time
+"""
+
+import csv
+import io
+import json
+import tempfile
+from typing import Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+
+class TeamExporter:
+    """
+    Serializes selected rows of a teams frame chunk by chunk
+
+    Only CHUNK_ROWS rows are materialized at once, so memory stays flat no
+    matter how many teams match. CSV and NDJSON bytes are yielded as soon as
+    a chunk is written. XLSX is a zip archive that can only be finished at
+    the end, so openpyxl's write-only mode spools the sheet to a temporary
+    file that is then streamed out: memory stays flat, but nothing is sent
+    until every row is written, and callers should bound the row count.
+    """
+
+    # format -> (mimetype, file extension)
+    FORMATS = {
+        'csv': ('text/csv', 'csv'),
+        'ndjson': ('application/x-ndjson', 'ndjson'),
+        'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+    }
+
+    CHUNK_ROWS = 1000
+    FILE_CHUNK_BYTES = 64 * 1024
+
+    def __init__(self, teams: pd.DataFrame, rows: np.ndarray, columns: Union[List[int], slice] = slice(None)):
+        """
+        Args:
+            teams: Teams data of a snapshot
+            rows: Row positions to export, in output order
+            columns: Column positions (or a slice) to export
+        """
+        self.teams = teams
+        self.rows = rows
+        self.columns = columns
+        self.names = [str(name) for name in teams.columns[columns]]
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self.rows), self.CHUNK_ROWS):
+            yield self.teams.iloc[self.rows[start:start + self.CHUNK_ROWS], self.columns]
+
+    def stream(self, export_format: str) -> Iterator[bytes]:
+        """
+        Encoded output in the requested format
+
+        Args:
+            export_format: One of FORMATS
+
+        Returns:
+            Iterator of byte chunks
+        """
+        return getattr(self, f"_{export_format}")()
+
+    def _csv(self) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.names)
+        for chunk in self.chunks():
+            writer.writerows(chunk.itertuples(index=False, name=None))
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _ndjson(self) -> Iterator[bytes]:
+        for chunk in self.chunks():
+            # Same value conversion as the JSON API (to_dict boxes numpy scalars)
+            lines = [json.dumps(record, ensure_ascii=False) for record in chunk.to_dict('records')]
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def _xlsx(self) -> Iterator[bytes]:
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Teams')
+        sheet.append(self.names)
+        for chunk in self.chunks():
+            for row in chunk.itertuples(index=False, name=None):
+                # Control characters are not allowed in worksheet XML
+                sheet.append([ILLEGAL_CHARACTERS_RE.sub('', value) if isinstance(value, str) else value
+                              for value in row])
+
+        with tempfile.TemporaryFile() as spool:
+            workbook.save(spool)
+            spool.seek(0)
+            for block in iter(lambda: spool.read(self.FILE_CHUNK_BYTES), b''):
+                yield block
@@ -0,0 +1,465 @@
+"""
+Team Index for Basketball Dashboard
+Precomputed lookup structures that answer /api/teams filters without scanning the data
+"""
+
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from typing import Dict, List, Iterable, Optional
+
+from services.row_versions import RowDiff
+
+
+def intersect_sorted(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """
+    Intersect two sorted, duplicate-free row id arrays
+
+    Probes the larger array with a binary search for each id of the smaller
+    one, so the cost is O(len(small) * log(len(large))).
+    """
+    if len(small) > len(large):
+        small, large = large, small
+    if not len(small) or not len(large):
+        return small[:0]
+    positions = np.searchsorted(large, small)
+    positions[positions == len(large)] = 0
+    return small[large[positions] == small]
+
+
+class TrigramIndex:
+    """
+    Substring index over normalized (lowercased) team names
+
+    Each distinct name is split into its character trigrams; a search term is
+    resolved by intersecting the posting lists of its own trigrams and then
+    verifying the surviving candidates with a plain substring test.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, values: pd.Series, previous: Optional["TrigramIndex"] = None):
+        """
+        Args:
+            values: Team names, one per row
+            previous: Index of the previous generation; only names it does
+                      not contain are split into trigrams, its posting lists
+                      are renumbered for the others
+        """
+        normalized = values.astype(str).str.lower()
+        codes, names = pd.factorize(normalized, sort=False)
+
+        # Row -> distinct name id, and the distinct names themselves
+        self.codes = codes.astype(np.int32)
+        self.names: List[str] = list(names)
+
+        new_ids = range(len(self.names))
+        self.postings: Dict[str, np.ndarray] = {}
+        if previous is not None:
+            new_ids = self._renumber(previous, names)
+
+        grams = defaultdict(list)
+        for name_id in new_ids:
+            for gram in self._grams(self.names[name_id]):
+                grams[gram].append(name_id)
+
+        # Name ids are appended in increasing order, so every list is sorted
+        for gram, name_ids in grams.items():
+            added = np.array(name_ids, dtype=np.int32)
+            kept = self.postings.get(gram)
+            self.postings[gram] = added if kept is None else np.union1d(kept, added).astype(np.int32)
+
+    def _renumber(self, previous: "TrigramIndex", names: pd.Index) -> List[int]:
+        """
+        Carry the previous generation's posting lists over to this one's name ids
+
+        Returns:
+            list: Ids of the names the previous index did not contain
+        """
+        # Previous name id -> this generation's id, -1 for names that are gone
+        found = pd.Index(previous.names).get_indexer(names)
+        mapping = np.full(len(previous.names), -1, dtype=np.int32)
+        known = np.flatnonzero(found >= 0)
+        mapping[found[known]] = known
+        ordered = bool(np.all(np.diff(mapping[mapping >= 0]) > 0))
+
+        for gram, name_ids in previous.postings.items():
+            renumbered = mapping[name_ids]
+            renumbered = renumbered[renumbered >= 0]
+            if len(renumbered):
+                self.postings[gram] = renumbered if ordered else np.sort(renumbered)
+
+        return np.flatnonzero(found < 0).tolist()
+
+    @classmethod
+    def _grams(cls, text: str) -> set:
+        size = cls.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _resolve(self, term: str) -> Iterable[int]:
+        """Distinct name ids whose name contains the term"""
+        if len(term) < self.GRAM_SIZE:
+            # Too short to index; scanning distinct names is still cheaper than rows
+            return [i for i, name in enumerate(self.names) if term in name]
+
+        candidates = []
+        for gram in self._grams(term):
+            name_ids = self.postings.get(gram)
+            if name_ids is None:
+                return []
+            candidates.append(name_ids)
+
+        candidates.sort(key=len)
+        name_ids = candidates[0]
+        for other in candidates[1:]:
+            name_ids = intersect_sorted(name_ids, other)
+            if not len(name_ids):
+                return []
+
+        # Trigram overlap does not imply containment, so verify
+        names = self.names
+        return [i for i in name_ids.tolist() if term in names[i]]
+
+    def search(self, terms: List[str], rows: np.ndarray) -> np.ndarray:
+        """
+        Keep the rows whose team name contains any of the terms
+
+        Args:
+            terms: Normalized (lowercased, stripped) search terms
+            rows: Sorted candidate row positions
+
+        Returns:
+            numpy.ndarray: Sorted subset of rows
+        """
+        matched = np.zeros(len(self.names), dtype=bool)
+        for term in terms:
+            matched[self._resolve(term)] = True
+
+        return rows[matched[self.codes[rows]]]
+
+
+class TeamIndex:
+    """
+    Inverted index mapping each Country/League/Sports value to the sorted
+    row positions of the teams that carry it
+
+    Also maps each exact team name to a row for detail pages. Names are not
+    unique (the same school can field men's and women's teams): the first
+    occurrence in workbook order wins, which is the row the original
+    full-column scan returned.
+
+    For facet counts every filter column is also kept as one integer code
+    per row, with the unfiltered count of each value precomputed.
+    """
+
+    # Request parameter -> DataFrame column
+    FILTER_COLUMNS = {
+        'country': 'Country',
+        'league': 'League',
+        'sport': 'Sports'
+    }
+
+    # Presence flag -> link column
+    LINK_FLAGS = {
+        'has_twitter': 'Twitter',
+        'has_facebook': 'Facebook',
+        'has_instagram': 'Instagram'
+    }
+
+    # Gender filter -> required flag values (derived from league names)
+    GENDER_FLAGS = {
+        'men': {'is_ncaa': True, 'is_womens': False},
+        'women': {'is_ncaa': True, 'is_womens': True}
+    }
+
+    # Per-row gender code (see gender_codes) -> gender filter value
+    GENDER_CODES = {1: 'men', 2: 'women'}
+
+    def __init__(self, df: pd.DataFrame, previous: Optional["TeamIndex"] = None,
+                 changes: Optional[RowDiff] = None):
+        """
+        Args:
+            df: Teams data
+            previous: Index of the previous generation, whose name index is
+                      updated with the names that changed instead of rebuilt
+            changes: Rows that differ from the previous generation; the
+                     per-row flags of the other rows are copied over
+        """
+        self.row_count = len(df)
+        self.all_rows = np.arange(self.row_count, dtype=np.int32)
+        self.postings: Dict[str, Dict[object, np.ndarray]] = {}
+        self.facet_codes: Dict[str, np.ndarray] = {}
+        self.facet_values: Dict[str, list] = {}
+        self.facet_totals: Dict[str, np.ndarray] = {}
+
+        for param, column in self.FILTER_COLUMNS.items():
+            values = df[column] if column in df.columns else pd.Series([''] * self.row_count)
+            codes, uniques = pd.factorize(values, sort=False)
+            groups = self._group_rows(codes, len(uniques))
+            self.postings[param] = dict(zip(uniques, groups))
+            self.facet_codes[param] = codes.astype(np.int32)
+            self.facet_values[param] = list(uniques)
+            self.facet_totals[param] = np.array([len(rows) for rows in groups], dtype=np.int64)
+
+        previous_names = previous.team_names if previous is not None else None
+        self.team_names = TrigramIndex(df['Team'], previous_names) if 'Team' in df.columns else None
+        if previous is not None and changes is not None:
+            self.flags = self._update_flags(df, previous, changes)
+        else:
+            self.flags = self._build_flags(df)
+
+        # 0: not NCAA, 1: men's, 2: women's
+        self.gender_codes = (self.flags['is_ncaa'] * (1 + self.flags['is_womens'])).astype(np.int8)
+        self.gender_totals = np.bincount(self.gender_codes, minlength=3)
+        self.flag_totals = {flag: int(np.count_nonzero(self.flags[flag])) for flag in self.LINK_FLAGS}
+
+        # Exact name -> first row, and row -> name id for excluding namesakes
+        if 'Team' in df.columns:
+            name_ids, names = pd.factorize(df['Team'].astype(str), sort=False)
+            first_rows = np.unique(name_ids, return_index=True)[1]
+            self.name_ids = name_ids.astype(np.int32)
+            self.team_rows: Dict[str, int] = dict(zip(names, first_rows.tolist()))
+        else:
+            self.name_ids = np.zeros(self.row_count, dtype=np.int32)
+            self.team_rows = {}
+
+        # Row -> (country, league) group, and each group's sorted rows
+        if 'Country' in df.columns and 'League' in df.columns:
+            pairs = pd.MultiIndex.from_arrays([df['Country'], df['League']])
+            group_ids, groups = pd.factorize(pairs, sort=False)
+            self.group_ids = group_ids.astype(np.int32)
+            self.groups = self._group_rows(group_ids, len(groups))
+        else:
+            self.group_ids = np.zeros(self.row_count, dtype=np.int32)
+            self.groups = [self.all_rows]
+
+    @staticmethod
+    def _group_rows(codes: np.ndarray, group_count: int) -> List[np.ndarray]:
+        """Sorted int32 row positions for each code, using one stable sort"""
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        bounds = np.searchsorted(codes[order], np.arange(group_count + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(group_count)]
+
+
+    def _build_flags(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Compute per-row boolean flags once per load
+
+        Args:
+            df: Teams data
+
+        Returns:
+            dict: flag name -> boolean array aligned with row positions
+        """
+        empty = np.zeros(len(df), dtype=bool)
+
+        def text(column: str) -> pd.Series:
+            return df[column].astype(str) if column in df.columns else None
+
+        flags = {}
+        league = text('League')
+        if league is None:
+            flags['is_ncaa'] = flags['is_womens'] = empty
+        else:
+            flags['is_ncaa'] = league.str.contains('NCAA', case=False, regex=False).to_numpy(dtype=bool)
+            flags['is_womens'] = league.str.contains('Women', case=False, regex=False).to_numpy(dtype=bool)
+
+        for flag, column in self.LINK_FLAGS.items():
+            values = text(column)
+            flags[flag] = empty if values is None else (values.str.strip() != '').to_numpy(dtype=bool)
+
+        return flags
+
+    def _update_flags(self, df: pd.DataFrame, previous: "TeamIndex", changes: RowDiff) -> Dict[str, np.ndarray]:
+        """Flags of the unchanged rows taken from the previous index, computed for the others"""
+        unchanged = changes.unchanged()
+        changed = np.setdiff1d(np.arange(self.row_count), unchanged, assume_unique=True)
+        recomputed = self._build_flags(df.iloc[changed])
+
+        flags = {}
+        for flag, values in recomputed.items():
+            merged = np.empty(self.row_count, dtype=bool)
+            merged[unchanged] = previous.flags[flag][changes.matched[unchanged]]
+            merged[changed] = values
+            flags[flag] = merged
+        return flags
+
+    def lookup(self, **filters) -> np.ndarray:
+        """
+        Resolve a combination of equality filters to row positions
+
+        Args:
+            **filters: Request parameter -> value; empty values are ignored
+
+        Returns:
+            numpy.ndarray: Sorted row positions matching every filter
+        """
+        candidates: List[np.ndarray] = []
+
+        for param, value in filters.items():
+            if not value:
+                continue
+            rows = self.postings[param].get(value)
+            if rows is None:
+                return self.all_rows[:0]
+            candidates.append(rows)
+
+        if not candidates:
+            return self.all_rows
+
+        # Start from the most selective posting list
+        candidates.sort(key=len)
+        result = candidates[0]
+        for rows in candidates[1:]:
+            result = intersect_sorted(result, rows)
+            if not len(result):
+                break
+
+        return result
+
+    def search(self, terms: List[str], rows: np.ndarray) -> np.ndarray:
+        """
+        Narrow row positions to teams matching any comma-separated search term
+
+        Args:
+            terms: Normalized (lowercased, stripped) search terms
+            rows: Sorted candidate row positions, e.g. from lookup()
+
+        Returns:
+            numpy.ndarray: Sorted subset of rows
+        """
+        if self.team_names is None:
+            return rows[:0]
+        return self.team_names.search(terms, rows)
+
+    def with_flags(self, rows: np.ndarray, **required: bool) -> np.ndarray:
+        """
+        Keep the rows whose precomputed flags have the required values
+
+        Args:
+            rows: Sorted candidate row positions
+            **required: flag name -> required value
+
+        Returns:
+            numpy.ndarray: Sorted subset of rows
+        """
+        if not required or not len(rows):
+            return rows
+
+        keep = np.ones(len(rows), dtype=bool)
+        for flag, value in required.items():
+            values = self.flags[flag][rows]
+            keep &= values if value else ~values
+
+        return rows[keep]
+
+    def team_row(self, name: str) -> Optional[int]:
+        """Row of the first team with exactly this name, or None"""
+        return self.team_rows.get(name)
+
+    def similar(self, row: int, k: int) -> np.ndarray:
+        """
+        Up to k other teams from the same country and league, in workbook order
+
+        Rows sharing the team's name are skipped, so a school's men's and
+        women's entries do not list each other.
+
+        Args:
+            row: Row position of the team
+            k: Maximum number of rows to return
+
+        Returns:
+            numpy.ndarray: Sorted row positions
+        """
+        group = self.groups[self.group_ids[row]]
+        name_id = self.name_ids[row]
+        similar = []
+        for other in group:
+            if len(similar) == k:
+                break
+            if self.name_ids[other] != name_id:
+                similar.append(other)
+        return np.array(similar, dtype=np.int32)
+
+    def with_gender(self, rows: np.ndarray, gender: str) -> np.ndarray:
+        """Apply the men's/women's (NCAA) filter; unknown values are ignored"""
+        return self.with_flags(rows, **self.GENDER_FLAGS.get(gender, {}))
+
+    def select(self, country: str = '', league: str = '', sport: str = '',
+               search: Optional[List[str]] = None, gender: str = '',
+               flags: Optional[Dict[str, bool]] = None) -> np.ndarray:
+        """
+        Rows matching a complete /api/teams filter combination
+
+        Args:
+            country, league, sport: Equality filters; empty values are ignored
+            search: Normalized search terms; any of them must match
+            gender: Gender filter value ('men' or 'women')
+            flags: Presence flag -> required value
+
+        Returns:
+            numpy.ndarray: Sorted row positions
+        """
+        rows = self.lookup(country=country, league=league, sport=sport)
+        if search:
+            rows = self.search(search, rows)
+        if gender:
+            rows = self.with_gender(rows, gender)
+        return self.with_flags(rows, **(flags or {}))
+
+    def _value_counts(self, param: str, rows: np.ndarray) -> Dict[str, int]:
+        if len(rows) == self.row_count:
+            counts = self.facet_totals[param]
+        else:
+            counts = np.bincount(self.facet_codes[param][rows], minlength=len(self.facet_values[param]))
+        return {
+            str(value): int(count)
+            for value, count in zip(self.facet_values[param], counts.tolist())
+            if value != ''
+        }
+
+    def facets(self, **criteria) -> Dict[str, object]:
+        """
+        Team counts per filter value under a filter combination
+
+        Each facet is counted with every filter applied except its own, so
+        a facet lists what each of its values would yield if it were
+        chosen instead. Counting uses the per-row codes: an unfiltered
+        facet is read from the precomputed totals (constant time whatever
+        the row count), a filtered one is one bincount over the matching
+        rows.
+
+        Args:
+            **criteria: Filters as accepted by select()
+
+        Returns:
+            dict: total matches; value -> count for country, league and
+                  sport; gender -> count; presence flag -> count
+        """
+        rows = self.select(**criteria)
+        flags = criteria.get('flags') or {}
+
+        def without(param: str) -> np.ndarray:
+            if param in self.LINK_FLAGS:
+                if param not in flags:
+                    return rows
+                return self.select(**dict(criteria, flags={f: v for f, v in flags.items() if f != param}))
+            if not criteria.get(param):
+                return rows
+            return self.select(**dict(criteria, **{param: ''}))
+
+        result = {'total': int(len(rows))}
+        for param in self.FILTER_COLUMNS:
+            result[param] = self._value_counts(param, without(param))
+
+        base = without('gender')
+        genders = self.gender_totals if len(base) == self.row_count else \
+            np.bincount(self.gender_codes[base], minlength=3)
+        result['gender'] = {gender: int(genders[code]) for code, gender in self.GENDER_CODES.items()}
+
+        result['links'] = {}
+        for flag in self.LINK_FLAGS:
+            base = without(flag)
+            result['links'][flag] = self.flag_totals[flag] if len(base) == self.row_count else \
+                int(np.count_nonzero(self.flags[flag][base]))
+        return result
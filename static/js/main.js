@@ -48,38 +48,14 @@ function copyToClipboard(text) {
     return true;
 }
 
-// Export function to create CSV of filtered teams
-function exportToCSV(data, filename) {
-    // Column headers
-    const headers = Object.keys(data[0]);
+// Download the teams matching a filter query string; the server streams the
+// file (format: csv, ndjson or xlsx), so nothing is assembled in the browser
+function exportTeams(query, format) {
+    const params = new URLSearchParams(query);
+    params.set('format', format || 'csv');
     
-    // Convert data to CSV format
-    let csvContent = headers.join(',') + '\n';
-    
-    data.forEach(item => {
-        const row = headers.map(header => {
-            // Handle values that might contain commas or quotes
-            let value = item[header] || '';
-            value = value.toString().replace(/"/g, '""'); // Escape quotes
-            
-            // Wrap in quotes if contains comma, newline or quote
-            if (value.includes(',') || value.includes('\n') || value.includes('"')) {
-                value = `"${value}"`;
-            }
-            
-            return value;
-        });
-        
-        csvContent += row.join(',') + '\n';
-    });
-    
-    // Create download link
-    const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
     const link = document.createElement('a');
-    
-    link.setAttribute('href', url);
-    link.setAttribute('download', filename);
+    link.setAttribute('href', `/api/teams/export?${params.toString()}`);
     link.style.visibility = 'hidden';
     
     document.body.appendChild(link);
@@ -3,10 +3,25 @@ WSGI entry point for Basketball Dashboard
 This file provides a clean interface for gunicorn deployment
 """
 
+import gc
+
 from app import app, create_app
 
 # Initialize the application
 application = create_app()
 
+# With `gunicorn --preload` this module is imported by the master before it
+# forks the workers. Moving everything built so far (modules, the first data
+# snapshot) out of the collector's reach keeps garbage collection passes in
+# the workers from writing to those objects and un-sharing their pages.
+#
+# Only that first snapshot is shared. Every refresh builds a new one in each
+# worker, so after the first refresh memory grows by a full copy of the data
+# per worker (~150 MB per 100k teams, see benchmarks/bench_workers.py). The
+# Procfile runs WEB_CONCURRENCY workers, 1 unless the host sets it; size it
+# to the dyno's memory.
+gc.collect()
+gc.freeze()
+
 if __name__ == "__main__":
     application.run() 
\ No newline at end of file